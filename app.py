@@ -1,54 +1,257 @@
 # app.py
 # Flask 애플리케이션으로 HTTP 요청 처리
 
-from flask import Flask, request, jsonify
-from navigation_core import Navigation
+from time import perf_counter
+from flask import Flask, Response, g, request, jsonify
+from metrics import metrics
+from recorder import open_recorder
+from session_registry import SessionRegistry
+from wire_format import BINARY_MIMETYPE, POSITION, DESTINATION, IMU, decode, apply_messages
+from obstacle_ingest import (
+    iter_json_chunks, iter_ndjson_chunks, iter_float32_chunks, ingest_chunks, parse_bounds
+)
+from scan_fusion import decode_scan, scan_from_json, parse_boxes
 
 app = Flask(__name__)
-navigator = Navigation()
+registry = SessionRegistry(recorder=open_recorder())
+
+@app.before_request
+def _start_timer():
+    g.started = perf_counter() if metrics.enabled else None
+
+@app.after_request
+def _record_latency(response):
+    started = g.get("started")
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe("http_request_seconds", perf_counter() - started, (("endpoint", endpoint),))
+    return response
+
+def _vehicle_id():
+    """쿼리 문자열 또는 JSON 본문의 vehicle_id (없으면 None → 기본 세션/공유 지도)."""
+    vehicle_id = request.args.get("vehicle_id")
+    if vehicle_id is None:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            vehicle_id = data.get("vehicle_id")
+    return vehicle_id
+
+def _apply_binary(kind):
+    """바이너리 메시지 본문을 해당 차량 세션에 순서대로 반영."""
+    try:
+        records = decode(request.get_data())
+    except ValueError as e:
+        return jsonify({"status": "ERROR", "message": str(e)}), 400
+
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = apply_messages(session.navigator, records, kind)
+    if result["status"] == "ERROR":
+        return jsonify(result), 400
+    return jsonify(result)
+
+def _obstacle_target():
+    """vehicle_id 가 있으면 해당 차량의 장애물, 없으면 모든 차량이 공유하는 정적 지도."""
+    vehicle_id = _vehicle_id()
+    if vehicle_id is None:
+        return registry, None
+    session = registry.get(vehicle_id)
+    return session.navigator, session.lock
 
 @app.route('/init', methods=['GET'])  # 새 엔드포인트 추가
 def init_simulation():
-    result = navigator.init_simulation()
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.navigator.init_simulation()
     return jsonify(result)
 
 @app.route('/update_position', methods=['POST'])
 def update_position():
+    if request.mimetype == BINARY_MIMETYPE:
+        return _apply_binary(POSITION)
+
     data = request.get_json()
     if not data or "position" not in data:
         return jsonify({"status": "ERROR", "message": "위치 데이터 누락"}), 400
 
-    result = navigator.position_handler.update_position(data["position"])
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.position_handler.update_position(data["position"], data.get("timestamp"))
+    if result["status"] == "ERROR":
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/update_imu', methods=['POST'])
+def update_imu():
+    """IMU 입력 반영 ({"imu": {"yaw_rate", "accel", "timestamp"}} 또는 {"imu": [입력, ...]}, 바이너리 IMU 메시지)."""
+    if request.mimetype == BINARY_MIMETYPE:
+        return _apply_binary(IMU)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or "imu" not in data:
+        return jsonify({"status": "ERROR", "message": "IMU 데이터 누락"}), 400
+
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.position_handler.update_imu_samples(data["imu"], data.get("timestamp"))
     if result["status"] == "ERROR":
         return jsonify(result), 400
     return jsonify(result)
 
 @app.route('/set_destination', methods=['POST'])
 def set_destination():
+    if request.mimetype == BINARY_MIMETYPE:
+        return _apply_binary(DESTINATION)
+
     data = request.get_json()
     if not data or "destination" not in data:
         return jsonify({"status": "ERROR", "message": "목적지 데이터 누락"}), 400
 
-    result = navigator.set_destination(data["destination"])
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.navigator.set_destination(data["destination"])
+    if result["status"] == "ERROR":
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/set_path', methods=['POST'])
+def set_path():
+    """경유점 폴리라인을 추종 경로로 설정 ({"path": [[x, z], ...]}, 마지막 점이 목적지)."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("path"), list):
+        return jsonify({"status": "ERROR", "message": "경로 데이터 누락"}), 400
+
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.navigator.set_path(data["path"])
     if result["status"] == "ERROR":
         return jsonify(result), 400
     return jsonify(result)
 
 @app.route('/get_move', methods=['GET'])
 def get_move():
-    return jsonify(navigator.get_move())
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        return jsonify(session.navigator.get_move())
+
+@app.route('/planner_stats', methods=['GET'])
+def planner_stats():
+    """마지막 (재)계획의 소요 시간과 확장 노드 수."""
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        return jsonify(session.navigator.planner.last_stats)
+
+@app.route('/config', methods=['GET', 'POST'])
+def config():
+    """차량 세션의 현재 설정 조회 / 일부 값 교체 (재시작 없이 적용, {"config": {"kp_val": 0.2, ...}})."""
+    session = registry.get(_vehicle_id())
+    if request.method == 'GET':
+        return jsonify({"status": "OK", "config": session.navigator.config.as_dict()})
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or "config" not in data:
+        return jsonify({"status": "ERROR", "message": "설정 데이터 누락"}), 400
+    result = session.reload_config(data["config"])
+    if result["status"] == "ERROR":
+        return jsonify(result), 400
+    return jsonify(result)
+
+@app.route('/metrics', methods=['GET', 'POST'])
+def metrics_endpoint():
+    """Prometheus 텍스트 형식 계측 값 (POST {"enabled": bool, "reset": bool} 로 기록 전환/초기화)."""
+    if request.method == 'GET':
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"status": "ERROR", "message": "설정 데이터 누락"}), 400
+    if "enabled" in data:
+        metrics.enabled = bool(data["enabled"])
+    if data.get("reset"):
+        metrics.reset()
+    return jsonify({"status": "OK", "enabled": metrics.enabled})
+
+@app.route('/sessions', methods=['GET'])
+def sessions():
+    """활성 차량 세션과 공유 정적 장애물 수."""
+    return jsonify(registry.describe())
 
 @app.route('/update_obstacle', methods=['POST'])
 def update_obstacle():
-    """장애물 데이터를 받아 Navigation 클래스에 반영."""
+    """장애물 데이터를 받아 차량 세션 또는 공유 정적 지도에 반영."""
     data = request.get_json()
     if not data or "obstacle" not in data:
         return jsonify({"status": "ERROR", "message": "장애물 데이터 누락"}), 400
 
-    result = navigator.update_obstacle(data["obstacle"])
+    target, lock = _obstacle_target()
+    if lock is None:
+        result = target.update_obstacle(data["obstacle"])
+    else:
+        with lock:
+            result = target.update_obstacle(data["obstacle"])
     if result["status"] == "ERROR":
         return jsonify(result), 400
     return jsonify(result), 200
 
+@app.route('/obstacles', methods=['GET', 'DELETE'])
+def obstacles():
+    """장애물 조회 (?min_x=&min_z=&max_x=&max_z= 로 범위 제한) / 전체 삭제. vehicle_id 가 없으면 공유 정적 지도."""
+    target, lock = _obstacle_target()
+    if request.method == 'DELETE':
+        if lock is None:
+            return jsonify(target.clear_obstacles())
+        with lock:
+            return jsonify(target.clear_obstacles())
+
+    try:
+        bounds = parse_bounds(request.args)
+    except ValueError as e:
+        return jsonify({"status": "ERROR", "message": str(e)}), 400
+    if lock is None:
+        return jsonify(target.query_obstacles(bounds))
+    with lock:
+        return jsonify(target.query_obstacles(bounds))
+
+@app.route('/update_obstacles', methods=['POST'])
+def update_obstacles():
+    """장애물 여러 개를 한 번에 받아 반영 (JSON 배열, NDJSON 스트림, float32 바이너리)."""
+    if request.mimetype == 'application/x-ndjson':
+        chunks = iter_ndjson_chunks(request.stream)
+    elif request.mimetype == 'application/octet-stream':
+        chunks = iter_float32_chunks(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("obstacles")
+        if not isinstance(data, list):
+            return jsonify({"status": "ERROR", "message": "장애물 배열 누락"}), 400
+        chunks = iter_json_chunks(data)
+
+    target, lock = _obstacle_target()
+    # 본문 스트림은 잠금 밖에서 읽고 파싱하며, 잠금은 파싱된 청크를 반영할 때만 잡음
+    return jsonify(ingest_chunks(target, chunks, lock))
+
+@app.route('/update_scan', methods=['POST'])
+def update_scan():
+    """LiDAR 스캔 반영 (JSON {"ranges", "angles" 또는 "angle_min"/"angle_increment", "boxes"} 또는
+    float32 (angle, range) 바이너리, 바이너리의 카메라 검출 박스는 ?boxes= JSON)."""
+    try:
+        if request.mimetype == 'application/octet-stream':
+            angles, ranges = decode_scan(request.get_data())
+            boxes = parse_boxes(request.args.get("boxes"))
+        else:
+            data = request.get_json(silent=True)
+            angles, ranges = scan_from_json(data)
+            boxes = parse_boxes(data.get("boxes"))
+    except ValueError as e:
+        return jsonify({"status": "ERROR", "message": str(e)}), 400
+
+    session = registry.get(_vehicle_id())
+    with session.lock:
+        result = session.navigator.add_scan(angles, ranges, boxes)
+    if result["status"] == "ERROR":
+        return jsonify(result), 400
+    return jsonify(result)
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5002)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5002, threaded=True)
\ No newline at end of file
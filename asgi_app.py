@@ -0,0 +1,334 @@
+# asgi_app.py
+# asyncio 기반 ASGI 서버 (app.py 와 같은 엔드포인트 + 위치 갱신/이동 명령 통합 tick + WebSocket 스트림)
+# 실행 예: uvicorn asgi_app:app --port 5003
+#
+# 요청 처리(경로 계획, 장애물 적재 등)는 동기 코드이므로 기본 스레드 풀에서 실행하여 이벤트 루프를 막지 않는다.
+# 같은 차량에 대한 호출은 세션 잠금으로 순서대로 처리된다.
+
+import asyncio
+import io
+import json
+from time import perf_counter
+from urllib.parse import parse_qs
+from metrics import metrics
+from recorder import open_recorder
+from session_registry import SessionRegistry
+from wire_format import BINARY_MIMETYPE, POSITION, DESTINATION, IMU, decode, apply_messages
+from obstacle_ingest import (
+    iter_json_chunks, iter_ndjson_chunks, iter_float32_chunks, ingest_chunks, parse_bounds
+)
+from scan_fusion import decode_scan, scan_from_json, parse_boxes
+
+registry = SessionRegistry(recorder=open_recorder())
+STREAMING_TYPES = ("application/x-ndjson", "application/octet-stream")  # /update_obstacles 를 받는 대로 파싱하는 형식
+
+
+def tick(item):
+    """위치 갱신과 이동 명령 계산을 한 번에 처리 ({"vehicle_id", "position", "timestamp"})."""
+    if not isinstance(item, dict) or "position" not in item:
+        return {"status": "ERROR", "message": "위치 데이터 누락"}
+    session = registry.get(item.get("vehicle_id"))
+    with session.lock:
+        position = session.position_handler.update_position(item["position"], item.get("timestamp"))
+        if position["status"] == "ERROR":
+            return position
+        move = session.navigator.get_move()
+    return {"status": "OK", "position": position, "move": move}
+
+
+def tick_batch(data):
+    """단일 tick 또는 tick 목록 (여러 차량을 한 번에) 처리."""
+    if isinstance(data, list):
+        return [tick(item) for item in data]
+    return tick(data)
+
+
+def tick_binary(vehicle_id, body):
+    """바이너리 위치 메시지(여러 개면 순서대로)를 반영한 뒤 이동 명령 1개 계산."""
+    try:
+        records = decode(body)
+    except ValueError as e:
+        return {"status": "ERROR", "message": str(e)}
+    session = registry.get(vehicle_id)
+    with session.lock:
+        position = apply_messages(session.navigator, records, POSITION)
+        if position["status"] == "ERROR":
+            return position
+        move = session.navigator.get_move()
+    return {"status": "OK", "position": position, "move": move}
+
+
+def _session_call(vehicle_id, call):
+    session = registry.get(vehicle_id)
+    with session.lock:
+        return call(session)
+
+
+def _status(result):
+    return 400 if isinstance(result, dict) and result.get("status") == "ERROR" else 200
+
+
+def _handle_http(method, path, query, content_type, body):
+    """(상태 코드, 응답 객체) 반환. 라우팅과 검증은 app.py 와 동일."""
+    data = None
+    if content_type == "application/json" and body:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 400, {"status": "ERROR", "message": "잘못된 JSON"}
+    vehicle_id = query.get("vehicle_id", [None])[0]
+    if vehicle_id is None and isinstance(data, dict):
+        vehicle_id = data.get("vehicle_id")
+
+    if content_type == BINARY_MIMETYPE and path in ("/tick", "/update_position", "/update_imu", "/set_destination"):
+        if path == "/tick":
+            result = tick_binary(vehicle_id, body)
+        else:
+            kind = {"/update_position": POSITION, "/update_imu": IMU, "/set_destination": DESTINATION}[path]
+            try:
+                records = decode(body)
+            except ValueError as e:
+                return 400, {"status": "ERROR", "message": str(e)}
+            result = _session_call(vehicle_id, lambda s: apply_messages(s.navigator, records, kind))
+        return _status(result), result
+
+    if (method, path) == ("POST", "/tick"):
+        if data is None:
+            return 400, {"status": "ERROR", "message": "위치 데이터 누락"}
+        if isinstance(data, dict) and vehicle_id is not None:
+            data.setdefault("vehicle_id", vehicle_id)
+        result = tick_batch(data)
+        return _status(result), result
+
+    if (method, path) == ("POST", "/update_position"):
+        if not isinstance(data, dict) or "position" not in data:
+            return 400, {"status": "ERROR", "message": "위치 데이터 누락"}
+        result = _session_call(
+            vehicle_id, lambda s: s.position_handler.update_position(data["position"], data.get("timestamp")))
+        return _status(result), result
+
+    if (method, path) == ("POST", "/update_imu"):
+        if not isinstance(data, dict) or "imu" not in data:
+            return 400, {"status": "ERROR", "message": "IMU 데이터 누락"}
+        result = _session_call(
+            vehicle_id, lambda s: s.position_handler.update_imu_samples(data["imu"], data.get("timestamp")))
+        return _status(result), result
+
+    if (method, path) == ("POST", "/set_destination"):
+        if not isinstance(data, dict) or "destination" not in data:
+            return 400, {"status": "ERROR", "message": "목적지 데이터 누락"}
+        result = _session_call(vehicle_id, lambda s: s.navigator.set_destination(data["destination"]))
+        return _status(result), result
+
+    if (method, path) == ("POST", "/set_path"):
+        if not isinstance(data, dict) or not isinstance(data.get("path"), list):
+            return 400, {"status": "ERROR", "message": "경로 데이터 누락"}
+        result = _session_call(vehicle_id, lambda s: s.navigator.set_path(data["path"]))
+        return _status(result), result
+
+    if (method, path) == ("GET", "/get_move"):
+        return 200, _session_call(vehicle_id, lambda s: s.navigator.get_move())
+
+    if (method, path) == ("GET", "/planner_stats"):
+        return 200, _session_call(vehicle_id, lambda s: s.navigator.planner.last_stats)
+
+    if (method, path) == ("GET", "/config"):
+        config = registry.get(vehicle_id).navigator.config
+        return 200, {"status": "OK", "config": config.as_dict()}
+
+    if (method, path) == ("POST", "/config"):
+        if not isinstance(data, dict) or "config" not in data:
+            return 400, {"status": "ERROR", "message": "설정 데이터 누락"}
+        result = registry.get(vehicle_id).reload_config(data["config"])
+        return _status(result), result
+
+    if (method, path) == ("POST", "/metrics"):
+        if not isinstance(data, dict):
+            return 400, {"status": "ERROR", "message": "설정 데이터 누락"}
+        if "enabled" in data:
+            metrics.enabled = bool(data["enabled"])
+        if data.get("reset"):
+            metrics.reset()
+        return 200, {"status": "OK", "enabled": metrics.enabled}
+
+    if (method, path) == ("GET", "/sessions"):
+        return 200, registry.describe()
+
+    if (method, path) == ("POST", "/update_obstacle"):
+        if not isinstance(data, dict) or "obstacle" not in data:
+            return 400, {"status": "ERROR", "message": "장애물 데이터 누락"}
+        if vehicle_id is None:
+            result = registry.update_obstacle(data["obstacle"])
+        else:
+            result = _session_call(vehicle_id, lambda s: s.navigator.update_obstacle(data["obstacle"]))
+        return _status(result), result
+
+    if path == "/obstacles" and method in ("GET", "DELETE"):
+        if method == "DELETE":
+            if vehicle_id is None:
+                return 200, registry.clear_obstacles()
+            return 200, _session_call(vehicle_id, lambda s: s.navigator.clear_obstacles())
+        try:
+            bounds = parse_bounds({key: values[0] for key, values in query.items()})
+        except ValueError as e:
+            return 400, {"status": "ERROR", "message": str(e)}
+        if vehicle_id is None:
+            return 200, registry.query_obstacles(bounds)
+        return 200, _session_call(vehicle_id, lambda s: s.navigator.query_obstacles(bounds))
+
+    if (method, path) == ("POST", "/update_obstacles"):
+        # 스트림 형식은 본문이 _ReceiveStream 으로 오며 받는 대로 파싱
+        stream = io.BytesIO(body) if isinstance(body, bytes) else body
+        if content_type == "application/x-ndjson":
+            chunks = iter_ndjson_chunks(stream)
+        elif content_type == "application/octet-stream":
+            chunks = iter_float32_chunks(stream)
+        else:
+            items = data.get("obstacles") if isinstance(data, dict) else data
+            if not isinstance(items, list):
+                return 400, {"status": "ERROR", "message": "장애물 배열 누락"}
+            chunks = iter_json_chunks(items)
+        if vehicle_id is None:
+            return 200, ingest_chunks(registry, chunks)
+        session = registry.get(vehicle_id)
+        return 200, ingest_chunks(session.navigator, chunks, session.lock)
+
+    if (method, path) == ("POST", "/update_scan"):
+        try:
+            if content_type == "application/octet-stream":
+                angles, ranges = decode_scan(body)
+                boxes = parse_boxes(query.get("boxes", [None])[0])
+            else:
+                angles, ranges = scan_from_json(data)
+                boxes = parse_boxes(data.get("boxes"))
+        except ValueError as e:
+            return 400, {"status": "ERROR", "message": str(e)}
+        result = _session_call(vehicle_id, lambda s: s.navigator.add_scan(angles, ranges, boxes))
+        return _status(result), result
+
+    return 404, {"status": "ERROR", "message": "Not Found"}
+
+
+class _ReceiveStream:
+    """스레드 풀에서 ASGI 요청 본문을 read() 로 조금씩 읽는 파일 객체 (receive 는 이벤트 루프에서 실행)."""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._done = False
+
+    def read(self, size=-1):
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            self._buffer += message.get("body", b"")
+            self._done = not message.get("more_body")
+        size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        block = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return block
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _send_json(send, status, payload):
+    await _send_body(send, status, json.dumps(payload).encode(), b"application/json")
+
+
+async def _send_body(send, status, body, content_type):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _serve_websocket(scope, receive, send):
+    """하나의 연결로 위치를 계속 받아 이동 명령을 돌려주는 스트림 모드 (/ws).
+
+    텍스트 메시지는 tick 객체 하나 또는 tick 목록이며, 같은 형태로 응답한다.
+    바이너리 메시지는 wire_format 위치 메시지로 해석하여 연결 쿼리의 차량에 반영한다.
+    연결 쿼리의 vehicle_id 가 메시지에 없을 때 기본값으로 쓰인다.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode())
+    default_vehicle = query.get("vehicle_id", [None])[0]
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    await send({"type": "websocket.accept"})
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        if message["type"] != "websocket.receive":
+            continue
+        started = perf_counter() if metrics.enabled else None
+        if message.get("bytes") is not None:
+            result = await loop.run_in_executor(None, tick_binary, default_vehicle, message["bytes"])
+            if started is not None:
+                metrics.observe("websocket_tick_seconds", perf_counter() - started, (("format", "binary"),))
+            await send({"type": "websocket.send", "text": json.dumps(result)})
+            continue
+        try:
+            data = json.loads(message.get("text") or "")
+        except ValueError:
+            await send({"type": "websocket.send", "text": json.dumps({"status": "ERROR", "message": "잘못된 JSON"})})
+            continue
+        for item in data if isinstance(data, list) else (data,):
+            if isinstance(item, dict) and default_vehicle is not None:
+                item.setdefault("vehicle_id", default_vehicle)
+        result = await loop.run_in_executor(None, tick_batch, data)
+        if started is not None:
+            metrics.observe("websocket_tick_seconds", perf_counter() - started, (("format", "json"),))
+        await send({"type": "websocket.send", "text": json.dumps(result)})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "websocket":
+        if scope["path"] != "/ws":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        await _serve_websocket(scope, receive, send)
+        return
+
+    headers = dict(scope.get("headers", []))
+    content_type = headers.get(b"content-type", b"").decode().split(";")[0].strip()
+    loop = asyncio.get_running_loop()
+    if (scope["method"], scope["path"]) == ("POST", "/update_obstacles") and content_type in STREAMING_TYPES:
+        body = _ReceiveStream(receive, loop)  # 전체를 모으지 않고 처리 스레드에서 받는 대로 파싱
+    else:
+        body = await _read_body(receive)
+    if (scope["method"], scope["path"]) == ("GET", "/metrics"):
+        await _send_body(send, 200, metrics.render().encode(), b"text/plain; version=0.0.4")
+        return
+    started = perf_counter() if metrics.enabled else None
+    query = parse_qs(scope.get("query_string", b"").decode())
+    status, payload = await loop.run_in_executor(
+        None, _handle_http, scope["method"], scope["path"], query, content_type, body)
+    if started is not None:
+        endpoint = scope["path"] if status != 404 else "unmatched"
+        metrics.observe("http_request_seconds", perf_counter() - started, (("endpoint", endpoint),))
+    await _send_json(send, status, payload)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5003)
@@ -0,0 +1,321 @@
+# batch_simulator.py
+# 벡터화 배치 시뮬레이터: N 대의 차량(또는 N 개의 파라미터 조합)을 NumPy 배열(SoA)로 한 번에 진행
+#
+# 한 스텝은 navigation_core.Navigation.get_move 의 Pure Pursuit + 명령 가중치 샘플링과 국소 계획기,
+# controller.PIController.compute_speed, position_handler.PositionHandler.update_position (낸 명령의 차량 모델
+# 예측 입력 포함), simulator.VehicleSim 을 같은 순서로 배열 연산으로 옮긴 것이다.
+#
+# 전역 경로 계획(점유 격자 + A*/JPS)과 경로 추종(PathTracker)은 옮기지 않았다. 경로는 매 스텝 현재 위치에서
+# 목표로 가는 직선이다. 그래서 배치 결과는 simulator.run_scenario 결과와 같지 않으며 (같은 결과를 주장하는 데
+# 쓰지 말 것), 배치 안에서 파라미터 조합끼리 비교하는 용도다:
+#   - 장애물이 없어도 Navigation 은 격자 경로(8방향 꺾은선)를 따라가므로 도착 시간 분포가 다르다.
+#   - 직선을 가로막는 장애물이 있으면 국소 계획기의 목표점도 장애물 너머에 있어 차량이 장애물 앞에서 멈춘다
+#     (Navigation 은 돌아가는 전역 경로 위의 점을 목표로 삼음). 직선 옆의 장애물은 같은 명령으로 피한다.
+# 국소 계획기는 근처에 장애물이 있는 차량마다 local_planner.RolloutPlanner 를 한 번씩 부르므로 이 단계만
+# 차량 수에 비례하는 파이썬 반복이다 (rollout_horizon 을 0 으로 주면 Navigation 처럼 막히면 정지).
+
+import numpy as np
+from obstacle_index import segments_hit_mask
+from estimator import PoseEstimator
+from local_planner import RolloutPlanner
+from vehicle_model import CODES, YAW_RATES, command_speed, command_step
+from config import (
+    TOLERANCE, LOOKAHEAD_MIN, LOOKAHEAD_MAX, LOOKAHEAD_PULLBACK_STEPS, STEERING_SMOOTHING, SPEED_FACTOR,
+    WEIGHT_FACTORS, CONTROL_PARAMS, OBSTACLE_RADIUS, MOVE_STEP, GNSS_STD, PROCESS_YAW_STD, PROCESS_ACCEL_STD,
+    ROLLOUT_HORIZON, SIM_DT, SIM_MAX_TIME, NavigationConfig
+)
+
+COMMANDS = ("D", "A", "W", "S")
+STOP = -1
+MODEL_CODES = np.array([CODES[command] for command in COMMANDS + ("STOP",)])  # 명령 인덱스 -> vehicle_model 번호 (STOP = -1 은 마지막)
+
+
+def default_params():
+    """config.py 의 현재 값으로 채운 파라미터 (이름 -> 스칼라)."""
+    return {
+        "lookahead_min": LOOKAHEAD_MIN,
+        "lookahead_max": LOOKAHEAD_MAX,
+        "steering_smoothing": STEERING_SMOOTHING,
+        "speed_factor": SPEED_FACTOR,
+        "tolerance": TOLERANCE,
+        "obstacle_radius": OBSTACLE_RADIUS,
+        "weight_D": WEIGHT_FACTORS["D"],
+        "weight_A": WEIGHT_FACTORS["A"],
+        "weight_W": WEIGHT_FACTORS["W"],
+        "weight_S": WEIGHT_FACTORS["S"],
+        "target_val_kh": CONTROL_PARAMS["target_val_kh"],
+        "kp_val": CONTROL_PARAMS["kp_val"],
+        "ki_val": CONTROL_PARAMS["ki_val"],
+        "speed_smoothing": CONTROL_PARAMS["speed_smoothing"],
+        "integral_limit": CONTROL_PARAMS["integral_limit"],
+        "gnss_std": GNSS_STD,
+        "process_yaw_std": PROCESS_YAW_STD,
+        "process_accel_std": PROCESS_ACCEL_STD,
+        "rollout_horizon": ROLLOUT_HORIZON
+    }
+
+
+class BatchSimulator:
+    def __init__(self, n, start, goal, params=None, obstacles=None, seed=0, dt=SIM_DT):
+        """start 는 (x, z, heading), goal 은 (x, z) — 스칼라 또는 길이 n 배열.
+        params 는 default_params() 의 일부 이름을 스칼라 또는 (n,) 배열로 덮어쓴다."""
+        self.n = n
+        self.dt = dt
+        self.rng = np.random.default_rng(seed)
+        merged = default_params()
+        unknown = set(params or ()) - set(merged)
+        if unknown:
+            raise ValueError(f"알 수 없는 파라미터: {sorted(unknown)}")
+        merged.update(params or {})
+        self.params = {name: np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy()
+                       for name, value in merged.items()}
+        self.obstacles = None if obstacles is None else np.asarray(obstacles, dtype=np.float64).reshape(-1, 2)
+
+        full = lambda value: np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy()
+        # 실제 차량 상태
+        self.x, self.z, self.heading = (full(v) for v in start)
+        self.speed = np.zeros(n)
+        self.goal_x, self.goal_z = (full(v) for v in goal)
+        # 내비게이터가 믿는 상태 (PositionHandler 의 칼만 필터, 시작 위치를 첫 GNSS 위치로 초기화)
+        self.estimator = PoseEstimator(n)
+        self.estimator.reset(self.x, self.z, self.params["gnss_std"] ** 2)
+        self.nav_x = self.x.copy()
+        self.nav_z = self.z.copy()
+        self.est_heading = np.zeros(n)
+        self.est_speed_kh = np.zeros(n)
+        self.body_heading = np.full(n, np.nan)  # 차량(앞쪽) 방향 추정 (Navigation.body_heading, nan = 아직 모름)
+        # 위치 필터의 예측 입력: 마지막으로 낸 명령의 (vehicle_model 번호, 차량 기준 속도, 필터 진행 방향)
+        self.command_input = (np.full(n, CODES["STOP"]), np.zeros(n), np.ones(n))
+        self.local_planners = {}  # (rollout_horizon, obstacle_radius, target_val_kh) -> RolloutPlanner
+        # 제어기 상태 (PIController + 조향 평활화)
+        self.integral = np.zeros(n)
+        self.prev_speed_ms = np.zeros(n)
+        self.last_steering = np.zeros(n)
+        self.last_command = np.full(n, STOP, dtype=np.int8)
+        self.initial_distance = np.hypot(self.goal_x - self.x, self.goal_z - self.z)
+        # 지표
+        self.time = 0.0
+        self.active = np.ones(n, dtype=bool)
+        self.time_to_goal = np.full(n, np.nan)
+        self.collisions = np.zeros(n, dtype=np.int64)
+        self.turn_reversals = np.zeros(n, dtype=np.int64)
+        self.last_turn = np.full(n, STOP, dtype=np.int8)
+        self.distance_travelled = np.zeros(n)
+        self.command_counts = np.zeros((n, len(COMMANDS) + 1), dtype=np.int64)  # 마지막 열 = STOP
+
+    def _choose(self, weights):
+        """(n, 4) 가중치에서 행마다 random.choices 와 같은 방식으로 명령 1개 샘플링 (모두 0 이면 STOP)."""
+        weights = np.where(weights > 0.0, weights, 0.0)
+        cumulative = np.cumsum(weights, axis=1)
+        total = cumulative[:, -1]
+        draw = self.rng.random(self.n) * total
+        choice = (cumulative <= draw[:, None]).sum(axis=1)
+        choice = np.minimum(choice, len(COMMANDS) - 1).astype(np.int8)
+        return np.where(total > 0.0, choice, STOP).astype(np.int8)
+
+    def _get_move(self):
+        """navigation_core.Navigation.get_move 의 벡터화 버전 (명령 인덱스 배열 반환)."""
+        p = self.params
+        dx = self.goal_x - self.nav_x
+        dz = self.goal_z - self.nav_z
+        distance = np.hypot(dx, dz)
+        arrived = distance < p["tolerance"]
+
+        lookahead = np.minimum(p["lookahead_max"], np.maximum(p["lookahead_min"], distance * 0.5))
+        safe = np.where(distance > 0.0, distance, 1.0)
+        ux, uz = dx / safe, dz / safe
+        look_x = self.nav_x + ux * lookahead
+        look_z = self.nav_z + uz * lookahead
+
+        body_heading, body_speed = self._body_state()
+        blocked = np.zeros(self.n, dtype=bool)
+        rolling = np.zeros(self.n, dtype=bool)  # 국소 계획기가 켜져 있으면 막혀도 정지하지 않고 계획기가 고름
+        if self.obstacles is not None and len(self.obstacles):
+            segments = np.stack([self.nav_x, self.nav_z, look_x, look_z], axis=1)
+            blocked = self._segments_blocked(segments, p["obstacle_radius"])
+            rolling = p["rollout_horizon"] > 0
+
+        heading_error = np.arctan2(ux, uz) - self.est_heading
+        heading_error = np.arctan2(np.sin(heading_error), np.cos(heading_error))
+        curvature = 2.0 * np.sin(heading_error) / np.maximum(lookahead, 0.01)
+        moving = ~arrived & ~(blocked & ~rolling) & self.active
+        steering = p["steering_smoothing"] * self.last_steering + (1 - p["steering_smoothing"]) * curvature
+        self.last_steering = np.where(moving, steering, self.last_steering)
+
+        speed_ms = self._compute_speed(moving)
+        abs_steering = np.abs(steering)
+        speed_ms = speed_ms * (1.0 - abs_steering * p["speed_factor"])
+        speed_ms = np.minimum(speed_ms, p["target_val_kh"] / 3.6)
+
+        valid_initial = self.initial_distance > 0
+        progress = np.where(valid_initial & (distance > 0),
+                            np.maximum(0.0, 1 - distance / np.where(valid_initial, self.initial_distance, 1.0)), 0.0)
+        turn = p["weight_D"] * (1 + abs_steering * 2)
+        weights = np.stack([
+            np.where(steering > 0, turn, 0.0),
+            np.where(steering < 0, p["weight_A"] * (1 + abs_steering * 2), 0.0),
+            p["weight_W"] * speed_ms,
+            np.where(heading_error > np.pi * 0.6, p["weight_S"], 0.0)
+        ], axis=1)
+        weights = np.where(weights > 0, weights * (1 + progress * 0.5)[:, None], weights)
+
+        chosen = self._choose(weights)
+        command = np.where(moving, chosen, STOP).astype(np.int8)
+        # 국소 계획기가 닿는 거리 안에 장애물이 있으면 샘플링 대신 계획기 명령 (정지면 추측 항법 없이 반환)
+        planned, planned_command = self._local_commands(
+            np.flatnonzero(moving & rolling), body_heading, body_speed, ux, uz, lookahead)
+        command[planned] = planned_command
+        held = np.zeros(self.n, dtype=bool)
+        held[planned] = planned_command == STOP
+        self.last_command = np.where(command != STOP, command, self.last_command)
+
+        # 추측 항법: 마지막 명령으로 차량 모델 한 스텝 진행한 위치로 내비게이터 위치를 옮김 (정지 상황 제외, get_move 와 같음)
+        max_speed = p["target_val_kh"] / 3.6
+        reckon = moving & ~held & (self.last_command != STOP)
+        x, z, _, _ = command_step(MODEL_CODES[self.last_command], self.nav_x, self.nav_z, body_heading, body_speed,
+                                  MOVE_STEP, max_speed)
+        self.nav_x = np.where(reckon, x, self.nav_x)
+        self.nav_z = np.where(reckon, z, self.nav_z)
+        # 위치 필터 예측 입력 (Navigation._command_input): 필터 진행 방향이 차량 앞이면 1, 뒤면 -1
+        direction = np.where(np.cos(body_heading - self.est_heading) >= 0.0, 1.0, -1.0)
+        self.command_input = (MODEL_CODES[command], body_speed, direction)
+
+        newly_arrived = arrived & self.active
+        self.integral = np.where(newly_arrived, 0.0, self.integral)
+        return command, newly_arrived
+
+    def _body_state(self):
+        """navigation_core.Navigation._body_state 의 벡터화 버전: 필터의 (진행 방향, 속력) 을 차량의
+        (방향, 부호 있는 속도 m/s) 로 바꿈 (직전 차량 방향과 반대쪽이면 후진으로 봄)."""
+        heading, speed = self.est_heading, self.est_speed_kh / 3.6
+        flip = np.cos(heading - self.body_heading) < 0.0  # 아직 모르면 (nan) 뒤집지 않음
+        heading = np.where(flip, np.arctan2(-np.sin(heading), -np.cos(heading)), heading)
+        speed = np.where(flip, -speed, speed)
+        self.body_heading = np.where(self.active, heading, self.body_heading)
+        return heading, speed
+
+    def _local_commands(self, rows, heading, speed, ux, uz, lookahead):
+        """rows 중 국소 계획기가 닿는 거리 안에 장애물이 있는 행과 그 행의 계획기 명령 인덱스 (안전한 후보가 없으면 STOP).
+
+        경로는 현재 위치에서 목표로 가는 직선이므로 계획기 목표는 전방 주시 선분을 LOOKAHEAD_PULLBACK_STEPS 로
+        나눈 점 중 차량에서 막히지 않는 가장 먼 점 (모두 막히면 전방 주시점, Navigation._clear_lookahead 와 같음).
+        """
+        p = self.params
+        fractions = np.arange(LOOKAHEAD_PULLBACK_STEPS, 0, -1) / LOOKAHEAD_PULLBACK_STEPS
+        planned, commands = [], []
+        for row in rows.tolist():
+            planner = self._local_planner(row)
+            x, z = float(self.nav_x[row]), float(self.nav_z[row])
+            offsets = self.obstacles - (x, z)
+            nearby = self.obstacles[np.hypot(offsets[:, 0], offsets[:, 1]) <= planner.reach(speed[row])]
+            if not len(nearby):
+                continue
+            arcs = lookahead[row] * fractions
+            points = np.stack([x + ux[row] * arcs, z + uz[row] * arcs], axis=1)
+            segments = np.column_stack([np.full((len(arcs), 2), (x, z)), points])
+            clear = np.flatnonzero(~segments_hit_mask(self.obstacles, segments, p["obstacle_radius"][row]))
+            goal = points[clear[0] if len(clear) else 0]
+            move = planner.plan((x, z, float(heading[row])), float(speed[row]), tuple(goal.tolist()), nearby)
+            planned.append(row)
+            commands.append(STOP if move is None or move == "STOP" else COMMANDS.index(move))
+        return np.array(planned, dtype=np.intp), np.array(commands, dtype=np.int8)
+
+    def _local_planner(self, row):
+        """row 의 파라미터 (rollout_horizon, obstacle_radius, target_val_kh) 로 만든 국소 계획기 (조합마다 하나)."""
+        p = self.params
+        key = (int(p["rollout_horizon"][row]), float(p["obstacle_radius"][row]), float(p["target_val_kh"][row]))
+        planner = self.local_planners.get(key)
+        if planner is None:
+            config = NavigationConfig().replace(rollout_horizon=key[0], obstacle_radius=key[1], target_val_kh=key[2])
+            planner = self.local_planners[key] = RolloutPlanner(config)
+        return planner
+
+    def _segments_blocked(self, segments, radius):
+        # 반경이 차량마다 다를 수 있으므로 최대 반경으로 후보를 거른 뒤 행별 반경과 비교
+        if np.all(radius == radius[0]):
+            return segments_hit_mask(self.obstacles, segments, radius[0])
+        blocked = np.zeros(len(segments), dtype=bool)
+        for value in np.unique(radius):
+            rows = radius == value
+            blocked[rows] = segments_hit_mask(self.obstacles, segments[rows], value)
+        return blocked
+
+    def _compute_speed(self, moving):
+        """controller.PIController.compute_speed 의 벡터화 버전."""
+        p = self.params
+        error_kh = p["target_val_kh"] - self.est_speed_kh
+        integral = np.clip(self.integral + error_kh * self.dt, -p["integral_limit"], p["integral_limit"])
+        output = p["kp_val"] * error_kh + p["ki_val"] * integral
+        speed_ms = np.minimum(output / 3.6, p["target_val_kh"] / 3.6)
+        speed_ms = p["speed_smoothing"] * self.prev_speed_ms + (1 - p["speed_smoothing"]) * speed_ms
+        self.integral = np.where(moving, integral, self.integral)
+        self.prev_speed_ms = np.where(moving, speed_ms, self.prev_speed_ms)
+        return np.maximum(0.0, speed_ms)
+
+    def _update_position(self):
+        """position_handler.PositionHandler.update_position 의 벡터화 버전 (IMU 없이 매 스텝 GNSS 위치 갱신).
+
+        IMU 가 없으므로 PositionHandler 처럼 낸 명령의 선회/가감속을 차량 모델로 먼저 반영한 뒤 예측한다."""
+        p = self.params
+        estimator = self.estimator
+        code, speed, direction = self.command_input
+        after = command_speed(code, speed, self.dt, p["target_val_kh"] / 3.6)
+        estimator.shift(YAW_RATES[code] * self.dt, direction * (after - speed))
+        estimator.predict(self.dt, 0.0, 0.0, p["process_yaw_std"] ** 2, p["process_accel_std"] ** 2)
+        estimator.update_position(self.x, self.z, p["gnss_std"] ** 2)
+        x, z, heading, speed = estimator.state.T
+
+        active = self.active
+        self.est_heading = np.where(active, heading, self.est_heading)
+        self.est_speed_kh = np.where(active, np.minimum(speed * 3.6, p["target_val_kh"]), self.est_speed_kh)
+        self.nav_x = np.where(active, x, self.nav_x)
+        self.nav_z = np.where(active, z, self.nav_z)
+
+    def _step_vehicles(self, command):
+        """simulator.VehicleSim.step 의 벡터화 버전 (같은 vehicle_model.command_step)."""
+        x, z, heading, speed = command_step(MODEL_CODES[command], self.x, self.z, self.heading, self.speed, self.dt,
+                                            self.params["target_val_kh"] / 3.6)
+        active = self.active
+        self.speed = np.where(active, speed, self.speed)
+        self.heading = np.where(active, heading, self.heading)
+        prev_x, prev_z = self.x, self.z
+        self.x = np.where(active, x, prev_x)
+        self.z = np.where(active, z, prev_z)
+        self.distance_travelled += np.hypot(self.x - prev_x, self.z - prev_z)
+
+        if self.obstacles is not None and len(self.obstacles):
+            segments = np.stack([prev_x, prev_z, self.x, self.z], axis=1)
+            self.collisions += (self._segments_blocked(segments, self.params["obstacle_radius"]) & active)
+
+    def step(self):
+        command, newly_arrived = self._get_move()
+        active = self.active
+
+        index = np.where(command == STOP, len(COMMANDS), command)
+        np.add.at(self.command_counts, (np.flatnonzero(active), index[active]), 1)
+        turning = ((command == 0) | (command == 1)) & active
+        self.turn_reversals += turning & (self.last_turn != STOP) & (command != self.last_turn)
+        self.last_turn = np.where(turning, command, self.last_turn)
+
+        self._step_vehicles(command)
+        self.time += self.dt
+        self._update_position()
+
+        reached = active & (np.hypot(self.goal_x - self.x, self.goal_z - self.z) < self.params["tolerance"])
+        self.time_to_goal = np.where(reached, self.time, self.time_to_goal)
+        self.active = active & ~reached & ~newly_arrived
+
+    def run(self, max_time=SIM_MAX_TIME):
+        """모든 차량이 도착하거나 max_time 이 지날 때까지 진행하고 지표 배열을 반환."""
+        while self.time < max_time and self.active.any():
+            self.step()
+        return {
+            "reached": ~np.isnan(self.time_to_goal),
+            "time_to_goal": self.time_to_goal,
+            "collisions": self.collisions,
+            "turn_reversals": self.turn_reversals,
+            "distance_travelled": self.distance_travelled,
+            "final_x": self.x,
+            "final_z": self.z,
+            "commands": {name: self.command_counts[:, i] for i, name in enumerate(COMMANDS + ("STOP",))}
+        }
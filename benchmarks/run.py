@@ -0,0 +1,398 @@
+# benchmarks/run.py
+# 핫 패스 벤치마크 (장애물 충돌 검사 규모별, get_move 틱 비용, 전역 경로 계획/재계획, 국소 계획기, 헤드리스 시뮬레이션 처리량,
+# 위치 파싱과 칼만 필터 (스칼라 대 NumPy), LiDAR 스캔 처리, Flask 엔드포인트 처리량)
+#
+# 실행 예 (저장소 루트에서):
+#   python -m benchmarks.run                          → 결과 JSON 출력 + baseline.json 과 비교
+#   python -m benchmarks.run --quick --output out.json
+#   python -m benchmarks.run --save-baseline          → 현재 결과를 기준값으로 저장
+# 기준값보다 threshold 배 이상 느려진 항목이 있으면 종료 코드 1.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import numpy as np
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+OBSTACLE_COUNTS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_OBSTACLE_COUNTS = (10, 1_000, 100_000)
+WORLD_SIZE = 2000.0  # 장애물을 흩뿌리는 정사각 영역 한 변 (미터)
+PLANNER_GRID_SIZE = 1000  # 전역 경로 계획 벤치마크 격자 (셀, 0.5 m 해상도 → 500 m)
+PLANNER_OBSTACLES = 20_000  # 전역 경로 계획 벤치마크의 "maze" 지도 장애물 수
+
+
+def measure(fn, number=1000, repeat=5):
+    """fn 을 number 번 호출하는 라운드를 repeat 번 반복하여 호출당 시간(마이크로초) 통계 반환."""
+    fn()  # 예열
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number * 1e6)
+    median = statistics.median(rounds)
+    return {"per_call_us": median, "min_us": min(rounds), "ops_per_sec": 1e6 / median if median else 0.0}
+
+
+def measure_prepared(setup, fn, repeat=3):
+    """매 라운드 setup() 을 (시간 밖에서) 부른 뒤 fn(state) 1회의 시간(마이크로초) 통계 반환 (상태를 소모하는 호출용)."""
+    rounds = []
+    for _ in range(repeat):
+        state = setup()
+        started = time.perf_counter()
+        fn(state)
+        rounds.append((time.perf_counter() - started) * 1e6)
+    median = statistics.median(rounds)
+    return {"per_call_us": median, "min_us": min(rounds), "ops_per_sec": 1e6 / median if median else 0.0}
+
+
+class _FixedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.1  # 호출마다 0.1초씩 진행 (dt 최소값 보정 없이 일정한 주기)
+        return self.now
+
+
+def bench_obstacle_scaling(counts):
+    """장애물 수에 따른 is_obstacle_in_path (전방 주시 길이 10 m 선분) 호출 비용."""
+    from navigation_core import Navigation
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for count in counts:
+        navigator = Navigation()
+        navigator.obstacles.add_many(rng.uniform(-WORLD_SIZE / 2, WORLD_SIZE / 2, (count, 2)))
+        segments = []
+        for ax, az, heading in rng.uniform((-500, -500, -np.pi), (500, 500, np.pi), (256, 3)):
+            segments.append((ax, az, ax + 10.0 * np.sin(heading), az + 10.0 * np.cos(heading)))
+        cursor = [0]
+
+        def check():
+            ax, az, bx, bz = segments[cursor[0] & 255]
+            cursor[0] += 1
+            navigator.is_obstacle_in_path(ax, az, bx, bz)
+
+        results[f"obstacle_in_path/{count}"] = measure(check, number=500)
+    return results
+
+
+def _tick_navigator(controller):
+    from navigation_core import Navigation
+    from config import NavigationConfig
+
+    navigator = Navigation(clock=_FixedClock(), rng=random.Random(0), config=NavigationConfig(controller=controller))
+    navigator.add_obstacles(np.random.default_rng(1).uniform(-200, 200, (2000, 2)))
+    navigator.position_handler.update_position((0.0, 0.0, 0.0))
+    navigator.set_destination((150.0, 0.0, 180.0))
+    navigator.get_move()  # 초기 경로 계획은 틱 비용에서 제외
+    return navigator
+
+
+def bench_get_move():
+    """조향 전략별 get_move 1회 비용 (매 호출 같은 위치에서 시작)."""
+    from config import STEERING_CONTROLLERS
+
+    results = {}
+    for controller in STEERING_CONTROLLERS:
+        navigator = _tick_navigator(controller)
+        handler = navigator.position_handler
+        start = (1.0, 1.0)
+
+        def tick():
+            handler.current_position = start
+            navigator.get_move()
+
+        results[f"get_move/{controller}"] = measure(tick, number=2000)
+    return results
+
+
+def bench_planner(quick=False):
+    """1000x1000 격자 전역 경로 계획 1회 (캐시/증분 상태 없이 처음부터).
+
+    지도는 빈 지도 / 장애물 2만 개 / 가운데 세로 벽(위쪽 끝으로만 돌아감), 출발→목표는 정확한 대각선 (팔각 거리
+    휴리스틱의 최선) / 비대각선 / 완만한 기울기 세 쌍.
+    """
+    from occupancy_grid import OccupancyGrid
+    from path_planner import GridPlanner, DStarLitePlanner
+
+    rng = np.random.default_rng(4)
+    half = PLANNER_GRID_SIZE * 0.5 * 0.5 - 10.0
+    pairs = {
+        "diagonal": ((-half, -half), (half, half)),
+        "offdiagonal": ((-half, -half), (half, 100.0)),
+        "shallow": ((-half, 0.0), (half, 30.0))
+    }
+    points = rng.uniform(-half - 5.0, half + 5.0, (PLANNER_OBSTACLES, 2))
+    # 출발/목표 주변은 비워 경로가 항상 존재하도록 함
+    for end in {end for pair in pairs.values() for end in pair}:
+        points = points[np.hypot(points[:, 0] - end[0], points[:, 1] - end[1]) > 6.0]
+    zs = np.arange(-half + 40.0, half - 10.0, 0.25)
+    worlds = {
+        "empty": np.empty((0, 2)),
+        "maze": points,
+        "wall": np.stack([np.zeros_like(zs), zs], axis=1)
+    }
+    planners = {
+        "jps": lambda grid: GridPlanner(grid, jump_point=True),
+        "astar": lambda grid: GridPlanner(grid, jump_point=False),
+        "dstar_lite": DStarLitePlanner
+    }
+    results = {}
+    for name, factory in planners.items():
+        if quick and name != "jps":
+            continue
+        for world, obstacles in worlds.items():
+            grid = OccupancyGrid(size=PLANNER_GRID_SIZE)
+            grid.mark_occupied(obstacles)
+            planner = factory(grid)
+            for pair, (start, goal) in pairs.items():
+                def plan():
+                    planner._cache.clear()
+                    planner._reset = True  # D* Lite: 증분 상태 없이 처음부터
+                    planner.plan(start, goal)
+
+                results[f"planner/{name}/{world}/{pair}"] = measure(plan, number=1, repeat=3)
+    return results
+
+
+def bench_replan(quick=False):
+    """경로를 가로막는 벽이 생긴 뒤의 재계획: D* Lite 증분 복구 / D* Lite 처음부터 / JPS 처음부터.
+
+    기본 창(800x800)에서 (0, 0)→(30, 150) 을 빈 지도로 계획한 뒤 z=60 에 벽을 추가한다.
+    D* Lite 를 기본 계획기로 쓰려면 repair 가 cold 보다 싸야 한다.
+    """
+    from occupancy_grid import OccupancyGrid
+    from path_planner import GridPlanner, DStarLitePlanner
+
+    start, goal = (0.0, 0.0), (30.0, 150.0)
+    xs = np.arange(-40.0, 60.0, 0.25)
+    wall = np.stack([xs, np.full_like(xs, 60.0)], axis=1)
+
+    def walled(factory):
+        grid = OccupancyGrid()
+        grid.mark_occupied(wall)
+        return factory(grid)
+
+    def planned_then_walled():
+        grid = OccupancyGrid()
+        planner = DStarLitePlanner(grid)
+        planner.plan(start, goal)
+        grid.mark_occupied(wall)
+        return planner
+
+    plan = lambda planner: planner.plan(start, goal)
+    results = {"replan/jps/cold": measure_prepared(lambda: walled(GridPlanner), plan)}
+    if not quick:
+        results["replan/dstar_lite/repair"] = measure_prepared(planned_then_walled, plan)
+        results["replan/dstar_lite/cold"] = measure_prepared(lambda: walled(DStarLitePlanner), plan)
+    return results
+
+
+def bench_local_planner():
+    """국소 계획기 1회 (후보 명령 열 전체를 굴려 첫 명령 선택) — 근처 장애물 수별."""
+    from local_planner import RolloutPlanner
+    from config import NavigationConfig
+
+    config = NavigationConfig()
+    planner = RolloutPlanner(config)
+    rng = np.random.default_rng(3)
+    results = {}
+    for count in (0, 100, 1000):
+        obstacles = rng.uniform(-11.0, 11.0, (count, 2))
+        obstacles = obstacles[np.hypot(obstacles[:, 0], obstacles[:, 1]) > 2.0]  # 차량 자리는 비움
+        results[f"local_planner/{count}"] = measure(lambda: planner.plan((0.0, 0.0, 0.3), 3.0, (2.0, 10.0), obstacles),
+                                                    number=200)
+    return results
+
+
+def bench_simulator():
+    """sweep 기본 시나리오별 run_scenario 1회 (내비게이터 생성과 전역 계획 포함) — 파라미터 탐색 처리량.
+
+    speedup 은 시뮬레이션 시간 / 실제 소요 시간 (최소값 기준, 몇 배속으로 도는지).
+    """
+    from simulator import run_scenario
+    from sweep import DEFAULT_SCENARIOS
+
+    results = {}
+    for index, scenario in enumerate(DEFAULT_SCENARIOS):
+        sim_time = []
+
+        def simulate():
+            result = run_scenario(scenario["start"], scenario["goal"], scenario["obstacles"], seed=0)
+            sim_time.append(result["sim_time"])
+
+        entry = measure(simulate, number=1, repeat=3)
+        entry["speedup"] = sim_time[-1] / (entry["min_us"] * 1e-6)
+        results[f"simulator/{index}"] = entry
+    return results
+
+
+def bench_update_position():
+    """PositionHandler.update_position (문자열/시퀀스 입력) 과 update_imu 의 처리량 (칼만 필터 예측/갱신 포함).
+
+    estimator/* 는 같은 예측 + 위치 갱신 1회를 차량 1대용 float 구현 (ScalarPoseEstimator) 과
+    NumPy 구현 (PoseEstimator(1)) 으로 비교한다.
+    """
+    from estimator import PoseEstimator, ScalarPoseEstimator
+    from position_handler import PositionHandler
+
+    handler = PositionHandler(clock=_FixedClock())
+    texts = [f"{i * 0.37:.3f},0.0,{i * 0.91:.3f}" for i in range(1024)]
+    tuples = [(i * 0.37, 0.0, i * 0.91) for i in range(1024)]
+    cursor = [0]
+
+    def parse_text():
+        handler.update_position(texts[cursor[0] & 1023])
+        cursor[0] += 1
+
+    def parse_tuple():
+        handler.update_position(tuples[cursor[0] & 1023])
+        cursor[0] += 1
+
+    def imu():
+        handler.update_imu((0.01, 0.1))
+
+    scalar = ScalarPoseEstimator()
+    vector = PoseEstimator(1)
+    scalar.reset(0.0, 0.0, 0.25)
+    vector.reset(np.zeros(1), np.zeros(1), 0.25)
+    xs, _, zs = np.array(tuples).T
+
+    def scalar_cycle():
+        index = cursor[0] & 1023
+        scalar.predict(0.1, 0.01, 0.1, 0.1, 0.5)
+        scalar.update_position(tuples[index][0], tuples[index][2], 0.25)
+        cursor[0] += 1
+
+    def vector_cycle():
+        index = cursor[0] & 1023
+        vector.predict(0.1, 0.01, 0.1, 0.1, 0.5)
+        vector.update_position(xs[index:index + 1], zs[index:index + 1], 0.25)
+        cursor[0] += 1
+
+    return {
+        "update_position/text": measure(parse_text, number=5000),
+        "update_position/sequence": measure(parse_tuple, number=5000),
+        "update_imu/sequence": measure(imu, number=5000),
+        "estimator/scalar": measure(scalar_cycle, number=5000),
+        "estimator/numpy": measure(vector_cycle, number=2000)
+    }
+
+
+def bench_scan():
+    """360° LiDAR 스캔 (0.25° 분해능, 1440 빔) 처리: 융합 단계만 / 카메라 박스 연관 포함 / 장애물 반영까지."""
+    from scan_fusion import ScanFusion
+    from navigation_core import Navigation
+
+    angles = np.linspace(-np.pi, np.pi, 1440, endpoint=False)
+    rng = np.random.default_rng(2)
+    # 반경 20 m 원형 벽에 물체 몇 개가 가린 스캔 (일부 빔은 반사 없음)
+    ranges = np.where(rng.random(1440) < 0.1, np.inf, 20.0)
+    for center in rng.uniform(-np.pi, np.pi, 6):
+        ranges[np.abs(angles - center) < 0.05] = rng.uniform(3.0, 15.0)
+    boxes = [{"x_min": 560, "x_max": 720, "label": "tank"}, {"x_min": 100, "x_max": 180, "label": "person"}]
+    fusion = ScanFusion()
+    navigator = Navigation(clock=_FixedClock())
+    navigator.position_handler.update_position((0.0, 0.0, 0.0))
+    pose = (0.0, 0.0, 0.3)
+
+    return {
+        "scan/process": measure(lambda: fusion.process(angles, ranges, pose), number=500),
+        "scan/process_boxes": measure(lambda: fusion.process(angles, ranges, pose, boxes), number=500),
+        "scan/add_scan": measure(lambda: navigator.add_scan(angles, ranges, boxes), number=200)
+    }
+
+
+def bench_flask():
+    """Flask 테스트 클라이언트로 엔드포인트 왕복 (라우팅 + JSON 직렬화 포함)."""
+    from app import app
+
+    client = app.test_client()
+    client.post('/update_position', json={"position": "0,0,0"})
+    client.post('/set_destination', json={"destination": "150,0,180"})
+    cursor = [0]
+
+    def update_position():
+        i = cursor[0] = cursor[0] + 1
+        client.post('/update_position', json={"position": f"{i % 100 * 0.1},0,{i % 100 * 0.2}"})
+
+    return {
+        "flask/update_position": measure(update_position, number=300),
+        "flask/get_move": measure(lambda: client.get('/get_move'), number=300)
+    }
+
+
+def run(quick=False):
+    results = {}
+    results.update(bench_obstacle_scaling(QUICK_OBSTACLE_COUNTS if quick else OBSTACLE_COUNTS))
+    results.update(bench_get_move())
+    results.update(bench_planner(quick))
+    results.update(bench_replan(quick))
+    results.update(bench_local_planner())
+    results.update(bench_simulator())
+    results.update(bench_update_position())
+    results.update(bench_scan())
+    results.update(bench_flask())
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick
+        },
+        "results": results
+    }
+
+
+def compare(current, baseline, threshold):
+    """기준값 대비 호출당 최소 시간 비율 (잡음이 적은 최소값 사용). threshold 이상이면 회귀로 표시."""
+    report = {}
+    for name, result in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        ratio = result["min_us"] / reference["min_us"]
+        report[name] = {"ratio": ratio, "regression": ratio >= threshold}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="내비게이션 핫 패스 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="장애물 규모를 줄여 빠르게 실행")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=1.5, help="회귀로 판단할 느려짐 배수 (기본 1.5)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    current = run(quick=args.quick)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(json.dumps(current, indent=2))
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            report = compare(current, json.load(f), args.threshold)
+        current["comparison"] = report
+        regressions = [name for name, entry in report.items() if entry["regression"]]
+        current["regressions"] = regressions
+    print(json.dumps(current, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,15 +2,32 @@
 # 내비게이션 시스템의 구성 파라미터
 
 # 이동 파라미터
-MOVE_STEP = 0.1  # 기본 이동 단위 (미터/스텝)
+MOVE_STEP = 0.1  # 추측 항법 한 스텝 (초, 다음 위치 입력 전까지 마지막 명령으로 이만큼 진행했다고 봄)
 TOLERANCE = 15.0  # 목적지 도착 허용 오차 (미터)
 LOOKAHEAD_MIN = 1.0  # 최소 전방 주시 거리 (미터)
 LOOKAHEAD_MAX = 10.0  # 최대 전방 주시 거리 (미터)
-HEADING_SMOOTHING = 0.8  # 헤딩 평활화 계수 (0~1, 1에 가까울수록 평활화 강함)
+LOOKAHEAD_PULLBACK_STEPS = 8  # 전방 주시 선분이 막히면 경로를 따라 이 개수로 나눈 지점까지 당겨 보며 막히지 않는 점을 찾음
 STEERING_SMOOTHING = 0.9  # 조향 평활화 계수 (0~1, 1에 가까울수록 평활화 강함)
-GOAL_WEIGHT = 2.0  # 목표 방향 가중치 (목표 벡터의 영향력)
 SPEED_FACTOR = 0.8  # 조향에 따른 속도 감소 계수 (0~1, 1에 가까울수록 속도 감소 큼)
 
+# 조향 제어기 (전략 이름 → "모듈:클래스", 해당 모듈은 처음 쓰일 때 가져옴)
+STEERING_CONTROLLERS = {
+    "pure_pursuit": "pure_pursuit:PurePursuit",
+    "kanayama": "canayama_algorithm:KanayamaController"
+}
+CONTROLLER = "pure_pursuit"  # 기본 조향 제어기 (세션별로 설정의 controller 값으로 교체 가능)
+KANAYAMA_KX = 1.0  # 카나야마 제어 진행 방향 오차 게인 (1/s, 기준점보다 뒤처지면 속도 증가)
+KANAYAMA_KY = 0.16  # 카나야마 제어 횡 오차 게인 (1/m^2, 임계 감쇠는 KTHETA^2 / 4)
+KANAYAMA_KTHETA = 0.8  # 카나야마 제어 방향 오차 게인 (1/m)
+KANAYAMA_MIN_SPEED_RATIO = 0.3  # 방향 오차가 커도 유지하는 기준 속도 비율 (정지 선회만으로는 GNSS 로 방향을 알 수 없음)
+
+# 국소 계획기 (local_planner.py: 장애물이 가까우면 짧은 W/A/S/D/STOP 명령 열 후보를 차량 운동 모델
+# (SIM_* 상수)로 굴려 보고 첫 명령 선택)
+ROLLOUT_HORIZON = 16  # 후보 명령 열 길이 (틱, 뒤에 정지까지의 제동 구간이 붙음, 0 이면 국소 계획 없이 정지)
+ROLLOUT_SWITCHES = 2  # 후보 열 안에서 명령이 바뀌는 최대 횟수
+ROLLOUT_SWITCH_STRIDE = 2  # 명령이 바뀔 수 있는 틱 간격
+ROLLOUT_GRID_RESOLUTION = 0.25  # 후보 궤적의 장애물 거리를 조회하는 국소 격자 해상도 (미터)
+
 # 명령별 가중치
 WEIGHT_FACTORS = {
     "D": 0.5,  # 오른쪽 조향 가중치
@@ -33,4 +50,169 @@ OBSTACLE_RADIUS = 1.0           # 장애물 반경 (미터, 충돌 검사 기준
 OBSTACLE_DETECTION_RANGE = 10.0 # 장애물 감지 최대 거리 (미터)
 OBSTACLE_SAFE_DISTANCE = 2.0    # 장애물로부터 안전 거리 (미터)
 OBSTACLE_INFLUENCE_WEIGHT = 1.5 # 장애물 회피 영향력 가중치 (회피 강도 조절)
-OBSTACLE_DECAY_FACTOR = 0.8     # 거리에 따른 장애물 영향력 감소 계수 (0~1)
\ No newline at end of file
+OBSTACLE_DECAY_FACTOR = 0.8     # 거리에 따른 장애물 영향력 감소 계수 (0~1)
+OBSTACLE_GRID_CELL_SIZE = 2.0   # 장애물 공간 인덱스 격자 크기 (미터, 반경의 2배 이상 권장)
+OBSTACLE_DEDUP_RADIUS = 0.25    # 이 크기의 복셀 안에 들어오는 장애물 점은 하나로 병합 (0 이면 병합 안 함)
+OBSTACLE_TTL = 0.0              # 마지막 관측 후 이 시간(초)이 지난 장애물 제거 (0 이면 만료 없음)
+OBSTACLE_KEEP_RADIUS = 0.0      # 차량에서 이 거리(미터)보다 먼 장애물 제거 (0 이면 제거 안 함)
+
+# 점유 격자 지도 설정
+OCCUPANCY_RESOLUTION = 0.5      # 격자 해상도 (미터/셀)
+OCCUPANCY_SIZE = 800            # 창 크기 (셀, 정사각형 / 800 x 0.5 = 400미터)
+OCCUPANCY_SCROLL_MARGIN = 0.25  # 차량이 중심에서 창 크기의 이 비율 이상 벗어나면 창 이동
+LOG_ODDS_HIT = 0.85             # 장애물 관측 시 로그 오즈 증가량
+LOG_ODDS_MISS = -0.4            # 빈 공간 관측 시 로그 오즈 감소량
+LOG_ODDS_MIN = -2.0             # 로그 오즈 하한 (포화 방지)
+LOG_ODDS_MAX = 3.5              # 로그 오즈 상한 (포화 방지)
+LOG_ODDS_OCCUPIED = 0.5         # 이 값을 넘으면 점유 셀로 판단
+
+# 전역 경로 계획 설정
+PLANNER_JUMP_POINT = True       # True 이면 점프 포인트 탐색(JPS), False 이면 일반 A*
+PLANNER_INCREMENTAL = False     # True 이면 D* Lite 증분 재계획 (장애물 추가 시 바뀐 셀 주변만 갱신). 경로를 막는 변경의
+                                # 복구가 처음부터 계획하는 것과 비슷하게 들고 JPS 보다 느려 기본은 JPS
+                                # (benchmarks replan/* 참고)
+PATH_CACHE_SIZE = 32            # 지도 버전별로 보관하는 계획 결과 수
+PATH_SEARCH_WINDOW = 30.0       # 경로 추종 시 현재 구간부터 가장 가까운 점을 찾는 호 길이 범위 (미터)
+
+# GNSS + IMU 자세 추정 (확장 칼만 필터, 상태 = [x, z, heading, speed])
+GNSS_STD = 0.5                  # GNSS 위치 측정 표준편차 (미터)
+IMU_GYRO_STD = 0.05             # IMU 각속도 적분 잡음 (rad/√s)
+IMU_ACCEL_STD = 0.5             # IMU 가속도 적분 잡음 (m/s/√s)
+PROCESS_YAW_STD = 1.0           # IMU 없이 예측할 때 heading 변화 잡음 (rad/√s, 최대 선회율 수준)
+PROCESS_ACCEL_STD = 3.0         # IMU 없이 예측할 때 속도 변화 잡음 (m/s/√s, 최대 가감속 수준)
+IMU_TIMEOUT = 0.5               # 마지막 IMU 입력 후 이 시간(초)이 지나면 IMU 없이 예측
+ESTIMATOR_RESET_DISTANCE = 20.0 # 예측 위치와 GNSS 위치가 이보다 멀면 새 위치로 필터 초기화 (순간 이동/재접속)
+
+# LiDAR 스캔 / 카메라 융합 (scan_fusion.py)
+LIDAR_RANGE_MIN = 0.3           # 이보다 가까운 반사는 차체/잡음으로 보고 버림 (미터)
+LIDAR_RANGE_MAX = 60.0          # 이 거리 이상(최대 거리 반환)은 반사 없음으로 처리 (미터)
+LIDAR_OFFSET = 0.0              # 위치 기준점에서 LiDAR 까지의 진행 방향 거리 (미터)
+SCAN_CLUSTER_GAP = 1.0          # 인접 빔 점 사이가 이보다 멀면 다른 물체로 분리 (미터)
+SCAN_MIN_CLUSTER_POINTS = 2     # 점이 이보다 적은 클러스터는 잡음으로 버림
+SCAN_VOXEL_SIZE = 0.5           # 장애물로 내보내기 전 이 크기 격자 칸마다 중심점 1개로 다운샘플링 (0 이면 안 함)
+CAMERA_HFOV = 1.5708            # 카메라 수평 화각 (라디안, LiDAR 와 같은 위치에서 진행 방향을 본다고 가정)
+CAMERA_IMAGE_WIDTH = 1280       # 검출 박스 픽셀 좌표 기준 이미지 폭
+CAMERA_MATCH_FRACTION = 0.5     # 클러스터 점의 이 비율 이상이 박스 방위 범위 안이면 해당 검출로 연관
+
+# 다중 차량 세션 설정
+DEFAULT_VEHICLE_ID = "default"  # vehicle_id 를 보내지 않는 클라이언트가 사용하는 세션
+SESSION_IDLE_TIMEOUT = 600.0    # 이 시간(초) 동안 요청이 없는 세션은 제거
+SESSION_SWEEP_INTERVAL = 30.0   # 유휴 세션 정리 주기 (초)
+
+# 헤드리스 시뮬레이션 (차량 운동학 모델) 설정
+SIM_DT = 0.1                    # 시뮬레이션 스텝 (초)
+SIM_MAX_TIME = 600.0            # 시나리오 최대 시뮬레이션 시간 (초)
+SIM_ACCEL = 2.0                 # W 명령 가속도 (m/s^2)
+SIM_BRAKE = 4.0                 # S/STOP 명령 감속도 (m/s^2)
+SIM_YAW_RATE = 0.8              # A/D 명령 선회 각속도 (rad/s)
+
+# 계측 (단계별 소요 시간, 엔드포인트 지연 히스토그램, 카운터 → /metrics)
+METRICS_ENABLED = False         # False 이면 기록 호출이 즉시 반환 (실행 중 POST /metrics 로 전환 가능)
+HISTOGRAM_SUB_BUCKETS = 32      # 2배 구간당 선형 하위 구간 수 (상대 오차 약 1/32)
+HISTOGRAM_OCTAVES = 28          # 1 마이크로초부터 2^28 마이크로초(약 268초)까지
+METRICS_EXPORT_BUCKETS = (      # Prometheus 출력용 le 경계 (초)
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# 틱 기록 (입력/출력을 열 단위 로그로 기록 → replay.py 로 재현)
+RECORD_DIR = None               # 기록 디렉터리 (None 이면 기록 안 함, 같은 디렉터리면 이어서 기록)
+RECORD_BUFFER_ROWS = 4096       # 이 행 수가 쌓이면 쓰기 스레드로 넘김
+RECORD_MAX_PENDING = 16         # 쓰기 대기 묶음 상한 (가득 차면 요청을 막지 않고 해당 묶음을 버림)
+RECORD_FLUSH_INTERVAL = 1.0     # 묶음이 차지 않아도 이 주기(초)마다 기록
+
+
+class NavigationConfig:
+    """인스턴스별 파라미터 묶음 (변경 불가, 기본값은 위 모듈 상수).
+
+    파생 상수(max_speed_ms 등)는 생성 시 한 번만 계산하므로 매 요청 경로에서는 속성 조회만 한다.
+    값을 바꾸려면 replace() 로 새 객체를 만들어 교체한다 (실행 중 교체해도 읽는 쪽은 항상 일관된 묶음을 본다).
+    """
+
+    DEFAULTS = {
+        "controller": CONTROLLER,
+        "move_step": MOVE_STEP,
+        "tolerance": TOLERANCE,
+        "lookahead_min": LOOKAHEAD_MIN,
+        "lookahead_max": LOOKAHEAD_MAX,
+        "steering_smoothing": STEERING_SMOOTHING,
+        "speed_factor": SPEED_FACTOR,
+        "weight_D": WEIGHT_FACTORS["D"],
+        "weight_A": WEIGHT_FACTORS["A"],
+        "weight_W": WEIGHT_FACTORS["W"],
+        "weight_S": WEIGHT_FACTORS["S"],
+        "target_val_kh": CONTROL_PARAMS["target_val_kh"],
+        "kp_val": CONTROL_PARAMS["kp_val"],
+        "ki_val": CONTROL_PARAMS["ki_val"],
+        "speed_smoothing": CONTROL_PARAMS["speed_smoothing"],
+        "integral_limit": CONTROL_PARAMS["integral_limit"],
+        "obstacle_radius": OBSTACLE_RADIUS,
+        "path_search_window": PATH_SEARCH_WINDOW,
+        "obstacle_ttl": OBSTACLE_TTL,
+        "obstacle_keep_radius": OBSTACLE_KEEP_RADIUS,
+        "gnss_std": GNSS_STD,
+        "imu_gyro_std": IMU_GYRO_STD,
+        "imu_accel_std": IMU_ACCEL_STD,
+        "process_yaw_std": PROCESS_YAW_STD,
+        "process_accel_std": PROCESS_ACCEL_STD,
+        "kanayama_kx": KANAYAMA_KX,
+        "kanayama_ky": KANAYAMA_KY,
+        "kanayama_ktheta": KANAYAMA_KTHETA,
+        "kanayama_min_speed_ratio": KANAYAMA_MIN_SPEED_RATIO,
+        "rollout_horizon": ROLLOUT_HORIZON
+    }
+    DERIVED = ("max_speed_ms", "gnss_var", "imu_yaw_var", "imu_accel_var", "process_yaw_var", "process_accel_var")
+    __slots__ = tuple(DEFAULTS) + DERIVED
+
+    def __init__(self, **overrides):
+        unknown = set(overrides) - set(self.DEFAULTS)
+        if unknown:
+            raise TypeError(f"알 수 없는 설정: {sorted(unknown)}")
+        for name, default in self.DEFAULTS.items():
+            value = overrides.get(name, default)
+            object.__setattr__(self, name, str(value) if isinstance(default, str) else float(value))
+        if self.controller not in STEERING_CONTROLLERS:
+            raise ValueError(f"알 수 없는 제어기: {self.controller} (가능: {sorted(STEERING_CONTROLLERS)})")
+        if self.rollout_horizon < 0 or self.rollout_horizon != int(self.rollout_horizon):
+            raise ValueError("rollout_horizon 은 0 이상의 정수여야 합니다")
+        if not 0.0 < self.lookahead_min <= self.lookahead_max:
+            raise ValueError("lookahead_min 은 0 보다 크고 lookahead_max 이하여야 합니다")
+        if self.gnss_std <= 0.0:
+            raise ValueError("gnss_std 는 0 보다 커야 합니다")
+        # 파생 상수
+        object.__setattr__(self, "max_speed_ms", self.target_val_kh / 3.6)  # 속도 상한 (m/s)
+        # 칼만 필터 잡음 분산
+        object.__setattr__(self, "gnss_var", self.gnss_std ** 2)
+        object.__setattr__(self, "imu_yaw_var", self.imu_gyro_std ** 2)
+        object.__setattr__(self, "imu_accel_var", self.imu_accel_std ** 2)
+        object.__setattr__(self, "process_yaw_var", self.process_yaw_std ** 2)
+        object.__setattr__(self, "process_accel_var", self.process_accel_std ** 2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("NavigationConfig 는 변경할 수 없습니다 (replace() 사용)")
+
+    __delattr__ = __setattr__
+
+    def __reduce__(self):
+        # __slots__ + 변경 불가 객체를 프로세스 풀로 보낼 수 있도록 생성 인자로 직렬화
+        return _config_from_dict, (self.as_dict(),)
+
+    def __eq__(self, other):
+        return isinstance(other, NavigationConfig) and self.as_dict() == other.as_dict()
+
+    def __hash__(self):
+        return hash(tuple(self.as_dict().items()))
+
+    def __repr__(self):
+        return f"NavigationConfig({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+    def replace(self, **changes):
+        """일부 값만 바꾼 새 설정 반환."""
+        return NavigationConfig(**{**self.as_dict(), **changes})
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.DEFAULTS}
+
+
+def _config_from_dict(values):
+    return NavigationConfig(**values)
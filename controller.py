@@ -1,10 +1,41 @@
+import importlib
 import time
-from config import CONTROL_PARAMS
+from config import NavigationConfig, STEERING_CONTROLLERS
+
+_steering_classes = {}  # 이미 가져온 조향 제어기 클래스 (이름 -> 클래스)
+
+
+def steering_class(name):
+    """조향 제어기 이름 → 클래스. 쓰이지 않는 전략 모듈은 가져오지 않도록 처음 요청될 때 import 한다."""
+    cls = _steering_classes.get(name)
+    if cls is None:
+        module_name, class_name = STEERING_CONTROLLERS[name].split(":")
+        cls = _steering_classes[name] = getattr(importlib.import_module(module_name), class_name)
+    return cls
+
+
+class SteeringController:
+    """조향 제어 전략의 공통 인터페이스.
+
+    steer() 는 현재 자세 (x, z, heading), 추종 경로(PathTracker)와 그 위의 진행 거리, 전방 주시점
+    (호 길이, x, z), PI 제어기의 목표 속도를 받아 (곡률 명령, 방향 오차, 속도) 를 반환한다.
+    곡률은 heading 이 증가하는 쪽(D)이 양수이다. 충돌 검사, 조향 평활화, 명령 샘플링, 추측 항법은
+    Navigation 이 모든 전략에 대해 한 곳에서 처리한다.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def steer(self, pose, path, progress, target, speed_ms):
+        raise NotImplementedError
+
 
 class PIController:
-    def __init__(self):
+    def __init__(self, clock=time.time, config=None):
+        self.clock = clock  # 시각 함수 (헤드리스 시뮬레이션에서는 가상 시계 주입)
+        self.config = config or NavigationConfig()  # 인스턴스별 제어 파라미터
         self.integral_error = 0.0  # 적분 오차
-        self.last_speed_update_time = time.time()  # 마지막 속도 업데이트 시간
+        self.last_speed_update_time = clock()  # 마지막 속도 업데이트 시간
         self.prev_speed_ms = 0.0  # 이전 속도 (평활화를 위해 추가)
 
     def reset_integral(self):
@@ -13,17 +44,18 @@ class PIController:
 
     def compute_speed(self, current_speed_kh):
         """P/I 제어를 사용하여 속도 계산."""
-        target_val_kh = CONTROL_PARAMS["target_val_kh"]
-        kp_val = CONTROL_PARAMS["kp_val"]
-        ki_val = CONTROL_PARAMS["ki_val"]
-        integral_limit = CONTROL_PARAMS["integral_limit"]
-        speed_smoothing = CONTROL_PARAMS["speed_smoothing"]
+        config = self.config
+        target_val_kh = config.target_val_kh
+        kp_val = config.kp_val
+        ki_val = config.ki_val
+        integral_limit = config.integral_limit
+        speed_smoothing = config.speed_smoothing
 
         # 현재 속도 오차
         error_kh = target_val_kh - current_speed_kh
 
         # 적분항 업데이트
-        now = time.time()
+        now = self.clock()
         dt = now - self.last_speed_update_time if now > self.last_speed_update_time else 0.01
         self.last_speed_update_time = now
         self.integral_error += error_kh * dt
@@ -36,7 +68,7 @@ class PIController:
         speed_ms = controller_output / 3.6  # km/h -> m/s
 
         # 최대 속도 제한 (target_val_kh 기준)
-        speed_ms = min(speed_ms, target_val_kh / 3.6)
+        speed_ms = min(speed_ms, config.max_speed_ms)
 
         # 속도 평활화 적용
         speed_ms = speed_smoothing * self.prev_speed_ms + (1 - speed_smoothing) * speed_ms
@@ -0,0 +1,256 @@
+# estimator.py
+# GNSS + IMU 자세 추정: 확장 칼만 필터 (상태 = [x, z, heading, speed], N 대 배치)
+#
+# heading 은 position_handler 와 같이 atan2(dx, dz) 기준이고, IMU 입력은 heading 변화율(yaw_rate, rad/s)과
+# 진행 방향 가속도(accel, m/s^2)이다. IMU 는 예측 단계의 입력으로 높은 주기로, GNSS 위치는 갱신 단계의
+# 측정으로 낮은 주기로 들어온다고 가정한다.
+# speed 는 항상 0 이상으로 유지한다 (heading = 진행 방향). 위치만 관측하면 (heading, speed) 와
+# (heading + pi, -speed) 가 구별되지 않으므로, speed 가 음수가 되면 같은 운동의 앞쪽 표현으로 바꾼다.
+#
+# PoseEstimator 는 N 대 배치용으로, 모든 행렬과 중간 버퍼를 생성 시 한 번 할당하고 예측/갱신은 out= 인자와
+# 미리 만든 뷰만 사용하므로 호출마다 배열을 새로 만들지 않는다. 차량 1대(PositionHandler)는 4x4 행렬 계산보다
+# NumPy 호출 오버헤드가 훨씬 크므로 같은 식을 파이썬 float 로 계산하는 ScalarPoseEstimator 를 쓴다.
+
+import math
+import numpy as np
+
+X, Z, HEADING, SPEED = range(4)
+INITIAL_HEADING_STD = math.pi  # 첫 GNSS 위치로 초기화할 때 heading 불확실성 (모름)
+INITIAL_SPEED_STD = 5.0        # 첫 GNSS 위치로 초기화할 때 speed 불확실성 (m/s)
+
+
+class PoseEstimator:
+    """N 대 차량의 확장 칼만 필터 (배치 시뮬레이터용)."""
+
+    def __init__(self, n=1):
+        self.n = n
+        self.state = np.zeros((n, 4))
+        self.cov = np.zeros((n, 4, 4))
+        # 상태 열 뷰
+        self._x = self.state[:, X]
+        self._z = self.state[:, Z]
+        self._heading = self.state[:, HEADING]
+        self._speed = self.state[:, SPEED]
+        # 예측 단계: 야코비안 F (대각은 항상 1, 위치 행의 heading/speed 열만 매번 갱신)
+        self._F = np.zeros((n, 4, 4))
+        self._F[:, range(4), range(4)] = 1.0
+        self._F_T = self._F.transpose(0, 2, 1)
+        self._dx_dheading = self._F[:, X, HEADING]
+        self._dx_dspeed = self._F[:, X, SPEED]
+        self._dz_dheading = self._F[:, Z, HEADING]
+        self._dz_dspeed = self._F[:, Z, SPEED]
+        self._heading_var = self.cov[:, HEADING, HEADING]
+        self._speed_var = self.cov[:, SPEED, SPEED]
+        self._sin = np.empty(n)
+        self._cos = np.empty(n)
+        self._tmp = np.empty(n)
+        self._T = np.empty((n, 4, 4))
+        self._negative = np.empty(n, dtype=bool)
+        self._sign = np.empty(n)
+        self._sign_col = self._sign[:, None]
+        self._cov_speed_row = self.cov[:, SPEED, :]
+        self._cov_speed_col = self.cov[:, :, SPEED]
+        # 갱신 단계: 측정 행렬 H 는 [x, z] 선택이라 P 의 앞 두 열/행 뷰로 대신함
+        self._P_cols = self.cov[:, :, :2]
+        self._P_rows = self.cov[:, :2, :]
+        self._P_top = self.cov[:, :2, :2]
+        self._cov_T = self.cov.transpose(0, 2, 1)
+        self._S = np.empty((n, 2, 2))
+        self._S_inv = np.empty((n, 2, 2))
+        self._S_entries = tuple(self._S[:, i, j] for i in range(2) for j in range(2))
+        self._S_inv_entries = tuple(self._S_inv[:, i, j] for i in range(2) for j in range(2))
+        self._det = np.empty(n)
+        self._K = np.empty((n, 4, 2))
+        self._innovation = np.empty((n, 2, 1))
+        self._innovation_x = self._innovation[:, 0, 0]
+        self._innovation_z = self._innovation[:, 1, 0]
+        self._correction = np.empty((n, 4, 1))
+        self._correction_flat = self._correction[:, :, 0]
+
+    def reset(self, x, z, position_var, heading=0.0, speed=0.0,
+              heading_std=INITIAL_HEADING_STD, speed_std=INITIAL_SPEED_STD):
+        """상태를 주어진 값으로, 공분산을 위치는 position_var, heading/speed 는 주어진 불확실성으로 초기화."""
+        self._x[:] = x
+        self._z[:] = z
+        self._heading[:] = heading
+        self._speed[:] = speed
+        self.cov[:] = 0.0
+        self.cov[:, X, X] = position_var
+        self.cov[:, Z, Z] = position_var
+        self._heading_var[:] = heading_std * heading_std
+        self._speed_var[:] = speed_std * speed_std
+
+    def predict(self, dt, yaw_rate=0.0, accel=0.0, yaw_var=0.0, accel_var=0.0):
+        """dt 초만큼 등각속도/등가속도 모델로 진행. yaw_var/accel_var 는 초당 과정 잡음 분산 (스칼라 또는 (n,))."""
+        heading, speed, tmp = self._heading, self._speed, self._tmp
+        np.sin(heading, out=self._sin)
+        np.cos(heading, out=self._cos)
+        # 야코비안 (진행 전 상태 기준)
+        np.multiply(speed, self._cos, out=tmp)
+        np.multiply(tmp, dt, out=self._dx_dheading)
+        np.multiply(self._sin, dt, out=self._dx_dspeed)
+        np.multiply(speed, self._sin, out=tmp)
+        np.multiply(tmp, -dt, out=self._dz_dheading)
+        np.multiply(self._cos, dt, out=self._dz_dspeed)
+        # 상태 진행: x += v sin(h) dt, z += v cos(h) dt, h += yaw_rate dt, v += accel dt
+        np.multiply(speed, self._dx_dspeed, out=tmp)
+        self._x += tmp
+        np.multiply(speed, self._dz_dspeed, out=tmp)
+        self._z += tmp
+        np.multiply(yaw_rate, dt, out=tmp)
+        heading += tmp
+        self._wrap_heading()
+        np.multiply(accel, dt, out=tmp)
+        speed += tmp
+        # P = F P F^T + Q dt
+        np.matmul(self._F, self.cov, out=self._T)
+        np.matmul(self._T, self._F_T, out=self.cov)
+        np.multiply(yaw_var, dt, out=tmp)
+        self._heading_var += tmp
+        np.multiply(accel_var, dt, out=tmp)
+        self._speed_var += tmp
+        self._forward()
+
+    def shift(self, heading_change, speed_change):
+        """heading/speed 를 바로 바꿈 (틱 시작에 선회/가감속을 한 번에 반영하는 차량 모델의 명령 입력, 스칼라 또는 (n,))."""
+        self._heading += heading_change
+        self._speed += speed_change
+        self._wrap_heading()
+        self._forward()
+
+    def update_position(self, x, z, position_var):
+        """GNSS 위치 (x, z) 측정(분산 position_var)으로 갱신 (스칼라 또는 (n,))."""
+        np.subtract(x, self._x, out=self._innovation_x)
+        np.subtract(z, self._z, out=self._innovation_z)
+        # S = H P H^T + R, 2x2 역행렬은 직접 계산
+        s00, s01, s10, s11 = self._S_entries
+        i00, i01, i10, i11 = self._S_inv_entries
+        det = self._det
+        np.copyto(self._S, self._P_top)
+        s00 += position_var
+        s11 += position_var
+        np.multiply(s00, s11, out=det)
+        np.multiply(s01, s10, out=self._tmp)
+        det -= self._tmp
+        np.divide(s11, det, out=i00)
+        np.divide(s00, det, out=i11)
+        np.divide(s01, det, out=i01)
+        np.negative(i01, out=i01)
+        np.divide(s10, det, out=i10)
+        np.negative(i10, out=i10)
+        # K = P H^T S^-1, 상태 += K y, P -= K H P (대칭 유지)
+        np.matmul(self._P_cols, self._S_inv, out=self._K)
+        np.matmul(self._K, self._innovation, out=self._correction)
+        self.state += self._correction_flat
+        self._wrap_heading()
+        np.matmul(self._K, self._P_rows, out=self._T)
+        self.cov -= self._T
+        np.add(self.cov, self._cov_T, out=self._T)
+        np.multiply(self._T, 0.5, out=self.cov)
+        self._forward()
+
+    def _forward(self):
+        """speed < 0 인 차량을 (heading + pi, -speed) 로 바꾸고 공분산의 speed 행/열 부호도 뒤집음."""
+        np.less(self._speed, 0.0, out=self._negative)
+        if not self._negative.any():
+            return
+        np.copysign(1.0, self._speed, out=self._sign)
+        np.subtract(1.0, self._sign, out=self._tmp)
+        self._tmp *= 0.5 * math.pi
+        self._heading += self._tmp
+        self._wrap_heading()
+        np.abs(self._speed, out=self._speed)
+        self._cov_speed_row *= self._sign_col
+        self._cov_speed_col *= self._sign_col
+
+    def _wrap_heading(self):
+        heading = self._heading
+        heading += math.pi
+        np.mod(heading, 2.0 * math.pi, out=heading)
+        heading -= math.pi
+
+
+class ScalarPoseEstimator:
+    """차량 1대용 PoseEstimator (같은 식을 파이썬 float 로 계산, state 는 [x, z, heading, speed] 목록).
+
+    state 와 cov (4x4 중첩 목록) 는 reset 에서만 만들고 예측/갱신은 그 자리에서 값만 바꾼다.
+    """
+
+    def __init__(self):
+        self.state = [0.0, 0.0, 0.0, 0.0]
+        self.cov = [[0.0] * 4 for _ in range(4)]
+
+    def reset(self, x, z, position_var, heading=0.0, speed=0.0,
+              heading_std=INITIAL_HEADING_STD, speed_std=INITIAL_SPEED_STD):
+        self.state[:] = (x, z, heading, speed)
+        for row in self.cov:
+            row[:] = (0.0, 0.0, 0.0, 0.0)
+        self.cov[X][X] = self.cov[Z][Z] = position_var
+        self.cov[HEADING][HEADING] = heading_std * heading_std
+        self.cov[SPEED][SPEED] = speed_std * speed_std
+
+    def predict(self, dt, yaw_rate=0.0, accel=0.0, yaw_var=0.0, accel_var=0.0):
+        state = self.state
+        x, z, heading, speed = state
+        sin_h = math.sin(heading) * dt
+        cos_h = math.cos(heading) * dt
+        # 야코비안의 위치 행 (나머지는 단위 행렬)
+        a, b = speed * cos_h, sin_h
+        c, d = -speed * sin_h, cos_h
+        state[X] = x + speed * sin_h
+        state[Z] = z + speed * cos_h
+        state[HEADING] = heading + yaw_rate * dt
+        state[SPEED] = speed + accel * dt
+        # P = F P F^T: 위치 행을 바꾼 뒤 (heading/speed 행은 그대로) 위치 열을 같은 방식으로 바꿈
+        P0, P1, P2, P3 = self.cov
+        for j in range(4):
+            P0[j] = P0[j] + a * P2[j] + b * P3[j]
+            P1[j] = P1[j] + c * P2[j] + d * P3[j]
+        for r in self.cov:
+            r[0], r[1] = r[0] + a * r[2] + b * r[3], r[1] + c * r[2] + d * r[3]
+        P2[HEADING] += yaw_var * dt
+        P3[SPEED] += accel_var * dt
+        self._forward()
+
+    def shift(self, heading_change, speed_change):
+        self.state[HEADING] += heading_change
+        self.state[SPEED] += speed_change
+        self._forward()
+
+    def update_position(self, x, z, position_var):
+        P = self.cov
+        state = self.state
+        y0 = x - state[X]
+        y1 = z - state[Z]
+        s00 = P[0][0] + position_var
+        s01 = P[0][1]
+        s10 = P[1][0]
+        s11 = P[1][1] + position_var
+        det = s00 * s11 - s01 * s10
+        i00, i01, i10, i11 = s11 / det, -s01 / det, -s10 / det, s00 / det
+        # K = P H^T S^-1 (H 는 x, z 선택), P -= K H P 는 갱신 전 위치 행 (P0, P1) 으로 계산
+        p00, p01, p02, p03 = P[0]
+        p10, p11, p12, p13 = P[1]
+        for i in range(4):
+            r = P[i]
+            k0 = r[0] * i00 + r[1] * i10
+            k1 = r[0] * i01 + r[1] * i11
+            state[i] = state[i] + k0 * y0 + k1 * y1
+            r[0] = r[0] - k0 * p00 - k1 * p10
+            r[1] = r[1] - k0 * p01 - k1 * p11
+            r[2] = r[2] - k0 * p02 - k1 * p12
+            r[3] = r[3] - k0 * p03 - k1 * p13
+        for i in range(4):
+            for j in range(i + 1, 4):
+                P[i][j] = P[j][i] = 0.5 * (P[i][j] + P[j][i])
+        self._forward()
+
+    def _forward(self):
+        state = self.state
+        if state[SPEED] < 0.0:
+            state[HEADING] += math.pi
+            state[SPEED] = -state[SPEED]
+            for i in range(3):
+                self.cov[i][SPEED] = -self.cov[i][SPEED]
+                self.cov[SPEED][i] = -self.cov[SPEED][i]
+        state[HEADING] = (state[HEADING] + math.pi) % (2.0 * math.pi) - math.pi
@@ -0,0 +1,215 @@
+# local_planner.py
+# 국소 계획기: 짧은 구간의 W/A/S/D/STOP 명령 열 후보 수천 개를 차량 운동 모델로 한 번에 굴려 보고(rollout)
+# 장애물 비용과 목표 진행으로 점수를 매긴 뒤, 가장 좋은 열의 첫 명령을 고른다.
+#
+# 운동 모델은 vehicle_model (simulator.VehicleSim 과 같은 모델): 틱(SIM_DT)마다 W/S 는 가감속,
+# A/D 는 현재 속도를 유지한 채 선회, STOP 은 0 을 향해 제동하고, 새 heading 방향으로 현재 속도만큼 이동한다.
+# 후보 열마다 heading 변화량(단위 복소수 e^{i·변화량})과 같은 명령이 이어지는 구간 표는 속도와 무관하므로
+# (horizon, 전환 횟수, 전환 간격)마다 한 번만 만든다. 틱마다 구간 시작 속도만 구간 수만큼 굴리고, 구간 안의 속도는
+# 닫힌 식으로 후보 전체에 대해 한 번에 계산한다.
+#
+# 모든 후보 뒤에는 멈출 때까지의 제동 구간을 붙여 함께 검사하고, 첫 명령 뒤 바로 제동해도 충돌하지 않는
+# 첫 명령만 고른다. 그래서 다음 틱에는 항상 "전부 제동" 후보가 안전하게 남는다.
+# 목표 비용(목표까지 거리의 합)은 제동 구간까지 더해 멈춘 위치가 목표에 가까운 열을 고른다.
+# 장애물 거리는 후보 궤적을 덮는 국소 격자에서 거리 변환(행 방향 최근접 칸 + 열 방향 이동 최소)으로 한 번
+# 구하고 궤적 점마다 조회하며, 격자 오차보다 가까운 장애물만 정확한 거리로 따로 검사한다.
+
+import itertools
+import math
+import numpy as np
+from vehicle_model import COMMANDS, YAW_RATES, command_speed
+from config import (
+    OBSTACLE_SAFE_DISTANCE, OBSTACLE_INFLUENCE_WEIGHT, ROLLOUT_SWITCHES, ROLLOUT_SWITCH_STRIDE,
+    ROLLOUT_GRID_RESOLUTION, SIM_DT, SIM_BRAKE
+)
+
+A, D, STOP = (COMMANDS.index(command) for command in ("A", "D", "STOP"))
+YAW_STEPS = YAW_RATES * SIM_DT  # 명령별 heading 변화 (D 가 양수)
+_FAR = 1 << 20  # 거리 변환에서 "장애물 없음" 칸 번호
+
+_rollout_tables = {}  # (horizon, tail, switches, stride) -> _RolloutTable
+
+
+def rollout_sequences(horizon, switches=ROLLOUT_SWITCHES, stride=ROLLOUT_SWITCH_STRIDE):
+    """명령이 최대 switches 번, stride 스텝 간격의 시점에만 바뀌는 길이 horizon 명령 열 (K, H) (COMMANDS 번호).
+
+    같은 명령으로 이어지는 구간 분할만 다른 열은 하나만 남기며, 정렬된 순서라 항상 같은 표가 나온다.
+    """
+    points = range(stride, horizon, stride)  # 명령이 바뀔 수 있는 스텝
+    sequences = set()
+    for count in range(switches + 1):
+        for bounds in itertools.combinations(points, count):
+            lengths = np.diff((0,) + bounds + (horizon,))
+            for commands in itertools.product(range(len(COMMANDS)), repeat=count + 1):
+                sequences.add(tuple(np.repeat(commands, lengths).tolist()))
+    return np.array(sorted(sequences), dtype=np.int8).reshape(-1, horizon)
+
+
+def braking_steps(max_speed):
+    """최대 속도(전진) 또는 그 절반(후진)에서 STOP 으로 멈출 때까지의 스텝 수."""
+    return int(math.ceil(max_speed / (SIM_BRAKE * SIM_DT))) + 1
+
+
+class _RolloutTable:
+    """후보 열과 속도에 무관한 미리 계산한 표."""
+
+    def __init__(self, horizon, tail, switches, stride):
+        prefixes = rollout_sequences(horizon, switches, stride)
+        # 첫 명령 뒤 바로 제동하는 열 (첫 명령의 안전 여부 판단용)
+        brakes = np.full((len(COMMANDS), horizon), STOP, dtype=np.int8)
+        brakes[:, 0] = np.arange(len(COMMANDS))
+        prefixes = np.unique(np.vstack([prefixes, brakes]), axis=0)
+        self.sequences = sequences = np.hstack([prefixes, np.full((len(prefixes), tail), STOP, dtype=np.int8)])
+        self.brake_rows = np.array([np.flatnonzero((prefixes == row).all(axis=1))[0] for row in brakes])
+        self.turn = np.exp(1j * np.cumsum(YAW_STEPS[sequences], axis=1))  # heading 변화 e^{i·δ} (K, T)
+        # 속도는 A/D 를 구별하지 않으므로 (둘 다 속도 유지) A/D 를 합친 서로 다른 열에 대해서만 굴리고 펼침
+        rows, index = np.unique(np.where(sequences == D, A, sequences), axis=0, return_inverse=True)
+        self.speed_rows, self.speed_index = rows, index.ravel()
+        # 같은 명령이 이어지는 구간: 틱별 구간 번호와 구간 안에서 몇 번째 틱인지 (1부터)
+        count, steps = rows.shape
+        changed = np.ones(rows.shape, dtype=bool)
+        changed[:, 1:] = rows[:, 1:] != rows[:, :-1]
+        run = np.cumsum(changed, axis=1) - 1
+        starts = np.where(changed, np.arange(steps), 0)
+        self.elapsed = np.arange(1, steps + 1) - np.maximum.accumulate(starts, axis=1)
+        runs = int(run.max()) + 1
+        self.run_index = run + runs * np.arange(count)[:, None]  # (K', T) → 구간 시작 속도 (K' * R) 평탄 번호
+        self.run_commands = np.full((count, runs), STOP, dtype=np.int8)
+        self.run_lengths = np.zeros((count, runs))
+        rows_index = np.repeat(np.arange(count), steps)
+        self.run_commands[rows_index, run.ravel()] = rows.ravel()
+        np.add.at(self.run_lengths, (rows_index, run.ravel()), 1.0)
+
+    def speeds(self, speed, max_speed):
+        """speed 에서 시작해 굴린 후보별 틱별 속도 (K, T) (vehicle_model.command_speed 의 가감속/제동)."""
+        starts = np.empty(self.run_commands.shape)
+        v = np.full(len(starts), float(speed))
+        for run in range(starts.shape[1]):
+            starts[:, run] = v
+            v = _advance(self.run_commands[:, run], v, self.run_lengths[:, run], max_speed)
+        speeds = _advance(self.speed_rows, starts.ravel()[self.run_index], self.elapsed, max_speed)
+        return speeds[self.speed_index]
+
+
+def _advance(commands, v, steps, max_speed):
+    """속도 v 에서 같은 명령을 steps 틱 이어 간 뒤의 속도 (가감속은 목표 속도에 닿으면 멈추므로 틱을 묶어도 같음)."""
+    return command_speed(commands, v, steps * SIM_DT, max_speed)
+
+
+def _rollout_table(horizon, tail, switches, stride):
+    key = (horizon, tail, switches, stride)
+    table = _rollout_tables.get(key)
+    if table is None:
+        table = _rollout_tables[key] = _RolloutTable(horizon, tail, switches, stride)
+    return table
+
+
+def distance_grid(obstacles, min_x, min_z, shape, resolution, limit):
+    """(min_x, min_z) 에서 시작하는 shape 격자의 칸별 최근접 장애물 거리 (미터, limit 칸 이상은 limit 칸 거리).
+
+    장애물을 칸에 찍은 뒤 행마다 가장 가까운 장애물 열을 앞뒤 누적 최대/최소로 구하고,
+    열 방향으로 ±limit 칸 이동한 값과의 최소를 취해 (칸 중심 사이) 유클리드 거리를 얻는다.
+    """
+    rows, cols = shape
+    occupied = np.zeros(shape, dtype=bool)
+    if len(obstacles):
+        ix = np.floor((obstacles[:, 0] - min_x) / resolution).astype(np.intp)
+        iz = np.floor((obstacles[:, 1] - min_z) / resolution).astype(np.intp)
+        inside = (ix >= 0) & (ix < rows) & (iz >= 0) & (iz < cols)
+        occupied[ix[inside], iz[inside]] = True
+    columns = np.arange(cols)
+    before = np.maximum.accumulate(np.where(occupied, columns, -_FAR), axis=1)
+    after = np.minimum.accumulate(np.where(occupied, columns, _FAR)[:, ::-1], axis=1)[:, ::-1]
+    along = np.minimum(np.minimum(columns - before, after - columns), limit).astype(np.float64)
+    best = along * along
+    along = best.copy()
+    for shift in range(1, min(limit, rows - 1) + 1):
+        offset = float(shift * shift)
+        np.minimum(best[shift:], along[:-shift] + offset, out=best[shift:])
+        np.minimum(best[:-shift], along[shift:] + offset, out=best[:-shift])
+    return np.sqrt(np.minimum(best, float(limit * limit))) * resolution
+
+
+class RolloutPlanner:
+    """명령 열 후보를 차량 운동 모델로 굴려 첫 명령을 고르는 국소 계획기 (차량마다 하나, 설정은 Navigation 이 교체)."""
+
+    def __init__(self, config):
+        self.config = config
+        self.last_stats = None  # 마지막 계획의 후보 수 / 안전한 후보 수 / 근처 장애물 수
+
+    def reach(self, speed):
+        """speed (m/s) 에서 시작한 후보 궤적이 닿을 수 있는 거리 + 장애물 영향 거리 (주변 장애물 조회 반경)."""
+        config = self.config
+        horizon = int(config.rollout_horizon)
+        top = max(abs(speed), config.max_speed_ms)
+        return top * SIM_DT * (horizon + braking_steps(config.max_speed_ms)) + \
+            config.obstacle_radius + OBSTACLE_SAFE_DISTANCE + 2.0 * ROLLOUT_GRID_RESOLUTION
+
+    def swept(self):
+        """틱 끝점이 모두 이 거리 밖이면 틱 사이 이동 선분도 장애물 반경 밖에 있음 (최대 속도 한 틱 기준)."""
+        config = self.config
+        chord = config.max_speed_ms * SIM_DT
+        return math.sqrt(config.obstacle_radius ** 2 + 0.25 * chord * chord)
+
+    def clearance(self):
+        """격자로 조회한 궤적 점과 장애물 사이에 요구하는 거리 (swept + 격자 양자화 오차)."""
+        return self.swept() + ROLLOUT_GRID_RESOLUTION * math.sqrt(2.0)
+
+    def plan(self, pose, speed, goal, obstacles):
+        """pose = (x, z, heading), speed = 현재 속도 (m/s), goal = (x, z), obstacles = 근처 장애물 (M, 2).
+
+        가장 비용이 낮은 후보 열의 첫 명령을 반환하며, 고를 수 있는 안전한 후보가 없으면 None.
+        """
+        config = self.config
+        horizon = int(config.rollout_horizon)
+        max_speed = config.max_speed_ms
+        table = _rollout_table(horizon, braking_steps(max_speed), ROLLOUT_SWITCHES, ROLLOUT_SWITCH_STRIDE)
+        sequences = table.sequences
+        x, z, heading = pose
+        # 틱마다 heading + 변화량 방향 e^{i(h + δ)} = cos + i sin (z 성분이 실수부)으로 이동한 누적 위치 (차량 기준)
+        steps = np.cumsum(table.speeds(speed, max_speed) * table.turn * (SIM_DT * complex(math.cos(heading),
+                                                                                          math.sin(heading))), axis=1)
+        dx, dz = steps.imag.copy(), steps.real.copy()  # 연속 배열로 한 번 복사 (복소수 배열의 뷰는 보폭이 있어 느림)
+
+        # 목표 비용은 제동 구간까지 합산 (멈춘 위치가 목표에 가까운 열일수록 유리, 짧은 horizon 의 제자리 맴돌기 방지)
+        # 거리는 복소수 절댓값으로 계산 (np.hypot 보다 몇 배 빠름)
+        cost = np.abs(steps - complex(goal[1] - z, goal[0] - x)).sum(axis=1)
+        if len(obstacles):
+            resolution = ROLLOUT_GRID_RESOLUTION
+            radius = config.obstacle_radius
+            clearance = self.clearance()
+            limit = int(math.ceil((radius + OBSTACLE_SAFE_DISTANCE) / resolution)) + 1
+            margin = limit * resolution
+            offsets = np.asarray(obstacles, dtype=np.float64) - (x, z)
+            gaps = np.hypot(offsets[:, 0], offsets[:, 1])
+            # 격자 오차 안쪽(격자로는 지금 자리도 충돌로 볼 수 있는 거리)의 장애물은 격자에서 빼고 정확한 거리로 검사
+            inside = gaps < clearance + resolution * math.sqrt(2.0)
+            min_x = min(0.0, float(dx.min())) - margin
+            min_z = min(0.0, float(dz.min())) - margin
+            shape = (int((max(0.0, float(dx.max())) + margin - min_x) / resolution) + 1,
+                     int((max(0.0, float(dz.max())) + margin - min_z) / resolution) + 1)
+            grid = distance_grid(offsets[~inside], min_x, min_z, shape, resolution, limit)
+            cells = ((dx - min_x) / resolution).astype(np.intp) * shape[1] + ((dz - min_z) / resolution).astype(np.intp)
+            nearest = grid.ravel()[cells]
+            collision = (nearest < clearance).any(axis=1)
+            # 이미 swept 보다 가까우면 지금보다 가까워지는 열만 충돌
+            swept = self.swept()
+            for (ox, oz), gap in zip(offsets[inside].tolist(), gaps[inside].tolist()):
+                distance = np.abs(steps - complex(oz, ox))
+                collision |= (distance < min(gap, swept)).any(axis=1)
+                np.minimum(nearest, distance, out=nearest)
+            # 영향 비용은 명령 구간만 (제동 구간은 안전 검사용, 멈춘 뒤의 같은 점이 반복되어 정지 열을 과하게 벌함)
+            cost += OBSTACLE_INFLUENCE_WEIGHT * np.maximum(
+                0.0, OBSTACLE_SAFE_DISTANCE - (nearest[:, :horizon] - radius)).sum(axis=1)
+            cost[collision] = np.inf
+
+        first = sequences[:, 0]
+        # 첫 명령 뒤 바로 제동했을 때 충돌하는 첫 명령은 제외
+        cost[np.isinf(cost[table.brake_rows])[first]] = np.inf
+
+        best = int(np.argmin(cost))
+        safe = int(np.isfinite(cost).sum())
+        self.last_stats = {"rollouts": len(sequences), "safe": safe, "obstacles": len(obstacles)}
+        if not safe:
+            return None
+        return COMMANDS[first[best]]
@@ -0,0 +1,166 @@
+# metrics.py
+# 계측: 단계별 소요 시간, 엔드포인트 지연 히스토그램(고정 메모리), 카운터 → Prometheus 텍스트 형식
+#
+# 비활성화 상태에서는 기록 함수가 enabled 확인 후 즉시 반환하고, stage_timer() 는 아무것도 하지 않는
+# 공용 객체를 돌려주므로 요청 경로의 추가 비용은 속성 조회/빈 메서드 호출 수준이다.
+
+import math
+import threading
+from array import array
+from time import perf_counter
+from config import METRICS_ENABLED, HISTOGRAM_SUB_BUCKETS, HISTOGRAM_OCTAVES, METRICS_EXPORT_BUCKETS
+
+HELP = {
+    "navigation_stage_seconds": "get_move 단계별 소요 시간",
+    "http_request_seconds": "엔드포인트별 요청 처리 시간",
+    "websocket_tick_seconds": "WebSocket 메시지 처리 시간",
+    "navigation_stop_total": "STOP 명령 사유별 횟수",
+    "navigation_commands_total": "명령별 선택 횟수",
+    "navigation_obstacles_scanned_total": "충돌 검사에서 거리 계산한 장애물 수"
+}
+
+
+class LatencyHistogram:
+    """HDR 방식 로그-선형 히스토그램 (초 단위 입력, 마이크로초 해상도, 크기 고정).
+
+    2배 구간마다 HISTOGRAM_SUB_BUCKETS 개의 선형 하위 구간을 두어 상대 오차를 일정하게 유지한다.
+    """
+
+    def __init__(self, sub_buckets=HISTOGRAM_SUB_BUCKETS, octaves=HISTOGRAM_OCTAVES):
+        self.sub_buckets = sub_buckets
+        self.counts = array("q", bytes(8 * (1 + octaves * sub_buckets)))
+        self.count = 0
+        self.sum = 0.0
+
+    def _index(self, seconds):
+        micros = seconds * 1e6
+        if micros < 1.0:
+            return 0
+        mantissa, exponent = math.frexp(micros)  # micros = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        index = 1 + (exponent - 1) * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+        return min(index, len(self.counts) - 1)
+
+    def upper_bound(self, index):
+        """버킷 index 의 상한 (초)."""
+        if index == 0:
+            return 1e-6
+        exponent, sub = divmod(index - 1, self.sub_buckets)
+        return (0.5 + (sub + 1) / (2 * self.sub_buckets)) * 2.0 ** (exponent + 1) * 1e-6
+
+    def record(self, seconds):
+        self.counts[self._index(seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """q 분위 값 (해당 버킷 상한, 기록이 없으면 0)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.upper_bound(index)
+        return self.upper_bound(len(self.counts) - 1)
+
+    def cumulative(self, bounds):
+        """각 경계 이하로 기록된 누적 개수 (Prometheus le 버킷)."""
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            while index < len(self.counts) and self.upper_bound(index) <= bound:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+
+class _NullTimer:
+    def mark(self, stage):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class StageTimer:
+    """이전 mark 이후 경과 시간을 단계 이름으로 기록."""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.last = perf_counter()
+
+    def mark(self, stage):
+        now = perf_counter()
+        self.metrics.observe(self.name, now - self.last, (("stage", stage),))
+        self.last = now
+
+
+class Metrics:
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.counters = {}    # 이름 -> {레이블 튜플: 값}
+        self.histograms = {}  # 이름 -> {레이블 튜플: LatencyHistogram}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, labels=()):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, seconds, labels=()):
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def stage_timer(self, name="navigation_stage_seconds"):
+        return StageTimer(self, name) if self.enabled else NULL_TIMER
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = histogram.cumulative(METRICS_EXPORT_BUCKETS)
+                    for bound, count in zip(METRICS_EXPORT_BUCKETS, cumulative):
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_labels(labels)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+metrics = Metrics()  # 프로세스 전역 계측 저장소 (모든 세션이 공유)
@@ -1,18 +1,41 @@
 import math
 import random
+import time
 import numpy as np
 from position_handler import PositionHandler
-from controller import PIController
+from controller import PIController, steering_class
+from obstacle_index import ObstacleIndex, segments_hit_mask, describe_obstacles
+from occupancy_grid import OccupancyGrid
+from path_planner import GridPlanner, DStarLitePlanner
+from path_tracker import PathTracker
+from scan_fusion import ScanFusion
+from local_planner import RolloutPlanner
+from metrics import metrics
+from vehicle_model import CODES, command_step
 from config import (
-    MOVE_STEP, TOLERANCE, LOOKAHEAD_MIN, LOOKAHEAD_MAX,
-    GOAL_WEIGHT, WEIGHT_FACTORS, SPEED_FACTOR, STEERING_SMOOTHING,
-    OBSTACLE_RADIUS, CONTROL_PARAMS
+    PLANNER_INCREMENTAL, LOOKAHEAD_PULLBACK_STEPS, NavigationConfig
 )
 
+PATH_CHECK_CHUNK = 256  # 새 장애물과 경로 충돌 검사 시 한 번에 보는 구간 수
+
+# 계측 레이블 (매 호출마다 튜플을 만들지 않도록 미리 생성)
+_STOP_PAUSED = (("reason", "paused"),)
+_STOP_NOT_READY = (("reason", "not_ready"),)
+_STOP_ARRIVED = (("reason", "arrived"),)
+_STOP_OBSTACLE = (("reason", "obstacle"),)
+_STOP_NO_COMMAND = (("reason", "no_command"),)
+_COMMAND_LABELS = {cmd: (("command", cmd),) for cmd in ("W", "A", "S", "D")}
+
 class Navigation:
-    def __init__(self):
-        self.position_handler = PositionHandler()
-        self.controller = PIController()
+    def __init__(self, static_obstacles=None, clock=time.time, rng=random, config=None):
+        self.config = config or NavigationConfig()  # 인스턴스별 파라미터 (차량마다 다른 튜닝 가능)
+        self.position_handler = PositionHandler(clock, self.config)
+        self.controller = PIController(clock, self.config)
+        self.steering = steering_class(self.config.controller)(self.config)  # 조향 전략 (설정의 controller)
+        self.local_planner = RolloutPlanner(self.config)  # 장애물 근처에서 명령 열을 굴려 보는 국소 계획기
+        self.body_heading = None  # 차량(앞쪽) 방향 추정 (필터 방향은 진행 방향이라 후진 중에는 반대)
+        self.clock = clock  # 장애물 관측 시각 기록용
+        self.rng = rng  # 명령 샘플링용 난수 생성기 (재현 가능한 실행을 위해 시드 고정 Random 주입)
         self.destination = None
         self.initial_distance = None
         self.last_command = None
@@ -20,36 +43,292 @@ class Navigation:
         self.start_mode = "start"
         self.blue_tank_position = None
         self.red_tank_position = None
-        self.obstacles = []
+        # 이 차량이 관측한 장애물 (병합 대상, TTL 이 있을 때만 만료 큐 유지)
+        self.obstacles = ObstacleIndex(expiring=self.config.obstacle_ttl > 0.0)
+        self._last_prune_position = None  # 거리 기준 장애물 정리를 마지막으로 수행한 위치
+        self.static_obstacles = static_obstacles  # 여러 차량이 공유하는 정적 장애물 (읽기 전용)
+        self.scan_fusion = ScanFusion()  # LiDAR 스캔 → 장애물 (카메라 검출 연관)
+        self.occupancy = OccupancyGrid()
+        planner_class = DStarLitePlanner if PLANNER_INCREMENTAL else GridPlanner
+        self.planner = planner_class(self.occupancy, clearance=self.config.obstacle_radius)
+        self.route = None  # set_path 로 받은 경유점 (N, 2) (None 이면 경로 계획기 사용)
+        self.path = None  # 추종 중인 경로 PathTracker (None 이면 아직 계획 전)
+        self.replan_index = None  # 새 장애물로 막힌 첫 경로 구간 (이후만 재계획)
+        self.recorder = None  # 틱 기록 창구 (recorder.RecordChannel, None 이면 기록 안 함)
 
-    def set_destination(self, destination_str):
-        """목적지를 설정하고 초기 거리를 계산."""
+    def set_recorder(self, recorder):
+        """입력/출력 틱 기록 창구 연결 (None 이면 해제). 생성 직후 연결하며, 세션 시작과 설정을 먼저 기록한다."""
+        self.recorder = recorder
+        self.position_handler.recorder = recorder
+        if recorder is not None:
+            recorder.session(self.clock(), self.config)
+
+    def set_destination(self, destination):
+        """목적지("x,y,z" 문자열 또는 (x, y, z) 시퀀스)를 설정하고 초기 거리를 계산."""
         try:
-            x, y, z = map(float, destination_str.split(","))
+            if isinstance(destination, str):
+                x, y, z = map(float, destination.split(","))
+            else:
+                x, y, z = destination
             self.destination = (x, z)
+            if self.recorder is not None:
+                self.recorder.destination(self.clock(), x, y, z)
             self.controller.reset_integral()
+            self.route = None
+            self.path = None
 
             if self.position_handler.current_position:
                 curr_x, curr_z = self.position_handler.current_position
                 self.initial_distance = math.sqrt((x - curr_x) ** 2 + (z - curr_z) ** 2)
+                self.plan_path()
 
             return {
                 "status": "OK",
                 "destination": {"x": x, "y": y, "z": z},
-                "initial_distance": self.initial_distance
+                "initial_distance": self.initial_distance,
+                "waypoints": len(self.path) - 1 if self.path else 0,
+                "planner": self.planner.last_stats
             }
         except Exception as e:
             return {"status": "ERROR", "message": str(e)}
 
+    def set_path(self, points):
+        """경유점 폴리라인 ([[x, z], ...] 또는 [[x, y, z], ...] / [{"x", "z"}, ...])을 추종 경로로 설정.
+
+        마지막 점이 목적지가 된다. 경로가 새 장애물로 막히면 막힌 구간부터 목적지까지 경로 계획기로 다시 계획한다.
+        """
+        try:
+            if points and isinstance(points[0], dict):
+                points = [(float(p["x"]), float(p["z"])) for p in points]
+            route = np.asarray(points, dtype=np.float64)
+            if route.ndim != 2 or route.shape[1] not in (2, 3) or len(route) == 0:
+                return {"status": "ERROR", "message": "경로는 [x, z] 또는 [x, y, z] 점 목록이어야 합니다"}
+            if route.shape[1] == 3:
+                route = route[:, (0, 2)]
+            if not np.isfinite(route).all():
+                return {"status": "ERROR", "message": "유한하지 않은 좌표"}
+        except (KeyError, TypeError, ValueError) as e:
+            return {"status": "ERROR", "message": str(e)}
+
+        self.route = route
+        if self.recorder is not None:
+            self.recorder.path(self.clock(), route)
+        self.destination = tuple(route[-1].tolist())
+        self.controller.reset_integral()
+        self.path = None
+        self.initial_distance = None
+        if self.position_handler.current_position:
+            curr_x, curr_z = self.position_handler.current_position
+            self.initial_distance = math.hypot(self.destination[0] - curr_x, self.destination[1] - curr_z)
+            self.plan_path()
+        return {
+            "status": "OK",
+            "waypoints": len(route),
+            "length": self.path.length if self.path else None,
+            "destination": {"x": self.destination[0], "z": self.destination[1]}
+        }
+
+    def set_config(self, config):
+        """실행 중 설정 교체 (위치/속도 제어기 상태는 유지, 조향 전략이 바뀌면 새로 만들고
+        장애물 반경이 바뀌면 경로 계획기를 새로 만들어 재계획)."""
+        previous = self.config
+        if self.recorder is not None:
+            self.recorder.config(self.clock(), config)
+        self.config = config
+        self.position_handler.config = config
+        self.controller.config = config
+        if config.controller != previous.controller:
+            self.steering = steering_class(config.controller)(config)
+            self.last_steering = 0.0
+        else:
+            self.steering.config = config
+        self.local_planner.config = config
+        self.obstacles.set_expiring(config.obstacle_ttl > 0.0)
+        if config.obstacle_radius != previous.obstacle_radius:
+            self.planner = type(self.planner)(self.occupancy, clearance=config.obstacle_radius)
+            self.path = None
+        return {"status": "OK", "config": config.as_dict()}
+
     def add_obstacle(self, x, z):
         """장애물 추가."""
         try:
             x, z = float(x), float(z)
-            self.obstacles.append((x, z))
+            if self.recorder is not None:
+                self.recorder.obstacles(self.clock(), np.array(((x, z),)))
+            if self.obstacles.add(x, z, self.clock()):
+                self.occupancy.mark_occupied((x, z))
+                self._invalidate_path(((x, z),))
             return {"status": "OK", "message": f"Obstacle added at ({x}, {z})"}
         except ValueError:
             return {"status": "ERROR", "message": "Invalid obstacle coordinates"}
 
+    def add_obstacles(self, points):
+        """장애물 여러 개를 일괄 추가 (유한하지 않은 좌표는 거부)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        valid = np.isfinite(points).all(axis=1)
+        if self.recorder is not None:
+            self.recorder.obstacles(self.clock(), points[valid])
+        added = self.obstacles.add_many(points[valid], self.clock())
+        self.occupancy.mark_occupied(added)
+        self._invalidate_path(added)
+        accepted = int(valid.sum())
+        return {"status": "OK", "accepted": accepted, "rejected": len(points) - accepted,
+                "merged": accepted - len(added)}
+
+    def add_scan(self, angles, ranges, boxes=None):
+        """LiDAR 스캔(빔 각도/거리 배열)을 현재 추정 위치 기준으로 변환하여 장애물로 반영 (boxes 는 카메라 검출 박스)."""
+        if self.position_handler.current_position is None:
+            return {"status": "ERROR", "message": "위치 정보 없음 (스캔을 변환할 수 없음)"}
+        curr_x, curr_z = self.position_handler.current_position
+        try:
+            scan = self.scan_fusion.process(angles, ranges, (curr_x, curr_z, self.position_handler.current_heading), boxes)
+        except ValueError as e:
+            return {"status": "ERROR", "message": str(e)}
+        result = self.add_obstacles(scan.pop("points"))
+        scan.update(status="OK", obstacles=result["accepted"], merged=result["merged"])
+        return scan
+
+    def expire_obstacles(self, curr_x, curr_z):
+        """TTL 이 지났거나 유지 반경을 벗어난 관측 장애물을 제거하고 점유 격자에서도 되돌림 (검사 안 했으면 None)."""
+        config = self.config
+        removed = []
+        if config.obstacle_ttl > 0.0:
+            removed.append(self.obstacles.expire(self.clock() - config.obstacle_ttl))
+        if config.obstacle_keep_radius > 0.0:
+            # 전체 거리 검사는 차량이 유지 반경의 1/4 이상 이동했을 때만 수행
+            last = self._last_prune_position
+            step = config.obstacle_keep_radius * 0.25
+            if last is None or (curr_x - last[0]) ** 2 + (curr_z - last[1]) ** 2 >= step * step:
+                self._last_prune_position = (curr_x, curr_z)
+                removed.append(self.obstacles.remove_outside(curr_x, curr_z, config.obstacle_keep_radius))
+        if not removed:
+            return None
+        removed = np.vstack(removed)
+        if len(removed):
+            self.occupancy.unmark_occupied(removed)
+        return removed
+
+    def clear_obstacles(self):
+        """관측 장애물 전체 삭제."""
+        if self.recorder is not None:
+            self.recorder.clear(self.clock())
+        removed = self.obstacles.points.copy()
+        self.obstacles.clear()
+        self.occupancy.unmark_occupied(removed)
+        return {"status": "OK", "removed": len(removed)}
+
+    def query_obstacles(self, bounds=None):
+        """관측 장애물 좌표와 마지막 관측 시각 (bounds=(min_x, min_z, max_x, max_z) 로 범위 제한)."""
+        return describe_obstacles(self.obstacles, bounds)
+
+    def plan_path(self, from_segment=None):
+        """현재 위치부터의 추종 경로를 만든다.
+
+        from_segment 가 주어지면 그 구간 시작점까지의 기존 경로는 유지하고 이후만 목적지까지 다시 계획한다
+        (계획 실패 시 목적지로 직진, 목적지가 점유 격자 창 밖이면 창 경계까지만 계획하고 그 뒤는 직진).
+        재계획이 아니고 set_path 경로가 있으면 그 경로를 그대로 쓴다.
+        """
+        curr_x, curr_z = self.position_handler.current_position
+        self._recenter(curr_x, curr_z)
+        prefix = np.empty((0, 2))
+        if from_segment is not None and self.path is not None and from_segment > self.path.cursor:
+            prefix = self.path.points[self.path.cursor + 1:from_segment + 1]
+        if from_segment is None and self.route is not None:
+            suffix = self.route
+        else:
+            start = tuple(prefix[-1].tolist()) if len(prefix) else (curr_x, curr_z)
+            goal = self._window_goal(start)
+            suffix = self.planner.plan(start, goal)
+            if suffix is None:
+                suffix = [self.destination]
+            elif goal != self.destination:
+                suffix.append(self.destination)  # 창 밖 구간은 직진 (창이 따라 이동하며 장애물이 들어오면 재계획)
+        self.path = PathTracker(np.vstack([((curr_x, curr_z),), prefix, np.asarray(suffix, dtype=np.float64)]))
+        self.replan_index = None
+        return self.path
+
+    def _window_goal(self, start):
+        """목적지가 점유 격자 창 밖이면 start 에서 목적지로 가는 직선이 창 경계(한 칸 안쪽)와 만나는 점, 아니면 목적지."""
+        dest_x, dest_z = self.destination
+        min_x, min_z, max_x, max_z = self.occupancy.bounds()
+        margin = self.occupancy.resolution
+        fraction = 1.0
+        for origin, delta, low, high in ((start[0], dest_x - start[0], min_x, max_x),
+                                         (start[1], dest_z - start[1], min_z, max_z)):
+            if delta > 0.0:
+                fraction = min(fraction, (high - margin - origin) / delta)
+            elif delta < 0.0:
+                fraction = min(fraction, (low + margin - origin) / delta)
+        if fraction >= 1.0:
+            return self.destination
+        fraction = max(fraction, 0.0)
+        return start[0] + fraction * (dest_x - start[0]), start[1] + fraction * (dest_z - start[1])
+
+    def apply_static_obstacles(self, points):
+        """공유 정적 지도에 추가된 장애물을 이 차량의 점유 격자와 경로에 반영 (점 목록은 복사하지 않음)."""
+        self.occupancy.mark_occupied(points)
+        self._invalidate_path(points)
+
+    def _recenter(self, curr_x, curr_z):
+        """점유 격자 창을 이동하고, 새로 드러난 영역에 공유 정적 장애물과 아직 남아 있는 관측 장애물을 다시 그림."""
+        for box in self.occupancy.recenter(curr_x, curr_z):
+            self.occupancy.mark_occupied(self.obstacles.points_in_box(*box))
+            if self.static_obstacles is not None:
+                self.occupancy.mark_occupied(self.static_obstacles.points_in_box(*box))
+
+    def _invalidate_path(self, points):
+        """새 장애물이 남은 경로 구간과 겹치면 가장 앞선 구간부터 재계획하도록 표시."""
+        if self.path is None or self.position_handler.current_position is None:
+            return
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if not len(points):
+            return
+        tracker = self.path
+        nodes = np.vstack([(self.position_handler.current_position,), tracker.remaining()])
+        radius = self.config.obstacle_radius
+        # 긴 경로는 구간 묶음 단위로 앞에서부터 검사하고, 묶음 범위 근처의 점만 거리 계산
+        for first in range(0, len(nodes) - 1, PATH_CHECK_CHUNK):
+            chunk = nodes[first:first + PATH_CHECK_CHUNK + 1]
+            low = chunk.min(axis=0) - radius
+            high = chunk.max(axis=0) + radius
+            near = points[np.all((points >= low) & (points <= high), axis=1)]
+            if not len(near):
+                continue
+            blocked = np.flatnonzero(segments_hit_mask(near, np.hstack([chunk[:-1], chunk[1:]]), radius))
+            if len(blocked):
+                index = tracker.cursor + first + int(blocked[0])  # nodes 구간 0 = 추적기의 커서 구간
+                self.replan_index = index if self.replan_index is None else min(self.replan_index, index)
+                return
+
+    def _lookahead_target(self, curr_x, curr_z, lookahead_distance):
+        """필요하면 (재)계획한 뒤, 경로 위 현재 진행 거리와 lookahead_distance 앞 전방 주시점의 호 길이 반환."""
+        if self.path is None:
+            self.plan_path()
+        elif self.replan_index is not None:
+            self.plan_path(self.replan_index)
+        progress = self.path.project(curr_x, curr_z, self.config.path_search_window)
+        # 모퉁이 너머로 전방 주시점이 넘어가 장애물 쪽으로 가로지르지 않도록 다음 모퉁이까지로 제한
+        corner = self.path.next_corner(progress)
+        lookahead_distance = min(lookahead_distance, max(self.config.lookahead_min, corner - progress))
+        return progress, progress + lookahead_distance
+
+    def _clear_lookahead(self, curr_x, curr_z, progress, target_s):
+        """전방 주시점부터 경로를 따라 현재 진행 거리 쪽으로 당겨 가며 차량에서의 선분이 막히지 않는 가장 먼 점
+        (호 길이, x, z) 반환 (모두 막히면 None).
+
+        경유점은 팽창된 장애물 경계를 따라가므로 차량이 경로에서 조금만 벗어나도 먼 전방 주시점까지의 선분은
+        모서리를 가로질러 막힌다. 이때 정지하면 다시 출발할 수 없으므로 더 가까운 경로 위 점을 따라간다.
+        """
+        arcs = progress + (target_s - progress) * \
+            np.arange(LOOKAHEAD_PULLBACK_STEPS, 0, -1) / LOOKAHEAD_PULLBACK_STEPS
+        points = [self.path.point_at(s) for s in arcs.tolist()]
+        segments = np.array([(curr_x, curr_z, x, z) for x, z in points])
+        clear = np.flatnonzero(~self.is_obstacle_in_paths(segments))
+        if not len(clear):
+            return None
+        index = int(clear[0])
+        return float(arcs[index]), points[index][0], points[index][1]
+
     def update_obstacle(self, obstacle_data):
         """Flask 라우트에서 호출되는 장애물 업데이트 메서드."""
         try:
@@ -62,78 +341,147 @@ class Navigation:
             return {"status": "ERROR", "message": str(e)}
 
     def is_obstacle_in_path(self, curr_x, curr_z, target_x, target_z):
-        """장애물이 경로에 있는지 확인 (선-원 충돌 검사)."""
-        for obs_x, obs_z in self.obstacles:
-            dist_to_line = abs((target_z - curr_z) * obs_x - (target_x - curr_x) * obs_z + target_x * curr_z - target_z * curr_x) / math.sqrt((target_z - curr_z) ** 2 + (target_x - curr_x) ** 2)
-            if dist_to_line < OBSTACLE_RADIUS:
-                return True
-        return False
+        """장애물이 경로에 있는지 확인 (유한 선분-원 충돌 검사)."""
+        if self.obstacles.segment_hits(curr_x, curr_z, target_x, target_z, self.config.obstacle_radius):
+            return True
+        return self.static_obstacles is not None and \
+            self.static_obstacles.segment_hits(curr_x, curr_z, target_x, target_z, self.config.obstacle_radius)
+
+    def is_obstacle_in_paths(self, segments):
+        """후보 선분 배열 (M, 4: 시작 x, z, 끝 x, z)을 일괄 검사하여 (M,) 불리언 마스크 반환."""
+        mask = self.obstacles.segments_hit(segments, self.config.obstacle_radius)
+        if self.static_obstacles is not None:
+            mask |= self.static_obstacles.segments_hit(segments, self.config.obstacle_radius)
+        return mask
+
+    def obstacles_near(self, x, z, radius):
+        """관측/공유 정적 장애물 중 (x, z) 에서 radius 근처 셀의 좌표 (M, 2)."""
+        points = self.obstacles.points_near(x, z, radius)
+        if self.static_obstacles is not None:
+            points = np.vstack([points, self.static_obstacles.points_near(x, z, radius)])
+        return points
 
     def get_move(self):
-        """Pure Pursuit 알고리즘과 P/I 제어를 사용하여 이동 명령 계산."""
+        """설정된 조향 전략(기본 Pure Pursuit)과 P/I 제어를 사용하여 이동 명령 계산 (기록 중이면 호출 시각과 결과를 기록).
+
+        국소 계획기가 닿을 수 있는 거리 안에 장애물이 있으면 명령 샘플링 대신 국소 계획기로 명령을 고르고
+        (안전한 후보가 없으면 정지), rollout_horizon 이 0 이면 전방 주시점까지 장애물이 있을 때 정지한다.
+        """
+        now = self.clock() if self.recorder is not None else None
+        command = self._get_move()
+        self._command_input(command["move"])
+        if self.recorder is not None:
+            self.recorder.move(now, command)
+        return command
+
+    def _command_input(self, move):
+        """낸 명령을 위치 필터의 예측 입력으로 넘김 (필터가 vehicle_model 로 선회/가감속을 예측).
+
+        IMU 가 없으면 필터는 등속 모델이라 가감속과 선회를 몇 틱 늦게 따라가고, 국소 계획기는 그만큼 제동 거리를
+        잘못 본다. 필터 속도는 진행 방향 기준(0 이상)이므로 차량 기준 속도와 진행 방향(차량 앞/뒤)을 함께 넘긴다
+        (0 을 지나 음수가 되면 필터가 진행 방향을 뒤집음).
+        """
+        handler = self.position_handler
+        if handler.current_position is None:
+            return
+        heading, speed = self._body_state()
+        direction = 1.0 if math.cos(heading - handler.current_heading) >= 0.0 else -1.0  # 필터 진행 방향 = 차량 앞/뒤
+        handler.set_command_input(CODES[move], speed, direction)
+
+    def _body_state(self):
+        """필터의 (진행 방향, 속력) 을 차량의 (방향, 부호 있는 속도 m/s) 로 바꿈 (후진이면 속도가 음수).
+
+        위치만 관측하면 (heading, speed) 와 (heading + pi, -speed) 가 구별되지 않으므로, 직전 차량 방향에 가까운
+        쪽을 고른다 (한 틱 사이의 선회는 90도보다 훨씬 작음).
+        """
+        handler = self.position_handler
+        heading, speed = handler.current_heading, handler.current_speed_kh / 3.6
+        if self.body_heading is not None and math.cos(heading - self.body_heading) < 0.0:
+            heading, speed = math.atan2(-math.sin(heading), -math.cos(heading)), -speed
+        self.body_heading = heading
+        return heading, speed
+
+    def _get_move(self):
         if self.start_mode == "pause":
+            metrics.inc("navigation_stop_total", labels=_STOP_PAUSED)
             return {"move": "STOP", "weight": 1.0}
 
         if self.position_handler.current_position is None or self.destination is None:
+            metrics.inc("navigation_stop_total", labels=_STOP_NOT_READY)
             return {"move": "STOP", "weight": 1.0}
 
+        timer = metrics.stage_timer()
+        config = self.config
         curr_x, curr_z = self.position_handler.current_position
+        self._recenter(curr_x, curr_z)
+        self.expire_obstacles(curr_x, curr_z)
         dest_x, dest_z = self.destination
         distance = math.sqrt((dest_x - curr_x) ** 2 + (dest_z - curr_z) ** 2)
 
-        if distance < TOLERANCE:
+        if distance < config.tolerance:
             self.initial_distance = None
             self.controller.reset_integral()
+            metrics.inc("navigation_stop_total", labels=_STOP_ARRIVED)
             return {"move": "STOP", "weight": 1.0}
 
-        lookahead_distance = min(LOOKAHEAD_MAX, max(LOOKAHEAD_MIN, distance * 0.5))
-        goal_vector = np.array([dest_x - curr_x, dest_z - curr_z])
-        goal_distance = np.linalg.norm(goal_vector)
-
-        if goal_distance > 0:
-            goal_vector = goal_vector / goal_distance
+        lookahead_distance = min(config.lookahead_max, max(config.lookahead_min, distance * 0.5))
+        # 경로 위에서 호 길이로 lookahead_distance 앞의 점 (곡선 경로도 따라감)
+        progress, target_s = self._lookahead_target(curr_x, curr_z, lookahead_distance)
+        lookahead_x, lookahead_z = self.path.point_at(target_s)
+        timer.mark("plan")
 
-        target_vector = goal_vector * GOAL_WEIGHT
-        target_vector_norm = np.linalg.norm(target_vector)
-
-        if target_vector_norm > 0:
-            target_vector = target_vector / target_vector_norm
-            target_heading = math.atan2(target_vector[0], target_vector[1])
-        else:
-            target_heading = math.atan2(goal_vector[0], goal_vector[1])
-
-        lookahead_x = curr_x + target_vector[0] * lookahead_distance
-        lookahead_z = curr_z + target_vector[1] * lookahead_distance
-
-        if self.is_obstacle_in_path(curr_x, curr_z, lookahead_x, lookahead_z):
+        # 국소 계획기는 제동 거리까지 굴려 보므로 장애물이 닿을 수 있는 거리 안에 있으면 항상 계획기가 명령을 고름
+        rollout_heading, current_speed = self._body_state()
+        nearby = self.obstacles_near(curr_x, curr_z, self.local_planner.reach(current_speed)) \
+            if config.rollout_horizon else None
+        if nearby is not None and len(nearby):
+            # 목표는 모퉁이에서 자르지 않은 전방 주시점까지 경로를 따라 보이는 가장 먼 점 (모퉁이 점에서 멈추거나
+            # 벽 너머의 점을 향해 오목한 곳으로 들어가지 않음), 모두 막혀 있으면 그 전방 주시점
+            visible = self._clear_lookahead(curr_x, curr_z, progress, progress + lookahead_distance)
+            rollout_goal = visible[1:] if visible is not None else self.path.point_at(progress + lookahead_distance)
+        blocked = self.is_obstacle_in_path(curr_x, curr_z, lookahead_x, lookahead_z)
+        if blocked and not config.rollout_horizon:
+            target = self._clear_lookahead(curr_x, curr_z, progress, target_s)
+            if target is None:
+                # 경로에서 벗어나 장애물 건너편에 있으면 경로 위 어느 점도 보이지 않으므로 현재 위치에서 다시 계획
+                self.plan_path(self.path.cursor)
+                progress, target_s = self._lookahead_target(curr_x, curr_z, lookahead_distance)
+                target = self._clear_lookahead(curr_x, curr_z, progress, target_s)
+            if target is not None:
+                target_s, lookahead_x, lookahead_z = target
+                blocked = False
+        timer.mark("collision")
+        if metrics.enabled:
+            scanned = self.obstacles.last_scanned
+            if self.static_obstacles is not None:
+                scanned += self.static_obstacles.last_scanned
+            metrics.inc("navigation_obstacles_scanned_total", scanned)
+        if blocked and not config.rollout_horizon:
+            metrics.inc("navigation_stop_total", labels=_STOP_OBSTACLE)
             return {"move": "STOP", "weight": 1.0, "message": "Obstacle detected in path"}
 
-        dx = lookahead_x - curr_x
-        dz = lookahead_z - curr_z
-        target_heading = math.atan2(dx, dz)
-
-        heading_error = target_heading - self.position_handler.current_heading
-        heading_error = math.atan2(math.sin(heading_error), math.cos(heading_error))
-
-        curvature = 2.0 * math.sin(heading_error) / max(lookahead_distance, 0.01)
-        steering = STEERING_SMOOTHING * self.last_steering + (1 - STEERING_SMOOTHING) * curvature
-        self.last_steering = steering
-
         speed_ms = self.controller.compute_speed(self.position_handler.current_speed_kh)
+        # 조향 전략별 곡률 명령 (전략이 기준 속도를 조정할 수 있음)
+        curvature, heading_error, speed_ms = self.steering.steer(
+            (curr_x, curr_z, self.position_handler.current_heading), self.path, progress,
+            (target_s, lookahead_x, lookahead_z), speed_ms)
+        steering = config.steering_smoothing * self.last_steering + (1 - config.steering_smoothing) * curvature
+        self.last_steering = steering
 
         abs_steering = abs(steering)
-        speed_ms = speed_ms * (1.0 - abs_steering * SPEED_FACTOR)
+        speed_ms = speed_ms * (1.0 - abs_steering * config.speed_factor)
 
         # 최대 속도 제한 (target_val_kh 기준)
-        speed_ms = min(speed_ms, CONTROL_PARAMS["target_val_kh"] / 3.6)
+        speed_ms = min(speed_ms, config.max_speed_ms)
+        timer.mark("controller")
 
         progress = max(0, 1 - distance / self.initial_distance) if self.initial_distance and distance > 0 else 0.0
 
         dynamic_weights = {
-            "D": WEIGHT_FACTORS["D"] * (1 + abs_steering * 2) if steering > 0 else 0.0,
-            "A": WEIGHT_FACTORS["A"] * (1 + abs_steering * 2) if steering < 0 else 0.0,
-            "W": WEIGHT_FACTORS["W"] * speed_ms,
-            "S": WEIGHT_FACTORS["S"] if heading_error > math.pi * 0.6 else 0.0
+            "D": config.weight_D * (1 + abs_steering * 2) if steering > 0 else 0.0,
+            "A": config.weight_A * (1 + abs_steering * 2) if steering < 0 else 0.0,
+            "W": config.weight_W * speed_ms,
+            "S": config.weight_S if heading_error > math.pi * 0.6 else 0.0
         }
 
         for cmd in dynamic_weights:
@@ -141,31 +489,36 @@ class Navigation:
                 dynamic_weights[cmd] *= (1 + progress * 0.5)
 
         commands = [cmd for cmd, w in dynamic_weights.items() if w > 0]
-        if not commands:
+        if nearby is not None and len(nearby):
+            # 명령 열 후보를 굴려 장애물을 피하면서 전방 주시점에 가까워지는 첫 명령 선택
+            chosen_cmd = self.local_planner.plan(
+                (curr_x, curr_z, rollout_heading), current_speed, rollout_goal, nearby)
+            if chosen_cmd is None or chosen_cmd == "STOP":  # 안전한 후보가 없거나 제동이 최선
+                metrics.inc("navigation_stop_total", labels=_STOP_OBSTACLE)
+                return {"move": "STOP", "weight": 1.0, "message": "Obstacle detected in path"}
+            command = {"move": chosen_cmd, "weight": 1.0}
+            self.last_command = chosen_cmd
+            metrics.inc("navigation_commands_total", labels=_COMMAND_LABELS[chosen_cmd])
+        elif not commands:
             command = {"move": "STOP"}
+            metrics.inc("navigation_stop_total", labels=_STOP_NO_COMMAND)
         else:
             weights = [dynamic_weights[cmd] for cmd in commands]
-            chosen_cmd = random.choices(commands, weights=weights, k=1)[0]
+            chosen_cmd = self.rng.choices(commands, weights=weights, k=1)[0]
             command = {"move": chosen_cmd, "weight": dynamic_weights[chosen_cmd]}
             self.last_command = chosen_cmd
+            metrics.inc("navigation_commands_total", labels=_COMMAND_LABELS[chosen_cmd])
+        timer.mark("sampling")
 
         if self.last_command:
-            move_distance = MOVE_STEP * speed_ms
-            new_x, new_z = curr_x, curr_z
-
-            if self.last_command == "D":
-                new_x += move_distance * math.cos(self.position_handler.current_heading + math.pi/2)
-                new_z += move_distance * math.sin(self.position_handler.current_heading + math.pi/2)
-            elif self.last_command == "A":
-                new_x += move_distance * math.cos(self.position_handler.current_heading - math.pi/2)
-                new_z += move_distance * math.sin(self.position_handler.current_heading - math.pi/2)
-            elif self.last_command == "W":
-                new_x += move_distance * math.sin(self.position_handler.current_heading)
-                new_z += move_distance * math.cos(self.position_handler.current_heading)
-            elif self.last_command == "S":
-                new_x -= move_distance * math.sin(self.position_handler.current_heading)
-                new_z -= move_distance * math.cos(self.position_handler.current_heading)
-
-            self.position_handler.current_position = (new_x, new_z)
-
-        return command
\ No newline at end of file
+            self._dead_reckon(self.last_command, config.move_step)
+        timer.mark("dead_reckoning")
+        return command
+
+    def _dead_reckon(self, command, duration):
+        """다음 위치 입력 전까지 마지막 명령으로 duration 초 진행했다고 보고 추정 위치를 옮김 (vehicle_model 한 틱)."""
+        handler = self.position_handler
+        curr_x, curr_z = handler.current_position
+        heading, speed = self._body_state()
+        x, z, _, _ = command_step(CODES[command], curr_x, curr_z, heading, speed, duration, self.config.max_speed_ms)
+        handler.current_position = (x, z)
\ No newline at end of file
@@ -0,0 +1,299 @@
+# obstacle_index.py
+# 장애물 공간 인덱스 (균일 격자 해시 + 연속 NumPy 좌표 배열)
+
+import math
+from collections import deque
+import numpy as np
+from config import OBSTACLE_GRID_CELL_SIZE, OBSTACLE_DEDUP_RADIUS
+
+INITIAL_CAPACITY = 1024  # 좌표 배열 초기 용량 (가득 차면 2배로 확장)
+SCAN_POINTS_PER_CELL = 16  # 반경 조회에서 점 수가 덮는 셀 수의 이 배 이하이면 셀을 순회하지 않고 전체 좌표를 한 번에 거름
+
+
+def segments_hit_mask(points, segments, radius):
+    """선분 배열 (M, 4: ax, az, bx, bz)과 점 배열 (N, 2)의 충돌 여부를 (M,) 불리언 마스크로 반환."""
+    segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+    if len(points) == 0 or len(segments) == 0:
+        return np.zeros(len(segments), dtype=bool)
+
+    a = segments[:, None, 0:2]
+    d = segments[:, None, 2:4] - a
+    length_sq = np.einsum("mij,mij->mi", d, d)  # (M, 1)
+    rel = points[None, :, :] - a  # (M, N, 2)
+    # 길이 0 선분은 d=0 이므로 분모만 1로 바꾸면 t=0 (점-점 거리)
+    t = np.einsum("mnj,mij->mn", rel, d) / np.where(length_sq > 0.0, length_sq, 1.0)
+    np.clip(t, 0.0, 1.0, out=t)
+    rel -= t[:, :, None] * d
+    dist_sq = np.einsum("mnj,mnj->mn", rel, rel)
+    return (dist_sq < radius * radius).any(axis=1)
+
+
+class ObstacleIndex:
+    """장애물 점 저장소.
+
+    같은 복셀(dedup_radius 크기 격자 칸)에 들어오는 점은 하나로 병합하고 관측 시각만 갱신한다.
+    expiring=True 이면 관측 시각 순 큐를 유지하여 expire() 가 오래된 점만 꺼내 제거한다
+    (갱신된 점의 이전 큐 항목은 꺼낼 때 시각 비교로 버림). 제거는 마지막 원소와 자리를 바꾸는
+    방식이라 배열/셀 목록을 다시 만들지 않는다.
+    """
+
+    def __init__(self, cell_size=OBSTACLE_GRID_CELL_SIZE, dedup_radius=OBSTACLE_DEDUP_RADIUS, expiring=False):
+        self.cell_size = float(cell_size)
+        self.dedup_radius = float(dedup_radius)
+        self.cells = {}  # (ix, iz) -> [좌표 배열 인덱스, ...]
+        self.voxels = {}  # 병합용 복셀 키 -> 좌표 배열 인덱스 (dedup_radius 가 0 이면 사용 안 함)
+        self._points = np.empty((INITIAL_CAPACITY, 2), dtype=np.float64)
+        self._times = np.empty(INITIAL_CAPACITY, dtype=np.float64)  # 마지막 관측 시각
+        self.count = 0
+        self.expiring = expiring
+        self._queue = deque()  # (관측 시각, 좌표) — 시각 오름차순으로 추가됨
+        self.last_scanned = 0  # 마지막 segments_hit 호출에서 거리 계산한 후보 장애물 수 (계측용)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for x, z in self.points:
+            yield (float(x), float(z))
+
+    @property
+    def points(self):
+        """저장된 장애물 좌표 (N, 2) 뷰."""
+        return self._points[:self.count]
+
+    @property
+    def times(self):
+        """각 장애물의 마지막 관측 시각 (N,) 뷰."""
+        return self._times[:self.count]
+
+    def _cell(self, x, z):
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def _voxel(self, x, z):
+        return (math.floor(x / self.dedup_radius), math.floor(z / self.dedup_radius))
+
+    def _reserve(self, extra):
+        """용량이 부족하면 2배씩 늘려 분할 상환 O(1) 추가를 보장."""
+        needed = self.count + extra
+        capacity = len(self._points)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity, 2), dtype=np.float64)
+        grown[:self.count] = self._points[:self.count]
+        self._points = grown
+        grown_times = np.empty(capacity, dtype=np.float64)
+        grown_times[:self.count] = self._times[:self.count]
+        self._times = grown_times
+
+    def add(self, x, z, timestamp=0.0):
+        """장애물 점 추가. 같은 복셀에 이미 있으면 관측 시각만 갱신하고 False 반환."""
+        if self.dedup_radius > 0.0:
+            voxel = self._voxel(x, z)
+            index = self.voxels.get(voxel)
+            if index is not None:
+                self._touch(index, timestamp)
+                return False
+            self.voxels[voxel] = self.count
+        self._reserve(1)
+        index = self.count
+        self._points[index, 0] = x
+        self._points[index, 1] = z
+        self.count += 1
+        self.cells.setdefault(self._cell(x, z), []).append(index)
+        self._touch(index, timestamp)
+        return True
+
+    def add_many(self, points, timestamp=0.0):
+        """(N, 2) 좌표 배열을 한 번에 추가하고, 병합되지 않고 새로 저장된 점 (M, 2) 을 반환."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self.dedup_radius > 0.0:
+            keep = np.zeros(len(points), dtype=bool)
+            voxels = np.floor(points / self.dedup_radius).astype(np.int64).tolist()
+            next_index = self.count
+            touched = []  # 이미 있는 점에 병합된 경우 (반복 관측되는 스캔에서는 대부분)
+            for offset, voxel in enumerate(map(tuple, voxels)):
+                index = self.voxels.get(voxel)
+                if index is None:
+                    self.voxels[voxel] = next_index
+                    next_index += 1
+                    keep[offset] = True
+                elif index < self.count:
+                    touched.append(index)
+                # index >= count 이면 같은 묶음에서 먼저 나온 새 점에 병합 (아래에서 함께 저장)
+            if touched:
+                self._times[touched] = timestamp
+                if self.expiring:
+                    self._queue.extend((timestamp, (x, z)) for x, z in self._points[touched].tolist())
+            points = points[keep]
+
+        start = self.count
+        self._reserve(len(points))
+        self._points[start:start + len(points)] = points
+        self._times[start:start + len(points)] = timestamp
+        self.count += len(points)
+        cells = np.floor(points / self.cell_size).astype(np.int64).tolist()
+        for offset, (ix, iz) in enumerate(cells):
+            self.cells.setdefault((ix, iz), []).append(start + offset)
+        if self.expiring:
+            self._queue.extend((timestamp, (x, z)) for x, z in points.tolist())
+        return points
+
+    def set_expiring(self, expiring):
+        """만료 큐 사용 여부 변경. 켜면 현재 점들로 시각 순 큐를 다시 만들고, 끄면 큐를 비운다."""
+        expiring = bool(expiring)
+        if expiring == self.expiring:
+            return
+        self.expiring = expiring
+        self._queue.clear()
+        if expiring:
+            order = np.argsort(self._times[:self.count], kind="stable")
+            self._queue.extend(zip(self._times[order].tolist(), map(tuple, self._points[order].tolist())))
+
+    def _touch(self, index, timestamp):
+        self._times[index] = timestamp
+        if self.expiring:
+            self._queue.append((timestamp, (float(self._points[index, 0]), float(self._points[index, 1]))))
+
+    def _remove(self, index):
+        """index 의 점을 마지막 점과 자리를 바꿔 제거 (셀 목록은 해당 칸만 수정)."""
+        x, z = float(self._points[index, 0]), float(self._points[index, 1])
+        last = self.count - 1
+        cell = self.cells[self._cell(x, z)]
+        cell.remove(index)
+        if not cell:
+            del self.cells[self._cell(x, z)]
+        if self.dedup_radius > 0.0:
+            del self.voxels[self._voxel(x, z)]
+        if index != last:
+            lx, lz = float(self._points[last, 0]), float(self._points[last, 1])
+            last_cell = self.cells[self._cell(lx, lz)]
+            last_cell[last_cell.index(last)] = index
+            if self.dedup_radius > 0.0:
+                self.voxels[self._voxel(lx, lz)] = index
+            self._points[index] = self._points[last]
+            self._times[index] = self._times[last]
+        self.count = last
+        return x, z
+
+    def _find(self, x, z):
+        """정확히 (x, z) 에 저장된 점의 인덱스 (없으면 None)."""
+        if self.dedup_radius > 0.0:
+            return self.voxels.get(self._voxel(x, z))
+        for index in self.cells.get(self._cell(x, z), ()):
+            if self._points[index, 0] == x and self._points[index, 1] == z:
+                return index
+        return None
+
+    def expire(self, older_than):
+        """관측 시각이 older_than 이전인 점을 제거하고 제거된 좌표 (K, 2) 반환 (분할 상환 O(1))."""
+        removed = []
+        queue = self._queue
+        while queue and queue[0][0] < older_than:
+            timestamp, (x, z) = queue.popleft()
+            index = self._find(x, z)
+            # 이후에 다시 관측되어 시각이 바뀐 점은 나중 큐 항목이 처리
+            if index is not None and self._times[index] == timestamp and \
+                    self._points[index, 0] == x and self._points[index, 1] == z:
+                removed.append(self._remove(index))
+        return np.array(removed, dtype=np.float64).reshape(-1, 2)
+
+    def remove_outside(self, x, z, radius):
+        """(x, z) 에서 radius 보다 먼 점을 제거하고 제거된 좌표 (K, 2) 반환."""
+        points = self.points
+        far = np.flatnonzero((points[:, 0] - x) ** 2 + (points[:, 1] - z) ** 2 > radius * radius)
+        # 큰 인덱스부터 제거하면 자리를 옮겨 오는 마지막 점은 항상 남길 점
+        return np.array([self._remove(int(index)) for index in far[::-1]], dtype=np.float64).reshape(-1, 2)
+
+    def points_in_box(self, min_x, min_z, max_x, max_z):
+        """사각 영역 안의 장애물 좌표 (M, 2)."""
+        points = self.points
+        inside = (points[:, 0] >= min_x) & (points[:, 0] < max_x) & \
+            (points[:, 1] >= min_z) & (points[:, 1] < max_z)
+        return points[inside]
+
+    def points_near(self, x, z, radius):
+        """(x, z) 에서 radius 이내를 덮는 사각형 또는 그와 겹치는 셀의 장애물 좌표 (M, 2, 조금 더 먼 점도 포함).
+
+        셀 하나를 파이썬으로 도는 비용이 점 수십 개를 NumPy 로 거르는 비용과 비슷하므로, 점이 적으면
+        (국소 계획기의 수십 미터 반경은 셀이 천 개를 넘음) 전체 좌표를 사각형으로 한 번에 거른다.
+        """
+        if not self.count:
+            return np.empty((0, 2))
+        span = 2.0 * radius / self.cell_size + 2.0
+        if self.count <= SCAN_POINTS_PER_CELL * span * span:
+            points = self.points
+            return points[(np.abs(points[:, 0] - x) <= radius) & (np.abs(points[:, 1] - z) <= radius)]
+        return self._points[self._candidates(((x, z, x, z),), radius)]
+
+    def clear(self):
+        self.cells.clear()
+        self.voxels.clear()
+        self._queue.clear()
+        self.count = 0
+
+    def _cells_near_segment(self, ax, az, bx, bz, radius):
+        """선분에서 radius 이내의 점을 포함할 수 있는 셀만 열 단위로 순회."""
+        size = self.cell_size
+        min_x, max_x = min(ax, bx), max(ax, bx)
+        dx = bx - ax
+        dz = bz - az
+        first_col = math.floor((min_x - radius) / size)
+        last_col = math.floor((max_x + radius) / size)
+        for ix in range(first_col, last_col + 1):
+            # 열 범위(반경만큼 확장)와 선분 x 범위의 교집합에서 z 범위 계산
+            lo = max(ix * size - radius, min_x)
+            hi = min((ix + 1) * size + radius, max_x)
+            if dx != 0.0:
+                z_lo = az + (lo - ax) / dx * dz
+                z_hi = az + (hi - ax) / dx * dz
+                if z_lo > z_hi:
+                    z_lo, z_hi = z_hi, z_lo
+            else:
+                z_lo, z_hi = min(az, bz), max(az, bz)
+            first_row = math.floor((z_lo - radius) / size)
+            last_row = math.floor((z_hi + radius) / size)
+            for iz in range(first_row, last_row + 1):
+                indices = self.cells.get((ix, iz))
+                if indices:
+                    yield indices
+
+    def _candidates(self, segments, radius):
+        """선분들 주변 셀에 속한 장애물 인덱스 (중복 제거)."""
+        found = set()
+        for ax, az, bx, bz in segments:
+            for indices in self._cells_near_segment(ax, az, bx, bz, radius):
+                found.update(indices)
+        return np.fromiter(found, dtype=np.intp, count=len(found))
+
+    def segment_hits(self, ax, az, bx, bz, radius):
+        """유한 선분 A-B에서 radius 이내에 장애물이 있는지 확인."""
+        return bool(self.segments_hit(((ax, az, bx, bz),), radius)[0])
+
+    def segments_hit(self, segments, radius):
+        """여러 후보 선분을 한 번에 검사하여 (M,) 불리언 마스크 반환."""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if not self.count:
+            self.last_scanned = 0
+            return np.zeros(len(segments), dtype=bool)
+        candidates = self._candidates(segments.tolist(), radius)
+        self.last_scanned = len(candidates)
+        return segments_hit_mask(self._points[candidates], segments, radius)
+
+
+def describe_obstacles(index, bounds=None):
+    """조회 엔드포인트용 응답: 장애물 좌표와 마지막 관측 시각 (bounds 범위 안만)."""
+    points, times = index.points, index.times
+    if bounds is not None:
+        min_x, min_z, max_x, max_z = bounds
+        inside = (points[:, 0] >= min_x) & (points[:, 0] < max_x) & \
+            (points[:, 1] >= min_z) & (points[:, 1] < max_z)
+        points, times = points[inside], times[inside]
+    return {
+        "status": "OK",
+        "count": len(points),
+        "total": len(index),
+        "obstacles": [{"x": x, "z": z, "timestamp": t}
+                      for (x, z), t in zip(points.tolist(), times.tolist())]
+    }
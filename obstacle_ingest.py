@@ -0,0 +1,134 @@
+# obstacle_ingest.py
+# 대량 장애물 입력 파서 (JSON 배열, NDJSON 스트림, float32 바이너리)
+
+import json
+import math
+from contextlib import nullcontext
+import numpy as np
+
+CHUNK_POINTS = 4096  # 한 번에 Navigation 에 반영할 최대 장애물 수
+READ_SIZE = 64 * 1024  # 스트림 읽기 단위 (바이트)
+FLOAT32_PAIR = np.dtype("<f4").itemsize * 2
+
+
+def _coerce(item):
+    """{"x", "z"} 또는 [x, z] 형태의 항목을 (x, z) 로 변환 (실패 시 None)."""
+    try:
+        if isinstance(item, dict):
+            return float(item["x"]), float(item["z"])
+        if isinstance(item, (str, bytes)):
+            return None  # "12" 같은 두 글자 문자열이 (1, 2) 로 풀리지 않도록
+        x, z = item
+        return float(x), float(z)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def iter_json_chunks(items, chunk_points=CHUNK_POINTS):
+    """이미 디코딩된 JSON 배열을 (좌표 배열, 거부 수) 청크로 분할."""
+    buffer = []
+    rejected = 0
+    for item in items:
+        point = _coerce(item)
+        if point is None:
+            rejected += 1
+            continue
+        buffer.append(point)
+        if len(buffer) >= chunk_points:
+            yield np.array(buffer, dtype=np.float64), rejected
+            buffer, rejected = [], 0
+    if buffer or rejected:
+        yield np.array(buffer, dtype=np.float64).reshape(-1, 2), rejected
+
+
+def _iter_lines(stream):
+    """스트림을 READ_SIZE 단위로 읽으며 줄 단위로 반환."""
+    pending = b""
+    while True:
+        block = stream.read(READ_SIZE)
+        if not block:
+            break
+        lines = (pending + block).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def iter_ndjson_chunks(stream, chunk_points=CHUNK_POINTS):
+    """NDJSON 스트림을 전체를 메모리에 올리지 않고 청크 단위로 파싱."""
+    def items():
+        for line in _iter_lines(stream):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+    return iter_json_chunks(items(), chunk_points)
+
+
+def iter_float32_chunks(stream, chunk_points=CHUNK_POINTS):
+    """리틀 엔디언 float32 (x, z) 쌍 스트림을 청크 단위로 디코딩."""
+    chunk_bytes = chunk_points * FLOAT32_PAIR
+    pending = b""
+    while True:
+        block = stream.read(chunk_bytes - len(pending))
+        if not block:
+            break
+        pending += block
+        usable = len(pending) - len(pending) % FLOAT32_PAIR
+        if usable < chunk_bytes:
+            continue
+        view = memoryview(pending)[:usable]
+        yield np.frombuffer(view, dtype="<f4").reshape(-1, 2).astype(np.float64), 0
+        pending = pending[usable:]
+    usable = len(pending) - len(pending) % FLOAT32_PAIR
+    # 쌍을 이루지 못한 꼬리 바이트는 장애물 1개 거부로 집계
+    rejected = 1 if usable != len(pending) else 0
+    if usable or rejected:
+        points = np.frombuffer(pending, dtype="<f4", count=usable // 4).reshape(-1, 2)
+        yield points.astype(np.float64), rejected
+
+
+def ingest_chunks(navigator, chunks, lock=None):
+    """청크를 순서대로 Navigation 에 일괄 반영하고 수락/거부 수를 집계.
+
+    lock 이 주어지면 파싱된 청크마다 잡는다 (본문을 받고 파싱하는 동안에는 같은 차량의 다른 요청을 막지 않음).
+    """
+    lock = lock if lock is not None else nullcontext()
+    accepted = 0
+    rejected = 0
+    merged = 0
+    batches = 0
+    for points, parse_rejected in chunks:
+        with lock:
+            result = navigator.add_obstacles(points)
+        accepted += result["accepted"]
+        rejected += result["rejected"] + parse_rejected
+        merged += result.get("merged", 0)
+        batches += 1
+    with lock:
+        total = len(navigator.obstacles)
+    return {
+        "status": "OK",
+        "accepted": accepted,
+        "rejected": rejected,
+        "merged": merged,
+        "batches": batches,
+        "total_obstacles": total
+    }
+
+
+def parse_bounds(args):
+    """조회 범위 쿼리 (min_x, min_z, max_x, max_z) 파싱. 하나도 없으면 None, 일부만 있으면 빈 쪽은 무한대."""
+    names = ("min_x", "min_z", "max_x", "max_z")
+    if not any(name in args for name in names):
+        return None
+    defaults = (-math.inf, -math.inf, math.inf, math.inf)
+    try:
+        return tuple(float(args[name]) if name in args else default for name, default in zip(names, defaults))
+    except (TypeError, ValueError):
+        raise ValueError("범위 값은 숫자여야 합니다")
@@ -0,0 +1,140 @@
+# occupancy_grid.py
+# 점유 격자 지도 (로그 오즈 갱신, 차량을 따라 이동하는 고정 크기 창)
+
+import math
+import numpy as np
+from config import (
+    OCCUPANCY_RESOLUTION, OCCUPANCY_SIZE, OCCUPANCY_SCROLL_MARGIN,
+    LOG_ODDS_HIT, LOG_ODDS_MISS, LOG_ODDS_MIN, LOG_ODDS_MAX, LOG_ODDS_OCCUPIED
+)
+
+
+class OccupancyGrid:
+    def __init__(self, resolution=OCCUPANCY_RESOLUTION, size=OCCUPANCY_SIZE):
+        self.resolution = float(resolution)
+        self.size = int(size)
+        self.log_odds = np.zeros((self.size, self.size), dtype=np.float32)
+        # 로그 오즈 = 점유 관측 수 x LOG_ODDS_HIT + 빈 공간 증거 (상하한으로 자름). 관측 수를 따로 두어
+        # 포화된 셀에서도 관측 하나를 정확히 되돌릴 수 있음
+        self.hits = np.zeros((self.size, self.size), dtype=np.int32)
+        self.free = np.zeros((self.size, self.size), dtype=np.float32)
+        # 배열 [0, 0] 에 대응하는 월드 셀 인덱스 (창 원점)
+        self.origin_ix = -self.size // 2
+        self.origin_iz = -self.size // 2
+        self.version = 0  # 셀 값이 바뀔 때마다 증가 (경로 계획 캐시 무효화용)
+
+    def world_to_cell(self, x, z):
+        """월드 좌표를 월드 셀 인덱스로 변환."""
+        return math.floor(x / self.resolution), math.floor(z / self.resolution)
+
+    def cell_to_world(self, ix, iz):
+        """월드 셀 인덱스의 중심 좌표."""
+        return (ix + 0.5) * self.resolution, (iz + 0.5) * self.resolution
+
+    def _to_local(self, points):
+        """(N, 2) 월드 좌표를 창 내부 배열 인덱스로 변환 (창 밖 점은 제외)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        cells = np.floor(points / self.resolution).astype(np.int64)
+        i = cells[:, 0] - self.origin_ix
+        j = cells[:, 1] - self.origin_iz
+        inside = (i >= 0) & (i < self.size) & (j >= 0) & (j < self.size)
+        return i[inside], j[inside]
+
+    def _apply(self, points, hits=0, free=0.0):
+        i, j = self._to_local(points)
+        if len(i) == 0:
+            return 0
+        if hits:
+            np.add.at(self.hits, (i, j), hits)
+            self.hits[i, j] = np.maximum(self.hits[i, j], 0)
+        if free:
+            np.add.at(self.free, (i, j), free)
+            self.free[i, j] = np.clip(self.free[i, j], LOG_ODDS_MIN, 0.0)
+        self.log_odds[i, j] = np.clip(self.hits[i, j] * LOG_ODDS_HIT + self.free[i, j], LOG_ODDS_MIN, LOG_ODDS_MAX)
+        self.version += 1
+        return len(i)
+
+    def mark_occupied(self, points):
+        """장애물 관측 점을 점유 쪽으로 로그 오즈 갱신."""
+        return self._apply(points, hits=1)
+
+    def mark_free(self, points):
+        """빈 공간 관측 점을 비점유 쪽으로 로그 오즈 갱신."""
+        return self._apply(points, free=LOG_ODDS_MISS)
+
+    def unmark_occupied(self, points):
+        """만료/삭제된 장애물 점의 점유 관측을 하나씩 되돌림 (mark_occupied 의 역연산, 포화된 셀도 정확)."""
+        return self._apply(points, hits=-1)
+
+    def bounds(self):
+        """현재 창의 월드 좌표 범위 (min_x, min_z, max_x, max_z)."""
+        min_x, min_z = self.origin_ix * self.resolution, self.origin_iz * self.resolution
+        extent = self.size * self.resolution
+        return min_x, min_z, min_x + extent, min_z + extent
+
+    def log_odds_at(self, x, z):
+        """O(1) 셀 조회 (창 밖은 사전값 0)."""
+        ix, iz = self.world_to_cell(x, z)
+        i = ix - self.origin_ix
+        j = iz - self.origin_iz
+        if 0 <= i < self.size and 0 <= j < self.size:
+            return float(self.log_odds[i, j])
+        return 0.0
+
+    def is_occupied(self, x, z):
+        return self.log_odds_at(x, z) > LOG_ODDS_OCCUPIED
+
+    def occupied_mask(self):
+        """창 전체의 점유 여부 (size, size) 불리언 배열."""
+        return self.log_odds > LOG_ODDS_OCCUPIED
+
+    def recenter(self, x, z):
+        """차량이 창 중심에서 여유 범위를 벗어나면 창을 이동 (겹치는 영역만 유지).
+
+        새로 드러난 영역의 월드 좌표 사각형 (min_x, min_z, max_x, max_z) 목록을 반환 (이동하지 않았으면 빈 목록).
+        """
+        ix, iz = self.world_to_cell(x, z)
+        new_ix = ix - self.size // 2
+        new_iz = iz - self.size // 2
+        shift_i = new_ix - self.origin_ix
+        shift_j = new_iz - self.origin_iz
+        margin = int(self.size * OCCUPANCY_SCROLL_MARGIN)
+        if abs(shift_i) <= margin and abs(shift_j) <= margin:
+            return []
+
+        src_i = slice(max(shift_i, 0), self.size + min(shift_i, 0))
+        dst_i = slice(max(-shift_i, 0), self.size + min(-shift_i, 0))
+        src_j = slice(max(shift_j, 0), self.size + min(shift_j, 0))
+        dst_j = slice(max(-shift_j, 0), self.size + min(-shift_j, 0))
+        overlap = abs(shift_i) < self.size and abs(shift_j) < self.size
+        for name in ("log_odds", "hits", "free"):
+            grid = getattr(self, name)
+            shifted = np.zeros_like(grid)
+            if overlap:
+                shifted[dst_i, dst_j] = grid[src_i, src_j]
+            setattr(self, name, shifted)
+        self.origin_ix = new_ix
+        self.origin_iz = new_iz
+        self.version += 1
+        # 드러난 영역: 겹치지 않는 i 띠 (j 전체) + 겹치는 i 범위의 겹치지 않는 j 띠 (배열 인덱스, 끝 제외)
+        if not overlap:
+            cells = [(0, self.size, 0, self.size)]
+        else:
+            cells = []
+            keep_i = (dst_i.start, dst_i.stop)
+            for lo, hi in ((0, keep_i[0]), (keep_i[1], self.size)):
+                if lo < hi:
+                    cells.append((lo, hi, 0, self.size))
+            for lo, hi in ((0, dst_j.start), (dst_j.stop, self.size)):
+                if lo < hi:
+                    cells.append((keep_i[0], keep_i[1], lo, hi))
+        resolution = self.resolution
+        return [((self.origin_ix + i0) * resolution, (self.origin_iz + j0) * resolution,
+                 (self.origin_ix + i1) * resolution, (self.origin_iz + j1) * resolution)
+                for i0, i1, j0, j1 in cells]
+
+    def clear(self):
+        self.log_odds.fill(0.0)
+        self.hits.fill(0)
+        self.free.fill(0.0)
+        self.version += 1
@@ -0,0 +1,522 @@
+# path_planner.py
+# 점유 격자 기반 전역 경로 계획 (A*, 선택적 점프 포인트 탐색)
+
+import math
+import time
+from array import array
+from collections import OrderedDict
+from heapq import heappush, heappop
+import numpy as np
+from config import OBSTACLE_RADIUS, PLANNER_JUMP_POINT, PATH_CACHE_SIZE
+
+SQRT2 = math.sqrt(2.0)
+INF = float("inf")
+KEY_DIGITS = 9  # 우선순위 비교 자릿수 (대각선 비용 누적의 부동소수 오차로 동점이 갈리지 않도록)
+
+
+def inflate(mask, radius_cells):
+    """점유 셀을 원형으로 radius_cells 만큼 팽창 (차량 반경 여유 확보)."""
+    if radius_cells <= 0:
+        return mask.copy()
+    rows, cols = mask.shape
+    inflated = mask.copy()
+    for di in range(-radius_cells, radius_cells + 1):
+        for dj in range(-radius_cells, radius_cells + 1):
+            if (di or dj) and di * di + dj * dj <= radius_cells * radius_cells:
+                inflated[max(di, 0):rows + min(di, 0), max(dj, 0):cols + min(dj, 0)] |= \
+                    mask[max(-di, 0):rows + min(-di, 0), max(-dj, 0):cols + min(-dj, 0)]
+    return inflated
+
+
+class GridPlanner:
+    def __init__(self, occupancy, clearance=OBSTACLE_RADIUS, jump_point=PLANNER_JUMP_POINT):
+        self.occupancy = occupancy
+        # 점이 셀 안 어디에 있든 반경을 지키도록 1칸 여유를 더함
+        self.clearance_cells = math.ceil(clearance / occupancy.resolution) + 1
+        self.jump_point = jump_point
+        self.cols = occupancy.size + 2  # 테두리 1칸 패딩 (경계 검사 생략용)
+        self.expanded = 0  # 마지막 탐색에서 확장한 노드 수
+        self.last_stats = {"planner": self.name, "replan_ms": 0.0, "expanded": 0}
+        self._free = None
+        self._free_key = None
+        self._cache = OrderedDict()
+        self._buffers = None  # 재사용하는 탐색 배열 (_search_buffers)
+
+    def _free_cells(self):
+        """팽창된 장애물을 반영한 통행 가능 배열 (평탄화, 지도 버전별 캐시)."""
+        grid = self.occupancy
+        key = (grid.version, grid.origin_ix, grid.origin_iz)
+        if key != self._free_key:
+            free = ~np.pad(inflate(grid.occupied_mask(), self.clearance_cells), 1, constant_values=True)
+            self._free = bytearray(free.astype(np.uint8).tobytes())
+            if self.jump_point:
+                self._build_stop_tables(free)
+            self._free_key = key
+            self._cache.clear()
+        return self._free
+
+    def _build_stop_tables(self, free):
+        """직선 점프가 멈추는 셀(장애물 또는 강제 이웃)을 방향별 바이트 배열로 미리 계산.
+
+        행 방향(±j)은 그대로, 열 방향(±i)은 전치하여 저장하므로 모든 직선 점프가
+        연속 메모리에서 bytes.find / rfind 한 번으로 끝난다.
+        """
+        blocked = ~free
+        stop = {}
+        for dj in (1, -1):
+            forced = np.zeros_like(free)
+            behind = np.roll(blocked, dj, axis=1)
+            forced[1:-1] = (free[2:] & behind[2:]) | (free[:-2] & behind[:-2])
+            stop[(0, dj)] = bytes((blocked | forced).astype(np.uint8).tobytes())
+        for di in (1, -1):
+            forced = np.zeros_like(free)
+            behind = np.roll(blocked, di, axis=0)
+            forced[:, 1:-1] = (free[:, 2:] & behind[:, 2:]) | (free[:, :-2] & behind[:, :-2])
+            stop[(di, 0)] = bytes((blocked | forced).T.astype(np.uint8).tobytes())
+        self._stop = stop
+
+    def _to_flat(self, x, z):
+        ix, iz = self.occupancy.world_to_cell(x, z)
+        i = ix - self.occupancy.origin_ix
+        j = iz - self.occupancy.origin_iz
+        if 0 <= i < self.occupancy.size and 0 <= j < self.occupancy.size:
+            return (i + 1) * self.cols + (j + 1)
+        return None
+
+    def _to_world(self, flat):
+        i, j = divmod(flat, self.cols)
+        return self.occupancy.cell_to_world(i - 1 + self.occupancy.origin_ix, j - 1 + self.occupancy.origin_iz)
+
+    @property
+    def name(self):
+        return "jps" if self.jump_point else "astar"
+
+    def plan(self, start, goal):
+        """start 에서 goal 까지의 경유점 [(x, z), ...] 반환 (창 밖이거나 경로가 없으면 None)."""
+        started = time.perf_counter()
+        self.expanded = 0
+        free = self._free_cells()
+        start_flat = self._to_flat(*start)
+        goal_flat = self._to_flat(*goal)
+        cells = None
+        if start_flat is not None and goal_flat is not None and free[goal_flat]:
+            cells = self._plan_cells(free, start_flat, goal_flat)
+        self.last_stats = {
+            "planner": self.name,
+            "replan_ms": (time.perf_counter() - started) * 1000.0,
+            "expanded": self.expanded
+        }
+
+        if cells is None:
+            return None
+        waypoints = [self._to_world(flat) for flat in _corners(cells, self.cols)[1:]]
+        if waypoints:
+            waypoints[-1] = (goal[0], goal[1])
+        else:
+            waypoints = [(goal[0], goal[1])]
+        return waypoints
+
+    def _plan_cells(self, free, start, goal):
+        """지도 버전별 캐시를 거쳐 셀 경로 탐색."""
+        key = (start, goal, self.jump_point)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        # 차량이 팽창 영역 안에 있어도 출발은 허용
+        start_free = free[start]
+        free[start] = 1
+        try:
+            cells = self._search(free, start, goal)
+        finally:
+            free[start] = start_free
+        self._cache[key] = cells
+        if len(self._cache) > PATH_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return cells
+
+    def _heuristic(self, flat, goal_i, goal_j):
+        i, j = divmod(flat, self.cols)
+        di = abs(i - goal_i)
+        dj = abs(j - goal_j)
+        return (di + dj) + (SQRT2 - 2.0) * min(di, dj)
+
+    def _search_buffers(self, size):
+        """탐색용 g / parent / closed 평탄 배열 (계획마다 새로 할당하지 않고 초기값 복사로 재사용)."""
+        buffers = self._buffers
+        if buffers is None or len(buffers[0]) != size:
+            buffers = self._buffers = (array("d", [INF]) * size, array("l", [-1]) * size, bytearray(size),
+                                       array("d", [INF]) * size, bytes(size))
+        g, parent, closed, g_initial, closed_initial = buffers
+        g[:] = g_initial
+        closed[:] = closed_initial
+        return g, parent, closed
+
+    def _search(self, free, start, goal):
+        """이진 힙과 평탄 배열(g, parent, closed)을 사용하는 A* / JPS 탐색."""
+        cols = self.cols
+        goal_i, goal_j = divmod(goal, cols)
+        g, parent, closed = self._search_buffers(len(free))
+        g[start] = 0.0
+        parent[start] = -1  # parent 는 g 를 갱신한 노드만 읽으므로 출발점만 초기화
+        heap = [(self._heuristic(start, goal_i, goal_j), 0.0, start)]
+        expanded = 0
+        # (오프셋, 비용, 대각선일 때 비어 있어야 하는 두 직교 셀 오프셋)
+        moves = [(-cols, 1.0, 0, 0), (cols, 1.0, 0, 0), (-1, 1.0, 0, 0), (1, 1.0, 0, 0),
+                 (-cols - 1, SQRT2, -cols, -1), (-cols + 1, SQRT2, -cols, 1),
+                 (cols - 1, SQRT2, cols, -1), (cols + 1, SQRT2, cols, 1)]
+        octile = SQRT2 - 2.0
+        jump_point = self.jump_point
+
+        while heap:
+            _, neg_g, node = heappop(heap)
+            if closed[node]:
+                continue
+            if node == goal:
+                break
+            closed[node] = 1
+            expanded += 1
+            node_g = -neg_g
+            if jump_point:
+                successors = self._jump_successors(free, node, parent[node], goal)
+            else:
+                successors = moves
+            for succ, cost, side_a, side_b in successors:
+                if not jump_point:
+                    # A*: 상대 오프셋을 절대 인덱스로 바꾸고 막힌 셀, 모서리를 가로지르는 대각선 제외
+                    succ += node
+                    if not free[succ] or (side_a and not (free[node + side_a] and free[node + side_b])):
+                        continue
+                if closed[succ]:
+                    continue
+                new_g = node_g + cost
+                if new_g < g[succ]:
+                    g[succ] = new_g
+                    parent[succ] = node
+                    di, dj = divmod(succ, cols)
+                    di = abs(di - goal_i)
+                    dj = abs(dj - goal_j)
+                    # 동일 f 에서는 g 가 큰(목표에 가까운) 노드를 먼저 확장 (f 는 KEY_DIGITS 자리로 반올림해
+                    # 대각선 비용 누적 오차로 동점이 갈리지 않게 함, 빈 지도의 비대각선 목표에서 평행사변형 전체를 채우지 않음)
+                    heappush(heap, (round(new_g + di + dj + octile * (di if di < dj else dj), KEY_DIGITS), -new_g, succ))
+
+        self.expanded = expanded
+        if g[goal] == INF:
+            return None
+        cells = [goal]
+        while cells[-1] != start:
+            cells.append(parent[cells[-1]])
+        cells.reverse()
+        return cells
+
+    def _jump_successors(self, free, node, parent, goal):
+        """점프 포인트 탐색: 가지치기한 방향으로 점프하여 도달한 점프 포인트와 비용."""
+        cols = self.cols
+        if parent < 0:
+            directions = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+        else:
+            pi, pj = divmod(parent, cols)
+            ni, nj = divmod(node, cols)
+            directions = self._pruned_directions(free, node, _sign(ni - pi), _sign(nj - pj))
+
+        for di, dj in directions:
+            if di and dj and not (free[node + di * cols] and free[node + dj]):
+                continue
+            jump = self._jump(free, node + di * cols + dj, di, dj, goal)
+            if jump >= 0:
+                ji, jj = divmod(jump, cols)
+                ni, nj = divmod(node, cols)
+                steps_i = abs(ji - ni)
+                steps_j = abs(jj - nj)
+                yield jump, (steps_i + steps_j) + (SQRT2 - 2.0) * min(steps_i, steps_j), 0, 0
+
+    def _pruned_directions(self, free, node, di, dj):
+        cols = self.cols
+        if di and dj:
+            directions = [(di, 0), (0, dj)]
+            if free[node + di * cols] and free[node + dj]:
+                directions.append((di, dj))
+            return directions
+        directions = []
+        if di:
+            side_a, side_b = free[node + 1], free[node - 1]
+            if free[node + di * cols]:
+                directions.append((di, 0))
+                if side_a:
+                    directions.append((di, 1))
+                if side_b:
+                    directions.append((di, -1))
+            if side_a:
+                directions.append((0, 1))
+            if side_b:
+                directions.append((0, -1))
+        else:
+            side_a, side_b = free[node + cols], free[node - cols]
+            if free[node + dj]:
+                directions.append((0, dj))
+                if side_a:
+                    directions.append((1, dj))
+                if side_b:
+                    directions.append((-1, dj))
+            if side_a:
+                directions.append((1, 0))
+            if side_b:
+                directions.append((-1, 0))
+        return directions
+
+    def _jump_straight(self, free, node, di, dj, goal):
+        """직선 점프: 미리 계산한 정지 테이블에서 다음 정지 셀을 바로 찾음 (없으면 -1)."""
+        cols = self.cols
+        if dj:
+            row_start = node - node % cols
+            if dj > 0:
+                stop = self._stop[(0, dj)].find(1, node)
+                if row_start <= goal and node <= goal <= stop:
+                    return goal
+            else:
+                stop = self._stop[(0, dj)].rfind(1, 0, node + 1)
+                if goal < row_start + cols and stop <= goal <= node:
+                    return goal
+            return stop if free[stop] else -1
+
+        rows = len(free) // cols
+        i, j = divmod(node, cols)
+        goal_i, goal_j = divmod(goal, cols)
+        t_node = j * rows + i
+        if di > 0:
+            t_stop = self._stop[(di, 0)].find(1, t_node)
+            stop_i = t_stop - j * rows
+            if goal_j == j and i <= goal_i <= stop_i:
+                return goal
+        else:
+            t_stop = self._stop[(di, 0)].rfind(1, 0, t_node + 1)
+            stop_i = t_stop - j * rows
+            if goal_j == j and stop_i <= goal_i <= i:
+                return goal
+        stop = stop_i * cols + j
+        return stop if free[stop] else -1
+
+    def _jump(self, free, node, di, dj, goal):
+        """(di, dj) 방향으로 전진하며 다음 점프 포인트를 찾음 (없으면 -1)."""
+        if not (di and dj):
+            return self._jump_straight(free, node, di, dj, goal)
+        cols = self.cols
+        step = di * cols + dj
+        while True:
+            if not free[node]:
+                return -1
+            if node == goal:
+                return node
+            # 대각선 이동 중 직선 방향에서 점프 포인트가 보이면 현재 셀이 점프 포인트
+            if self._jump_straight(free, node + di * cols, di, 0, goal) >= 0 or \
+                    self._jump_straight(free, node + dj, 0, dj, goal) >= 0:
+                return node
+            if not (free[node + di * cols] and free[node + dj]):
+                return -1
+            node += step
+
+
+class DStarLitePlanner(GridPlanner):
+    """D* Lite 증분 계획기: 목표에서 역방향으로 탐색한 상태(g, rhs, 우선순위 큐)를 유지하고,
+    지도 변경 시 통행 가능 여부가 바뀐 셀 주변만 다시 계산한다."""
+
+    def __init__(self, occupancy, clearance=OBSTACLE_RADIUS):
+        super().__init__(occupancy, clearance, jump_point=False)
+        self.goal = None
+        self.start = None
+        self._changed = []
+        self._reset = True
+
+    @property
+    def name(self):
+        return "dstar_lite"
+
+    def _free_cells(self):
+        """지도 변경을 반영하고, 통행 가능 여부가 바뀐 셀을 누적 (창 이동 시 전체 초기화)."""
+        previous, previous_key = self._free, self._free_key
+        free = super()._free_cells()
+        if free is not previous:
+            if previous is None or previous_key[1:] != self._free_key[1:]:
+                self._reset = True
+            else:
+                diff = np.frombuffer(previous, dtype=np.uint8) != np.frombuffer(free, dtype=np.uint8)
+                self._changed.extend(np.flatnonzero(diff).tolist())
+        return free
+
+    def _plan_cells(self, free, start, goal):
+        if self._reset or goal != self.goal:
+            self._initialize(free, start, goal)
+        else:
+            self.free = free
+            if start != self.start:
+                # 출발점 이동: 키 보정값 km 누적 (큐 재정렬 없이 일관성 유지)
+                self.km += self._h(self.start, start)
+                self.start = start
+            touched = set()
+            for cell in self._changed:
+                for offset in self._offsets:
+                    touched.add(cell + offset)
+            self._changed = []
+            interior = self.interior
+            for node in touched:
+                if 0 <= node < len(free) and interior[node]:
+                    self._update_vertex(node)
+        self._compute_shortest_path()
+        return self._extract_path()
+
+    def _initialize(self, free, start, goal):
+        size = len(free)
+        self.free = free
+        self.g = array("d", [INF]) * size
+        self.rhs = array("d", [INF]) * size
+        self.heap = []
+        self.queued = {}  # 노드 -> 현재 유효한 큐 키 (힙의 나머지 항목은 지연 삭제)
+        self.km = 0.0
+        self.goal = goal
+        self.start = start
+        self._changed = []
+        self._reset = False
+        cols = self.cols
+        # (오프셋, 비용, 대각선일 때 비어 있어야 하는 두 직교 셀 오프셋)
+        self._moves = [(-cols, 1.0, 0, 0), (cols, 1.0, 0, 0), (-1, 1.0, 0, 0), (1, 1.0, 0, 0),
+                       (-cols - 1, SQRT2, -cols, -1), (-cols + 1, SQRT2, -cols, 1),
+                       (cols - 1, SQRT2, cols, -1), (cols + 1, SQRT2, cols, 1)]
+        self._offsets = [0] + [move[0] for move in self._moves]
+        # 패딩 테두리를 제외한 셀 (테두리는 항상 막혀 있어 갱신할 필요가 없음)
+        interior = np.zeros((size // cols, cols), dtype=np.uint8)
+        interior[1:-1, 1:-1] = 1
+        self.interior = bytearray(interior.tobytes())
+        self.rhs[goal] = 0.0
+        self._push(goal)
+
+    def _h(self, a, b):
+        ai, aj = divmod(a, self.cols)
+        bi, bj = divmod(b, self.cols)
+        di = abs(ai - bi)
+        dj = abs(aj - bj)
+        return (di + dj) + (SQRT2 - 2.0) * (di if di < dj else dj)
+
+    def _key(self, node):
+        """우선순위 (k1, 불일치 종류, 동점 처리). k1 이 같으면 과소일관(g < rhs) 노드를 g 가 작은 순으로 먼저,
+        과일관 노드는 g 가 큰(출발점에 가까운) 순으로 확장한다 (GridPlanner 와 같은 동점 처리).
+
+        작은 g 부터 꺼내면 빈 지도에서 팔각 거리 원뿔 전체를 채우고, 과소일관 노드를 뒤로 미루면
+        낡은 g 에 기댄 출발점이 일관으로 보여 탐색이 일찍 끝나므로 둘을 나눈다.
+        """
+        g, rhs = self.g[node], self.rhs[node]
+        if g < rhs:
+            return (round(g + self._h(self.start, node) + self.km, KEY_DIGITS), 0, g)
+        return (round(rhs + self._h(self.start, node) + self.km, KEY_DIGITS), 1, -rhs)
+
+    def _push(self, node):
+        key = self._key(node)
+        self.queued[node] = key
+        heappush(self.heap, (key, node))
+
+    def _update_vertex(self, node):
+        free = self.free
+        if node != self.goal:
+            g = self.g
+            best = INF
+            # 칸에 들어가는 비용만 따지므로 출발 칸이 팽창 영역 안이어도 빠져나갈 수 있음
+            for offset, cost, side_a, side_b in self._moves:
+                succ = node + offset
+                if free[succ] and (not side_a or (free[node + side_a] and free[node + side_b])):
+                    total = cost + g[succ]
+                    if total < best:
+                        best = total
+            self.rhs[node] = best
+        self._requeue(node)
+
+    def _requeue(self, node):
+        if self.g[node] != self.rhs[node]:
+            self._push(node)
+        else:
+            self.queued.pop(node, None)
+
+    def _compute_shortest_path(self):
+        g, rhs, heap, queued = self.g, self.rhs, self.heap, self.queued
+        free, interior, moves = self.free, self.interior, self._moves
+        start, goal = self.start, self.goal
+        expanded = 0
+        while heap:
+            key, node = heap[0]
+            if queued.get(node) != key:
+                heappop(heap)  # 오래된 항목
+                continue
+            if key >= self._key(start) and rhs[start] == g[start]:
+                break
+            heappop(heap)
+            new_key = self._key(node)
+            if key < new_key:
+                queued[node] = new_key
+                heappush(heap, (new_key, node))
+                continue
+            del queued[node]
+            expanded += 1
+            if g[node] > rhs[node]:
+                # 과일관: g 확정 후 선행 노드의 rhs 는 이 노드를 거치는 비용과만 비교하면 됨
+                node_g = g[node] = rhs[node]
+                if not free[node]:
+                    continue
+                for offset, cost, side_a, side_b in moves:
+                    pred = node - offset
+                    if pred == goal or not interior[pred]:
+                        continue
+                    if side_a and not (free[pred + side_a] and free[pred + side_b]):
+                        continue
+                    if cost + node_g < rhs[pred]:
+                        rhs[pred] = cost + node_g
+                        self._requeue(pred)
+            else:
+                g[node] = INF
+                self._update_vertex(node)
+                for offset, _, _, _ in moves:
+                    pred = node - offset
+                    if interior[pred]:
+                        self._update_vertex(pred)
+        self.expanded = expanded
+
+    def _extract_path(self):
+        """g 값을 따라 출발점에서 목표까지 내려가며 셀 경로 구성."""
+        if self.g[self.start] == INF and self.rhs[self.start] == INF:
+            return None
+        free, g = self.free, self.g
+        node = self.start
+        cells = [node]
+        for _ in range(len(free)):
+            if node == self.goal:
+                return cells
+            best, best_node = INF, -1
+            for offset, cost, side_a, side_b in self._moves:
+                succ = node + offset
+                if free[succ] and (not side_a or (free[node + side_a] and free[node + side_b])):
+                    total = cost + g[succ]
+                    if total < best:
+                        best, best_node = total, succ
+            if best_node < 0 or best == INF:
+                return None
+            node = best_node
+            cells.append(node)
+        return None
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def _corners(cells, cols):
+    """방향이 바뀌는 셀만 남겨 경유점 수를 줄임 (시작·끝 포함)."""
+    if len(cells) <= 2:
+        return list(cells)
+    corners = [cells[0]]
+    previous = None
+    for a, b in zip(cells, cells[1:]):
+        ai, aj = divmod(a, cols)
+        bi, bj = divmod(b, cols)
+        direction = (_sign(bi - ai), _sign(bj - aj))
+        if previous is not None and direction != previous:
+            corners.append(a)
+        previous = direction
+    corners.append(cells[-1])
+    return corners
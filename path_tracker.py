@@ -0,0 +1,109 @@
+# path_tracker.py
+# 경로(폴리라인) 추종용 호 길이 인덱스 (누적 길이 배열 + 앞으로만 움직이는 구간 커서)
+
+from bisect import bisect_right
+import numpy as np
+
+CORNER_ANGLE = 0.5  # 이 각도(라디안) 이상 꺾이는 경유점은 모퉁이로 보고 전방 주시점이 넘어가지 않게 함
+SCALAR_SEARCH_SEGMENTS = 16  # 검색 구간이 이 개수 이하이면 NumPy 대신 파이썬 반복 (호출 오버헤드가 더 큼)
+
+
+class PathTracker:
+    """경유점 폴리라인 위의 진행 거리(호 길이)를 추적.
+
+    누적 길이를 미리 계산해 두고, 차량 위치 투영은 커서 구간부터 search_window 이내의 구간만,
+    전방 주시점 계산은 누적 길이 이진 탐색으로 처리하므로 틱당 비용이 경로 길이에 거의 무관하다.
+    """
+
+    def __init__(self, points, corner_angle=CORNER_ANGLE):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(points) == 0:
+            raise ValueError("경로에 점이 없습니다")
+        # 연속으로 같은 점(길이 0 구간)은 제거
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+        self.points = points[keep]
+        self.deltas = np.diff(self.points, axis=0)  # (N-1, 2) 구간 벡터
+        self.lengths = np.hypot(self.deltas[:, 0], self.deltas[:, 1])
+        cumulative = np.concatenate(([0.0], np.cumsum(self.lengths)))
+        self.cumulative = cumulative.tolist()  # 스칼라 이진 탐색용 (bisect 가 np.searchsorted 보다 빠름)
+        self._segments = np.hstack([self.points[:-1], self.deltas, self.lengths[:, None]]).tolist()  # (ax, az, dx, dz, 길이)
+        self.length = self.cumulative[-1]
+        # 모퉁이 경유점의 호 길이 (촘촘한 곡선은 구간마다 조금씩만 꺾이므로 해당 없음)
+        headings = np.arctan2(self.deltas[:, 0], self.deltas[:, 1])
+        self.headings = headings.tolist()  # 구간별 진행 방향 (heading 과 같은 atan2(dx, dz) 기준)
+        turns = np.abs(np.angle(np.exp(1j * np.diff(headings))))
+        self.corners = cumulative[1:-1][turns >= corner_angle].tolist()
+        self.cursor = 0  # 차량이 지나고 있는 구간 인덱스 (감소하지 않음)
+        self.progress = 0.0  # 차량 위치의 호 길이 투영값 (감소하지 않음)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def end(self):
+        return tuple(self.points[-1].tolist())
+
+    def project(self, x, z, search_window):
+        """커서 구간부터 현재 진행 거리 + search_window 안에서 시작하는 구간 중 가장 가까운 점으로 진행 거리를 갱신해 반환."""
+        segments = len(self.lengths)
+        if segments == 0:
+            return 0.0
+        start = self.cursor
+        # 현재 진행 거리에서 search_window 앞까지 시작점이 들어오는 구간 (긴 구간 끝에서도 다음 구간이 포함됨)
+        stop = min(max(bisect_right(self.cumulative, self.progress + search_window, lo=start), start + 1), segments)
+        if stop - start <= SCALAR_SEARCH_SEGMENTS:
+            return self._project_scalar(x, z, start, stop)
+        a = self.points[start:stop]
+        d = self.deltas[start:stop]
+        lengths_sq = self.lengths[start:stop] ** 2
+        rel_x = x - a[:, 0]
+        rel_z = z - a[:, 1]
+        t = np.clip((rel_x * d[:, 0] + rel_z * d[:, 1]) / lengths_sq, 0.0, 1.0)
+        dist_sq = (rel_x - t * d[:, 0]) ** 2 + (rel_z - t * d[:, 1]) ** 2
+        k = int(np.argmin(dist_sq))
+        self.cursor = start + k
+        self.progress = max(self.progress, self.cumulative[self.cursor] + float(t[k]) * float(self.lengths[self.cursor]))
+        return self.progress
+
+    def _project_scalar(self, x, z, start, stop):
+        best = None
+        for i in range(start, stop):
+            ax, az, dx, dz, length = self._segments[i]
+            t = ((x - ax) * dx + (z - az) * dz) / (length * length)
+            t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+            ex = x - ax - t * dx
+            ez = z - az - t * dz
+            dist_sq = ex * ex + ez * ez
+            if best is None or dist_sq < best[0]:
+                best = (dist_sq, i, t)
+        _, self.cursor, t = best
+        self.progress = max(self.progress, self.cumulative[self.cursor] + t * self._segments[self.cursor][4])
+        return self.progress
+
+    def point_at(self, s):
+        """호 길이 s 위치의 좌표 (경로 양 끝으로 제한)."""
+        if s <= 0.0 or len(self.lengths) == 0:
+            return tuple(self.points[0].tolist())
+        if s >= self.length:
+            return self.end
+        i = bisect_right(self.cumulative, s) - 1
+        ax, az, dx, dz, length = self._segments[i]
+        frac = (s - self.cumulative[i]) / length
+        return ax + frac * dx, az + frac * dz
+
+    def heading_at(self, s):
+        """호 길이 s 위치의 경로 접선 방향 (경유점 위이면 다음 구간 방향, 경로 양 끝은 첫/마지막 구간 방향)."""
+        if not self.headings:
+            return 0.0
+        i = bisect_right(self.cumulative, s) - 1
+        return self.headings[min(max(i, 0), len(self.headings) - 1)]
+
+    def next_corner(self, s):
+        """호 길이 s 보다 앞에 있는 첫 모퉁이의 호 길이 (없으면 경로 끝)."""
+        i = bisect_right(self.corners, s)
+        return self.corners[i] if i < len(self.corners) else self.length
+
+    def remaining(self):
+        """커서 구간 끝부터 마지막까지의 경유점 (M, 2)."""
+        return self.points[self.cursor + 1:]
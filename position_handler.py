@@ -1,57 +1,55 @@
 import math
 import time
-from config import HEADING_SMOOTHING, CONTROL_PARAMS
+from config import NavigationConfig, IMU_TIMEOUT, ESTIMATOR_RESET_DISTANCE
+from estimator import ScalarPoseEstimator
+from vehicle_model import YAW_RATES, command_speed
+
 
 class PositionHandler:
-    def __init__(self):
-        self.current_position = None  # (x, z)
+    def __init__(self, clock=time.time, config=None):
+        self.clock = clock  # 시각 함수 (헤드리스 시뮬레이션에서는 가상 시계 주입)
+        self.config = config or NavigationConfig()  # 인스턴스별 필터 잡음/속도 상한 파라미터
+        self.current_position = None  # (x, z) 추정 위치
         self.current_heading = 0.0  # 현재 방향 (라디안)
         self.current_speed_kh = 0.0  # 현재 속도 (km/h)
-        self.smoothed_speed_kh = 0.0  # 평활화된 속도
-        self.last_update_time = time.time()  # 마지막 업데이트 시간
+        self.estimator = ScalarPoseEstimator()  # GNSS + IMU 확장 칼만 필터
+        self.last_update_time = clock()  # 필터 상태의 시각 (송신 측 시각이 오면 그 기준)
+        self.imu = None  # 마지막 IMU 입력 (yaw_rate, accel, 시각), 다음 입력까지 유지
+        self.command_input = None  # IMU 가 없을 때의 예측 입력: 마지막 명령의 (명령 번호, 차량 기준 속도, 진행 방향, 시각)
+        self.recorder = None  # 틱 기록 창구 (recorder.RecordChannel, None 이면 기록 안 함)
+
+    def update_position(self, position, timestamp=None):
+        """GNSS 위치로 필터를 갱신하여 현재 위치, 방향, 속도를 업데이트.
 
-    def update_position(self, position_str):
-        """새 위치 데이터를 기반으로 현재 위치, 방향, 속도를 업데이트."""
+        position 은 "x,y,z" 문자열 또는 (x, y, z) 숫자 시퀀스(바이너리 메시지 디코딩 결과).
+        timestamp 가 주어지면 서버 시각 대신 송신 측 시각으로 예측 구간을 계산.
+        """
         try:
-            now = time.time()
-            dt = now - self.last_update_time if now > self.last_update_time else 0.01
-            dt = max(dt, 0.01)  # dt 최소값 설정 (안정성 확보)
-            self.last_update_time = now
-
-            x, y, z = map(float, position_str.split(","))
-            new_position = (x, z)
-
-            if self.current_position:
-                prev_x, prev_z = self.current_position
-                dx = x - prev_x
-                dz = z - prev_z
-
-                distance_moved = math.sqrt(dx**2 + dz**2)
-                if distance_moved > 0.01:
-                    new_heading = math.atan2(dx, dz)
-                    self.current_heading = (
-                        HEADING_SMOOTHING * self.current_heading + 
-                        (1 - HEADING_SMOOTHING) * new_heading
-                    )
-                    self.current_heading = math.atan2(
-                        math.sin(self.current_heading), math.cos(self.current_heading)
-                    )
-                    # 속도 계산 (km/h) 및 평활화
-                    if dt > 0:
-                        # 이동 거리 제한 (최대 target_val_kh에 해당하는 거리)
-                        max_distance = (CONTROL_PARAMS["target_val_kh"] / 3.6) * dt
-                        distance_moved = min(distance_moved, max_distance)
-                        raw_speed_kh = (distance_moved / dt) * 3.6
-                        raw_speed_kh = min(raw_speed_kh, CONTROL_PARAMS["target_val_kh"])
-                        smoothing = CONTROL_PARAMS["speed_smoothing"]
-                        self.smoothed_speed_kh = (
-                            smoothing * self.smoothed_speed_kh + 
-                            (1 - smoothing) * raw_speed_kh
-                        )
-                        self.smoothed_speed_kh = min(self.smoothed_speed_kh, CONTROL_PARAMS["target_val_kh"])
-                        self.current_speed_kh = self.smoothed_speed_kh
-
-            self.current_position = new_position
+            if isinstance(position, str):
+                x, y, z = map(float, position.split(","))
+            else:
+                x, y, z = position
+            if not (math.isfinite(x) and math.isfinite(z)):
+                return {"status": "ERROR", "message": "유한하지 않은 좌표"}
+            now = self.clock() if timestamp is None else timestamp
+            config = self.config
+            estimator = self.estimator
+
+            if self.current_position is None:
+                estimator.reset(x, z, config.gnss_var, self.current_heading)
+                self.last_update_time = now
+            else:
+                self._predict(now)
+                predicted_x, predicted_z = estimator.state[:2]
+                if (x - predicted_x) ** 2 + (z - predicted_z) ** 2 > ESTIMATOR_RESET_DISTANCE ** 2:
+                    # 순간 이동/재접속: 이전 추정과 이어지지 않으므로 방향만 유지하고 새 위치에서 다시 시작
+                    estimator.reset(x, z, config.gnss_var, self.current_heading)
+                else:
+                    estimator.update_position(x, z, config.gnss_var)
+            self._publish()
+
+            if self.recorder is not None:
+                self.recorder.position(now if timestamp is None else self.clock(), x, y, z, timestamp)
             return {
                 "status": "OK",
                 "current_position": self.current_position,
@@ -59,4 +57,86 @@ class PositionHandler:
                 "speed_kh": self.current_speed_kh
             }
         except Exception as e:
-            return {"status": "ERROR", "message": str(e)}
\ No newline at end of file
+            return {"status": "ERROR", "message": str(e)}
+
+    def update_imu(self, imu, timestamp=None):
+        """IMU 입력으로 필터를 예측 진행 (높은 주기 입력용, 위치를 받기 전에는 입력만 저장).
+
+        imu 는 {"yaw_rate": rad/s, "accel": m/s^2} 또는 (yaw_rate, accel) 시퀀스.
+        yaw_rate 는 heading(atan2(dx, dz)) 이 증가하는 방향이 양수, accel 은 진행 방향 가속도.
+        """
+        try:
+            if isinstance(imu, dict):
+                yaw_rate, accel = float(imu["yaw_rate"]), float(imu.get("accel", 0.0))
+            else:
+                yaw_rate, accel = map(float, imu)
+            if not (math.isfinite(yaw_rate) and math.isfinite(accel)):
+                return {"status": "ERROR", "message": "유한하지 않은 IMU 값"}
+            now = self.clock() if timestamp is None else float(timestamp)
+        except (KeyError, TypeError, ValueError) as e:
+            return {"status": "ERROR", "message": str(e)}
+
+        if self.current_position is not None:
+            self._predict(now)  # 직전 IMU 입력을 이번 시각까지 유지한 것으로 진행
+            self._publish()
+        self.imu = (yaw_rate, accel, now)
+        if self.recorder is not None:
+            self.recorder.imu(now if timestamp is None else self.clock(), yaw_rate, accel, timestamp)
+        return {
+            "status": "OK",
+            "heading": math.degrees(self.current_heading),
+            "speed_kh": self.current_speed_kh
+        }
+
+    def update_imu_samples(self, samples, timestamp=None):
+        """IMU 입력 여러 개를 순서대로 반영 (각 입력의 "timestamp" 가 없으면 timestamp 사용), 마지막 결과 반환."""
+        if not isinstance(samples, list):
+            samples = [samples]
+        result = {"status": "ERROR", "message": "IMU 데이터 누락"}
+        for sample in samples:
+            sample_time = sample.get("timestamp", timestamp) if isinstance(sample, dict) else timestamp
+            result = self.update_imu(sample, sample_time)
+            if result["status"] == "ERROR":
+                return result
+        return result
+
+    def set_command_input(self, code, speed=0.0, direction=1.0, timestamp=None):
+        """IMU 가 없을 때 예측 입력으로 쓸 낸 명령 (vehicle_model 의 명령 번호). 필터는 차량 모델로 선회/가감속을 예측한다.
+
+        speed 는 명령을 낸 때의 차량 기준 속도 (m/s, 후진은 음수), direction 은 필터 진행 방향이 차량 앞이면 1,
+        뒤면 -1 (필터 속도는 진행 방향 기준이라 0 이상). None 을 주면 입력 없이 (등속 모델로) 예측한다.
+        """
+        if code is None:
+            self.command_input = None
+            return
+        now = self.clock() if timestamp is None else timestamp
+        self.command_input = (code, speed, direction, now)
+
+    def _predict(self, now):
+        """필터를 now 까지 진행 (최근 IMU 입력이 있으면 입력으로, 없으면 낸 명령의 예상 선회/가감속 또는 등속 모델
+        + 큰 과정 잡음)."""
+        dt = now - self.last_update_time
+        if dt <= 0.0:
+            return  # 늦게 도착한(순서가 뒤바뀐) 입력은 예측 없이 현재 상태에 반영
+        config = self.config
+        imu = self.imu
+        command = self.command_input
+        if imu is not None and now - imu[2] <= IMU_TIMEOUT:
+            self.estimator.predict(dt, imu[0], imu[1], config.imu_yaw_var, config.imu_accel_var)
+        elif command is not None and now - command[3] <= IMU_TIMEOUT:
+            code, speed, direction, issued = command
+            # 차량 모델은 틱 시작에 선회/가감속을 한 번에 반영하고 새 heading/속도로 이동 (가감속은 목표 속도까지만)
+            max_speed = config.max_speed_ms
+            before = command_speed(code, speed, max(0.0, self.last_update_time - issued), max_speed)
+            after = command_speed(code, speed, max(0.0, now - issued), max_speed)
+            self.estimator.shift(float(YAW_RATES[code]) * dt, direction * (after - before))
+            self.estimator.predict(dt, 0.0, 0.0, config.process_yaw_var, config.process_accel_var)
+        else:
+            self.estimator.predict(dt, 0.0, 0.0, config.process_yaw_var, config.process_accel_var)
+        self.last_update_time = now
+
+    def _publish(self):
+        x, z, heading, speed = self.estimator.state
+        self.current_position = (x, z)
+        self.current_heading = heading
+        self.current_speed_kh = min(speed * 3.6, self.config.target_val_kh)  # 필터 speed 는 0 이상, 상한은 target_val_kh
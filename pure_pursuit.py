@@ -0,0 +1,19 @@
+# pure_pursuit.py
+# Pure Pursuit 조향: 차량에서 경로 위 전방 주시점을 지나는 원호의 곡률
+
+import math
+from controller import SteeringController
+
+
+class PurePursuit(SteeringController):
+    def steer(self, pose, path, progress, target, speed_ms):
+        curr_x, curr_z, heading = pose
+        _, target_x, target_z = target
+        dx = target_x - curr_x
+        dz = target_z - curr_z
+        heading_error = math.atan2(dx, dz) - heading
+        heading_error = math.atan2(math.sin(heading_error), math.cos(heading_error))
+
+        # 차량이 경로에서 벗어나 있으면 실제 주시점까지의 거리가 lookahead_distance 와 다름
+        curvature = 2.0 * math.sin(heading_error) / max(math.sqrt(dx * dx + dz * dz), 0.01)
+        return curvature, heading_error, speed_ms
@@ -0,0 +1,268 @@
+# recorder.py
+# 입력/출력 틱 기록기: 위치, IMU, 목적지, 경로, 장애물, 설정 변경과 get_move 결과(샘플링된 명령)를
+# 열 단위 원시 파일(열마다 .bin 하나)에 이어 붙여 기록 → replay.py 로 같은 입력을 다시 흘려 재현
+#
+# 요청 경로에서는 행 튜플(대량 장애물/경로는 배열 블록)을 목록에 붙이기만 하고, 목록이 차면
+# 크기가 제한된 큐로 넘긴다. 파일 쓰기는 백그라운드 스레드가 하며, 큐가 가득 차면 요청을 막지 않고
+# 해당 묶음을 버린 뒤 버린 행 수를 manifest 에 남긴다 (그 로그는 재현이 보장되지 않음).
+#
+# 디렉터리 구성:
+#   manifest.json   열 dtype, 기록 완료된 행 수, 차량 ID 표, 설정 표, 버린 행 수
+#   <열 이름>.bin   해당 열 값의 원시 배열 (np.memmap 으로 그대로 읽을 수 있음)
+
+import atexit
+import json
+import os
+import queue
+import threading
+import numpy as np
+from config import RECORD_DIR, RECORD_BUFFER_ROWS, RECORD_MAX_PENDING, RECORD_FLUSH_INTERVAL
+
+# 행 종류
+POSITION = 1     # x, y, z = 위치, aux = 송신 측 시각 (없으면 NaN)
+DESTINATION = 2  # x, y, z = 목적지
+PATH = 3         # x, z = 경유점, aux = 같은 경로에서 뒤에 남은 점 수 (0 이면 마지막 점)
+OBSTACLES = 4    # x, z = 장애물, aux = 같은 묶음에서 뒤에 남은 점 수
+CLEAR = 5        # 관측 장애물 전체 삭제
+CONFIG = 6       # aux = manifest 설정 표의 번호
+MOVE = 7         # x = 가중치, aux = MOVE_COMMANDS 번호
+SESSION = 8      # 새 Navigation 생성 (같은 차량 ID 의 세션이 다시 만들어지면 재현도 처음부터), aux = 설정 표 번호
+IMU = 9          # x = yaw_rate, y = accel, aux = 송신 측 시각 (없으면 NaN)
+
+SHARED = 0xFFFF  # vehicle 열: 모든 차량이 공유하는 정적 지도에 대한 행 (OBSTACLES / CLEAR)
+MOVE_COMMANDS = ("STOP", "W", "A", "S", "D")
+_MOVE_CODES = {command: float(code) for code, command in enumerate(MOVE_COMMANDS)}
+
+COLUMNS = (
+    ("kind", np.uint8),
+    ("vehicle", np.uint16),
+    ("time", np.float64),  # 기록 시점의 내비게이터 시계 값
+    ("x", np.float64),
+    ("y", np.float64),
+    ("z", np.float64),
+    ("aux", np.float64)
+)
+_STOP = object()
+
+
+def _point_block(kind, vehicle, now, points):
+    """(N, 2) 점 배열을 행 블록 (N, 7) 로 변환 (aux = 뒤에 남은 점 수)."""
+    count = len(points)
+    block = np.empty((count, len(COLUMNS)))
+    block[:, 0] = kind
+    block[:, 1] = vehicle
+    block[:, 2] = now
+    block[:, 3] = points[:, 0]
+    block[:, 4] = 0.0
+    block[:, 5] = points[:, 1]
+    block[:, 6] = np.arange(count - 1, -1, -1)
+    return block
+
+
+class RecordChannel:
+    """차량 1대의 기록 창구 (Navigation / PositionHandler 의 recorder 속성으로 연결)."""
+
+    def __init__(self, recorder, vehicle):
+        self.recorder = recorder
+        self.vehicle = vehicle
+
+    def position(self, now, x, y, z, timestamp):
+        self.recorder.append((POSITION, self.vehicle, now, x, y, z, float("nan") if timestamp is None else timestamp))
+
+    def imu(self, now, yaw_rate, accel, timestamp):
+        self.recorder.append((IMU, self.vehicle, now, yaw_rate, accel, 0.0, float("nan") if timestamp is None else timestamp))
+
+    def destination(self, now, x, y, z):
+        self.recorder.append((DESTINATION, self.vehicle, now, x, y, z, 0.0))
+
+    def path(self, now, points):
+        self.recorder.append_block(_point_block(PATH, self.vehicle, now, points))
+
+    def obstacles(self, now, points):
+        if len(points):
+            self.recorder.append_block(_point_block(OBSTACLES, self.vehicle, now, points))
+
+    def clear(self, now):
+        self.recorder.append((CLEAR, self.vehicle, now, 0.0, 0.0, 0.0, 0.0))
+
+    def session(self, now, config):
+        self.recorder.append((SESSION, self.vehicle, now, 0.0, 0.0, 0.0, self.recorder.config_index(config)))
+
+    def config(self, now, config):
+        self.recorder.append((CONFIG, self.vehicle, now, 0.0, 0.0, 0.0, self.recorder.config_index(config)))
+
+    def move(self, now, command):
+        self.recorder.append((MOVE, self.vehicle, now, command.get("weight", 1.0), 0.0, 0.0,
+                              _MOVE_CODES[command["move"]]))
+
+
+class TickRecorder:
+    """열 단위 틱 로그 기록기 (같은 디렉터리에 다시 열면 이어서 기록)."""
+
+    def __init__(self, directory, buffer_rows=RECORD_BUFFER_ROWS, max_pending=RECORD_MAX_PENDING,
+                 flush_interval=RECORD_FLUSH_INTERVAL):
+        self.directory = directory
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+        manifest = read_manifest(directory) if os.path.exists(os.path.join(directory, "manifest.json")) else {}
+        self.rows = manifest.get("rows", 0)
+        self.dropped = manifest.get("dropped", 0)
+        self.vehicles = manifest.get("vehicles", [])
+        self.configs = manifest.get("configs", [])
+        self._vehicle_index = {vehicle_id: i for i, vehicle_id in enumerate(self.vehicles)}
+        self._config_index = {json.dumps(config, sort_keys=True): i for i, config in enumerate(self.configs)}
+        self._files = {}
+        for name, dtype in COLUMNS:
+            f = open(os.path.join(directory, name + ".bin"), "ab")
+            f.truncate(self.rows * np.dtype(dtype).itemsize)  # manifest 이후 반쯤 쓰인 꼬리는 버림
+            self._files[name] = f
+        self._pending = []  # 행 튜플 또는 (N, 7) 블록
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._write_loop, name="tick-recorder", daemon=True)
+        self._thread.start()
+
+    def channel(self, vehicle_id):
+        with self._lock:
+            index = self._vehicle_index.get(vehicle_id)
+            if index is None:
+                index = self._vehicle_index[vehicle_id] = len(self.vehicles)
+                self.vehicles.append(vehicle_id)
+        return RecordChannel(self, index)
+
+    def config_index(self, config):
+        values = config.as_dict()
+        key = json.dumps(values, sort_keys=True)
+        with self._lock:
+            index = self._config_index.get(key)
+            if index is None:
+                index = self._config_index[key] = len(self.configs)
+                self.configs.append(values)
+        return float(index)
+
+    def append(self, row):
+        with self._lock:
+            self._pending.append(row)
+            self._pending_rows += 1
+            if self._pending_rows >= self.buffer_rows:
+                self._hand_off()
+
+    def append_block(self, block):
+        with self._lock:
+            self._pending.append(block)
+            self._pending_rows += len(block)
+            if self._pending_rows >= self.buffer_rows:
+                self._hand_off()
+
+    def static_obstacles(self, now, points):
+        """공유 정적 지도에 새로 들어간 점 (SessionRegistry 에서 호출)."""
+        if len(points):
+            self.append_block(_point_block(OBSTACLES, SHARED, now, np.asarray(points, dtype=np.float64)))
+
+    def static_clear(self, now):
+        self.append((CLEAR, SHARED, now, 0.0, 0.0, 0.0, 0.0))
+
+    def _hand_off(self):
+        """쌓인 행을 쓰기 스레드로 넘김 (잠금 보유 상태에서 호출, 큐가 가득 차면 버림)."""
+        if not self._pending:
+            return
+        batch, count = self._pending, self._pending_rows
+        self._pending = []
+        self._pending_rows = 0
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += count
+
+    def flush(self):
+        """쌓인 행을 넘기고 쓰기 스레드가 모두 기록할 때까지 대기."""
+        with self._lock:
+            self._hand_off()
+        self._queue.join()
+
+    def close(self):
+        if not self._thread.is_alive():
+            return
+        self.flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+        for f in self._files.values():
+            f.close()
+
+    def _write_loop(self):
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # 한동안 묶음이 차지 않으면 쌓인 만큼이라도 기록 (다음 반복에서 꺼냄)
+                with self._lock:
+                    self._hand_off()
+                continue
+            try:
+                if batch is _STOP:
+                    return
+                self._write(batch)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        blocks = []
+        rows = []
+        for item in batch:
+            if isinstance(item, tuple):
+                rows.append(item)
+                continue
+            if rows:
+                blocks.append(np.array(rows, dtype=np.float64))
+                rows = []
+            blocks.append(item)
+        if rows:
+            blocks.append(np.array(rows, dtype=np.float64))
+        table = np.vstack(blocks)
+        for i, (name, dtype) in enumerate(COLUMNS):
+            f = self._files[name]
+            table[:, i].astype(dtype).tofile(f)
+            f.flush()
+        with self._lock:
+            self.rows += len(table)
+            manifest = {
+                "version": 1,
+                "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS},
+                "rows": self.rows,
+                "dropped": self.dropped,
+                "vehicles": list(self.vehicles),
+                "configs": list(self.configs)
+            }
+        path = os.path.join(self.directory, "manifest.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)  # 행 수는 열 파일을 다 쓴 뒤에만 늘어남
+
+
+def open_recorder(directory=RECORD_DIR):
+    """서버 시작 시 기록기 생성 (directory 가 None 이면 None). 종료할 때 남은 행을 기록한다."""
+    if directory is None:
+        return None
+    recorder = TickRecorder(directory)
+    atexit.register(recorder.close)
+    return recorder
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, "manifest.json")) as f:
+        return json.load(f)
+
+
+def load_log(directory):
+    """(manifest, {열 이름: 읽기 전용 memmap 배열}) 반환. 기록 중인 로그도 manifest 행 수까지만 읽는다."""
+    manifest = read_manifest(directory)
+    rows = manifest["rows"]
+    columns = {}
+    for name, dtype in manifest["columns"].items():
+        if rows == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+            continue
+        columns[name] = np.memmap(os.path.join(directory, name + ".bin"), dtype=dtype, mode="r", shape=(rows,))
+    return manifest, columns
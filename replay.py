@@ -0,0 +1,183 @@
+# replay.py
+# recorder.py 로 기록한 틱 로그를 Navigation 에 다시 흘려 보내 결과를 비교 (회귀 확인 / 프로파일링)
+#
+# 시계는 각 행의 기록 시각을 돌려주는 가상 시계로, 명령 샘플링은 기록된 명령을 돌려주는 난수 생성기로
+# 바꾸므로 대기 없이 실제 시간보다 빠르게, 매번 같은 순서로 재현된다.
+# 기록된 명령이 후보에 없거나 가중치가 다르면 불일치로 집계한다.
+#
+# 실행 예:
+#   python -m replay logs/run1                        → 기록된 첫 차량 재현 결과 JSON
+#   python -m replay logs/run1 --vehicle tank-2 --profile
+
+import argparse
+import cProfile
+import json
+import math
+import pstats
+import sys
+import time
+import numpy as np
+from config import NavigationConfig
+from navigation_core import Navigation
+from obstacle_index import ObstacleIndex
+from recorder import (
+    POSITION, IMU, DESTINATION, PATH, OBSTACLES, CLEAR, CONFIG, MOVE, SESSION, SHARED, MOVE_COMMANDS, load_log
+)
+
+WEIGHT_TOLERANCE = 1e-3  # 가중치 상대 오차 허용치 (기록 시각과 제어기 내부 시계 호출 시각의 미세한 차이)
+
+
+class ReplayClock:
+    """현재 재현 중인 행의 기록 시각을 돌려주는 시계."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedRng:
+    """choices() 가 기록된 명령을 돌려주는 난수 생성기 (후보에 없으면 가중치 최대 명령, diverged 표시)."""
+
+    def __init__(self):
+        self.expected = None
+        self.diverged = False
+
+    def choices(self, population, weights=None, k=1):
+        if self.expected in population:
+            return [self.expected]
+        self.diverged = True
+        return [max(zip(weights, population))[1]]
+
+
+def replay(directory, vehicle_id=None, max_mismatches=20):
+    """로그의 한 차량을 처음부터 재현하여 요약 반환 (vehicle_id 가 없으면 기록된 첫 차량)."""
+    manifest, columns = load_log(directory)
+    vehicles = manifest["vehicles"]
+    if not vehicles:
+        raise ValueError("기록된 차량이 없습니다")
+    vehicle_id = vehicles[0] if vehicle_id is None else vehicle_id
+    if vehicle_id not in vehicles:
+        raise ValueError(f"기록에 없는 차량: {vehicle_id}")
+    vehicle = vehicles.index(vehicle_id)
+
+    selected = np.flatnonzero((columns["vehicle"] == vehicle) | (columns["vehicle"] == SHARED))
+    kinds = columns["kind"][selected].tolist()
+    times = columns["time"][selected].tolist()
+    xs = columns["x"][selected]
+    ys = columns["y"][selected].tolist()
+    zs = columns["z"][selected]
+    aux = columns["aux"][selected].tolist()
+    shared = (columns["vehicle"][selected] == SHARED).tolist()
+
+    clock = ReplayClock()
+    rng = ScriptedRng()
+    static = ObstacleIndex()
+    navigator = None  # SESSION 행(세션이 만들어진 시각)에 생성 → 제어기/위치 처리기의 초기 시각이 같아짐
+    sessions = 0
+
+    moves = 0
+    mismatches = []
+    mismatch_count = 0
+    # 기록 이후 없어진 설정 키(예: goal_weight)는 버려서 예전 기록도 재생 가능하게 함
+    configs = [NavigationConfig(**{name: value for name, value in values.items() if name in NavigationConfig.DEFAULTS})
+               for values in manifest["configs"]]
+    started = time.perf_counter()
+    i = 0
+    while i < len(kinds):
+        kind = kinds[i]
+        clock.now = times[i]
+        if kind == SESSION:
+            sessions += 1
+            navigator = Navigation(static_obstacles=static, clock=clock, rng=rng, config=configs[int(aux[i])])
+            # SessionRegistry.get 과 같이 새 세션의 점유 격자에 현재 정적 장애물 반영
+            navigator.occupancy.mark_occupied(static.points_in_box(*navigator.occupancy.bounds()))
+            i += 1
+            continue
+        if navigator is None and not shared[i]:
+            raise ValueError(f"세션 시작 행 없이 차량 행이 나옴 (행 {int(selected[i])})")
+        if kind in (PATH, OBSTACLES):
+            # 같은 묶음의 점은 aux(뒤에 남은 점 수)로 끝을 알 수 있음
+            end = i + int(aux[i]) + 1
+            points = np.column_stack((xs[i:end], zs[i:end]))
+            if kind == PATH:
+                navigator.set_path(points.tolist())
+            elif shared[i]:
+                added = static.add_many(points, times[i])
+                if navigator is not None:
+                    navigator.apply_static_obstacles(added)
+            else:
+                navigator.add_obstacles(points)
+            i = end
+            continue
+        x, z = float(xs[i]), float(zs[i])
+        if kind == POSITION:
+            timestamp = None if math.isnan(aux[i]) else aux[i]
+            navigator.position_handler.update_position((x, ys[i], z), timestamp)
+        elif kind == IMU:
+            timestamp = None if math.isnan(aux[i]) else aux[i]
+            navigator.position_handler.update_imu((x, ys[i]), timestamp)
+        elif kind == DESTINATION:
+            navigator.set_destination((x, ys[i], z))
+        elif kind == CLEAR:
+            if shared[i]:
+                removed = static.points.copy()
+                static.clear()
+                if navigator is not None:
+                    navigator.occupancy.unmark_occupied(removed)
+                    navigator.path = None
+            else:
+                navigator.clear_obstacles()
+        elif kind == CONFIG:
+            navigator.set_config(configs[int(aux[i])])
+        elif kind == MOVE:
+            moves += 1
+            expected = MOVE_COMMANDS[int(aux[i])]
+            rng.expected = expected
+            rng.diverged = False
+            result = navigator.get_move()
+            weight = result.get("weight", 1.0)
+            if result["move"] != expected or rng.diverged or \
+                    not math.isclose(weight, x, rel_tol=WEIGHT_TOLERANCE, abs_tol=WEIGHT_TOLERANCE):
+                mismatch_count += 1
+                if len(mismatches) < max_mismatches:
+                    mismatches.append({"row": int(selected[i]), "time": times[i], "expected": expected,
+                                       "expected_weight": x, "move": result["move"], "weight": weight})
+        i += 1
+    elapsed = time.perf_counter() - started
+
+    recorded_span = times[-1] - times[0] if times else 0.0
+    return {
+        "vehicle_id": vehicle_id,
+        "rows": len(kinds),
+        "sessions": sessions,
+        "moves": moves,
+        "mismatches": mismatch_count,
+        "first_mismatches": mismatches,
+        "dropped_rows": manifest.get("dropped", 0),
+        "recorded_seconds": recorded_span,
+        "replay_seconds": elapsed,
+        "speedup": recorded_span / elapsed if elapsed > 0 else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="틱 로그 재현")
+    parser.add_argument("directory")
+    parser.add_argument("--vehicle", help="재현할 차량 ID (기본: 기록된 첫 차량)")
+    parser.add_argument("--profile", action="store_true", help="cProfile 누적 시간 상위 항목 출력")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        summary = profiler.runcall(replay, args.directory, args.vehicle)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+    else:
+        summary = replay(args.directory, args.vehicle)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["mismatches"] or summary["dropped_rows"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
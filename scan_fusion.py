@@ -0,0 +1,191 @@
+# scan_fusion.py
+# 센서 융합 단계: LiDAR 2D 스캔 → 월드 좌표 변환 → (카메라 검출 박스와 연관) → 클러스터링/다운샘플링 → 장애물
+#
+# 스캔은 빔마다 (angle, range) 쌍이다. angle 은 차량 진행 방향 기준 라디안이며 heading 과 같이 +x 쪽
+# (오른쪽, D 명령 방향)이 양수이다. 카메라는 LiDAR 와 같은 위치에서 진행 방향을 본다고 가정하고,
+# 검출 박스의 픽셀 열 범위를 핀홀 모델로 방위 범위로 바꿔 클러스터와 연관한다.
+#
+# 모든 단계가 빔 단위 파이썬 반복 없이 배열 연산이며, 같은 각도 배열이 반복되는 스캔(고정 분해능 LiDAR)은
+# 빔 각도의 sin/cos 를 다시 계산하지 않는다.
+
+import json
+import math
+import numpy as np
+from config import (
+    LIDAR_RANGE_MIN, LIDAR_RANGE_MAX, LIDAR_OFFSET, SCAN_CLUSTER_GAP, SCAN_MIN_CLUSTER_POINTS, SCAN_VOXEL_SIZE,
+    CAMERA_HFOV, CAMERA_IMAGE_WIDTH, CAMERA_MATCH_FRACTION
+)
+
+FLOAT32_BEAM = np.dtype("<f4").itemsize * 2  # 바이너리 스캔: 리틀 엔디언 float32 (angle, range) 쌍
+DEFAULT_LABEL = "object"
+
+
+def decode_scan(body):
+    """float32 (angle, range) 쌍 바이너리 본문을 (angles, ranges) float64 배열로 디코딩."""
+    if len(body) % FLOAT32_BEAM:
+        raise ValueError(f"스캔 길이가 {FLOAT32_BEAM} 바이트의 배수가 아닙니다")
+    beams = np.frombuffer(body, dtype="<f4").reshape(-1, 2).astype(np.float64)
+    return beams[:, 0], beams[:, 1]
+
+
+def scan_from_json(data):
+    """{"ranges", "angles"} 또는 {"ranges", "angle_min", "angle_increment"} 를 (angles, ranges) 로 변환."""
+    if not isinstance(data, dict) or not isinstance(data.get("ranges"), list):
+        raise ValueError("스캔 거리 배열 누락")
+    try:
+        ranges = np.array(data["ranges"], dtype=np.float64)
+        if "angles" in data:
+            angles = np.array(data["angles"], dtype=np.float64)
+        else:
+            angles = float(data["angle_min"]) + float(data["angle_increment"]) * np.arange(len(ranges))
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("스캔 각도는 angles 배열 또는 angle_min/angle_increment 숫자여야 합니다")
+    if ranges.ndim != 1 or angles.shape != ranges.shape:
+        raise ValueError("angles 와 ranges 의 길이가 다릅니다")
+    return angles, ranges
+
+
+class ScanFusion:
+    """LiDAR 스캔을 장애물 점과 카메라 연관 검출로 바꾸는 처리 단계 (차량마다 하나, 빔 각도 sin/cos 캐시 보유)."""
+
+    def __init__(self, range_min=LIDAR_RANGE_MIN, range_max=LIDAR_RANGE_MAX, offset=LIDAR_OFFSET,
+                 cluster_gap=SCAN_CLUSTER_GAP, min_cluster_points=SCAN_MIN_CLUSTER_POINTS,
+                 voxel_size=SCAN_VOXEL_SIZE, camera_hfov=CAMERA_HFOV, image_width=CAMERA_IMAGE_WIDTH):
+        self.range_min = range_min
+        self.range_max = range_max
+        self.offset = offset
+        self.cluster_gap = cluster_gap
+        self.min_cluster_points = min_cluster_points
+        self.voxel_size = voxel_size
+        self.image_width = image_width
+        self.focal = image_width * 0.5 / math.tan(camera_hfov * 0.5)  # 픽셀 단위 초점 거리
+        self._trig = None  # (angles, sin, cos) — 한 번에 교체하므로 동시 요청에서도 짝이 맞음
+
+    def _beam_trig(self, angles):
+        cached = self._trig
+        if cached is not None and cached[0].shape == angles.shape and np.array_equal(cached[0], angles):
+            return cached[1], cached[2]
+        cached = self._trig = (angles.copy(), np.sin(angles), np.cos(angles))
+        return cached[1], cached[2]
+
+    def box_bearings(self, boxes):
+        """검출 박스 목록 [{"x_min", "x_max", "label"}, ...] → (방위 하한, 방위 상한, 레이블 목록)."""
+        try:
+            columns = np.array([(float(box["x_min"]), float(box["x_max"])) for box in boxes],
+                               dtype=np.float64).reshape(-1, 2)
+            labels = [str(box.get("label", DEFAULT_LABEL)) for box in boxes]
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ValueError("검출 박스는 x_min, x_max 픽셀 좌표를 가진 객체여야 합니다")
+        bearings = np.arctan((columns - self.image_width * 0.5) / self.focal)
+        return bearings.min(axis=1), bearings.max(axis=1), labels
+
+    def process(self, angles, ranges, pose, boxes=None):
+        """스캔 1개 처리. pose 는 (x, z, heading). 장애물 점 (M, 2) 과 통계/검출 목록을 dict 로 반환."""
+        angles = np.asarray(angles, dtype=np.float64).ravel()
+        ranges = np.asarray(ranges, dtype=np.float64).ravel()
+        if angles.shape != ranges.shape:
+            raise ValueError("angles 와 ranges 의 길이가 다릅니다")
+        sin_a, cos_a = self._beam_trig(angles)
+        # 최대 거리 반환(반사 없음), 너무 가까운 반사, NaN/inf 는 버림
+        hit = (ranges >= self.range_min) & (ranges < self.range_max) & np.isfinite(angles)
+        if not hit.all():
+            angles, ranges, sin_a, cos_a = angles[hit], ranges[hit], sin_a[hit], cos_a[hit]
+        beams = len(hit)
+        if len(ranges) and np.any(angles[1:] < angles[:-1]):
+            order = np.argsort(angles, kind="stable")
+            angles, ranges, sin_a, cos_a = angles[order], ranges[order], sin_a[order], cos_a[order]
+
+        # 센서 좌표 (right, forward) → 월드 좌표
+        x0, z0, heading = pose
+        sin_h, cos_h = math.sin(heading), math.cos(heading)
+        right = ranges * sin_a
+        forward = ranges * cos_a
+        forward += self.offset
+        points = np.empty((len(ranges), 2))
+        np.multiply(right, cos_h, out=points[:, 0])
+        points[:, 0] += forward * sin_h
+        points[:, 0] += x0
+        np.multiply(forward, cos_h, out=points[:, 1])
+        points[:, 1] -= right * sin_h
+        points[:, 1] += z0
+
+        labels, cluster_count = self._cluster(points, angles)
+        sizes = np.bincount(labels, minlength=cluster_count)
+        keep = sizes[labels] >= self.min_cluster_points
+        detections = self._associate(points, angles, labels, sizes, boxes, x0, z0) if boxes else []
+        kept = points[keep] if not keep.all() else points
+        obstacles = self._downsample(kept)
+        return {
+            "points": obstacles,
+            "beams": beams,
+            "hits": len(points),
+            "clusters": int((sizes >= self.min_cluster_points).sum()),
+            "noise": len(points) - len(kept),
+            "detections": detections
+        }
+
+    def _cluster(self, points, angles):
+        """인접 빔 점 사이 거리가 cluster_gap 을 넘는 곳에서 끊어 클러스터 번호 (N,) 와 개수 반환."""
+        count = len(points)
+        if count == 0:
+            return np.zeros(0, dtype=np.int64), 0
+        steps = np.diff(points, axis=0)
+        breaks = np.hypot(steps[:, 0], steps[:, 1]) > self.cluster_gap
+        labels = np.zeros(count, dtype=np.int64)
+        np.cumsum(breaks, out=labels[1:])
+        cluster_count = int(labels[-1]) + 1
+        # 360° 스캔: 마지막 빔과 첫 빔이 (뒤쪽을 돌아) 이웃하고 가까우면 같은 클러스터로 합침
+        if cluster_count > 1 and angles[0] + 2.0 * math.pi - angles[-1] < math.pi:
+            gap = points[-1] - points[0]
+            if math.hypot(gap[0], gap[1]) <= self.cluster_gap:
+                labels[labels == cluster_count - 1] = 0
+                cluster_count -= 1
+        return labels, cluster_count
+
+    def _associate(self, points, angles, labels, sizes, boxes, x0, z0):
+        """클러스터 점의 CAMERA_MATCH_FRACTION 이상이 박스 방위 범위 안이면 그 박스의 검출로 보고 중심 좌표 반환."""
+        low, high, box_labels = self.box_bearings(boxes)
+        if not len(points) or not box_labels:
+            return []
+        bearings = np.remainder(angles + math.pi, 2.0 * math.pi) - math.pi
+        inside = (bearings[:, None] >= low) & (bearings[:, None] <= high)  # (N, B), 박스 수는 적음
+        counts = np.stack([np.bincount(labels, weights=inside[:, b], minlength=len(sizes))
+                           for b in range(len(box_labels))], axis=1)
+        counts[sizes < self.min_cluster_points] = 0.0
+        best = counts.argmax(axis=1)
+        fraction = counts[np.arange(len(sizes)), best] / np.maximum(sizes, 1)
+        matched = np.flatnonzero(fraction >= CAMERA_MATCH_FRACTION)
+        if not len(matched):
+            return []
+        centroid_x = np.bincount(labels, weights=points[:, 0], minlength=len(sizes))[matched] / sizes[matched]
+        centroid_z = np.bincount(labels, weights=points[:, 1], minlength=len(sizes))[matched] / sizes[matched]
+        return [
+            {"label": box_labels[b], "box": b, "x": x, "z": z, "points": n, "distance": math.hypot(x - x0, z - z0)}
+            for b, x, z, n in zip(best[matched].tolist(), centroid_x.tolist(), centroid_z.tolist(),
+                                  sizes[matched].tolist())
+        ]
+
+    def _downsample(self, points):
+        """voxel_size 격자 칸마다 점들의 중심 1개로 줄임 (장애물 인덱스의 점 단위 병합 전에 점 수를 줄임)."""
+        if self.voxel_size <= 0.0 or len(points) < 2:
+            return points
+        cells = np.floor(points / self.voxel_size).astype(np.int64)
+        keys = (cells[:, 0] << 32) ^ (cells[:, 1] & 0xFFFFFFFF)
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        if len(unique) == len(points):
+            return points
+        merged = np.empty((len(unique), 2))
+        merged[:, 0] = np.bincount(inverse, weights=points[:, 0]) / counts
+        merged[:, 1] = np.bincount(inverse, weights=points[:, 1]) / counts
+        return merged
+
+
+def parse_boxes(value):
+    """JSON 본문의 boxes 값 (없으면 None, 문자열이면 JSON 으로 해석)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list):
+        raise ValueError("boxes 는 검출 박스 배열이어야 합니다")
+    return value
@@ -0,0 +1,145 @@
+# session_registry.py
+# 차량 ID 별 내비게이션 세션 관리 (세션별 잠금, 유휴 세션 정리, 공유 정적 장애물 지도)
+
+import threading
+import time
+import numpy as np
+from navigation_core import Navigation
+from obstacle_index import ObstacleIndex, describe_obstacles
+from config import DEFAULT_VEHICLE_ID, SESSION_IDLE_TIMEOUT, SESSION_SWEEP_INTERVAL
+
+
+class Session:
+    def __init__(self, vehicle_id, static_obstacles, clock=time.monotonic, recorder=None):
+        self.vehicle_id = vehicle_id
+        self.navigator = Navigation(static_obstacles=static_obstacles)
+        if recorder is not None:
+            self.navigator.set_recorder(recorder.channel(vehicle_id))
+        self.lock = threading.Lock()  # 같은 차량에 대한 요청은 순서대로 처리
+        self.last_access = clock()
+
+    @property
+    def position_handler(self):
+        return self.navigator.position_handler
+
+    @property
+    def controller(self):
+        return self.navigator.controller
+
+    def reload_config(self, changes):
+        """현재 설정에서 changes 의 값만 바꾼 새 설정으로 교체 (잘못된 이름/값이면 ERROR)."""
+        if not isinstance(changes, dict):
+            return {"status": "ERROR", "message": "설정 객체 누락"}
+        with self.lock:
+            try:
+                config = self.navigator.config.replace(**changes)
+            except (TypeError, ValueError) as e:
+                return {"status": "ERROR", "message": str(e)}
+            return self.navigator.set_config(config)
+
+
+class SessionRegistry:
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT, clock=time.monotonic, recorder=None):
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.recorder = recorder  # recorder.TickRecorder (None 이면 기록 안 함)
+        self.sessions = {}
+        self._lock = threading.Lock()  # 세션 생성/제거 전용 (요청 처리 중에는 잡지 않음)
+        self._last_sweep = clock()
+        # 정적 장애물은 한 번만 저장하고 모든 세션이 읽기 전용으로 공유.
+        # 지도 성격이라 obstacle_ttl 과 무관하게 만료되지 않으며 clear_obstacles 로만 지운다 (만료 큐도 두지 않음)
+        self.obstacles = ObstacleIndex()
+        self._static_lock = threading.Lock()
+
+    def get(self, vehicle_id=None):
+        """차량 세션 조회 (없으면 생성), 주기적으로 유휴 세션 정리."""
+        vehicle_id = vehicle_id or DEFAULT_VEHICLE_ID
+        now = self.clock()
+        session = self.sessions.get(vehicle_id)
+        if session is None:
+            with self._lock:
+                session = self.sessions.get(vehicle_id)
+                if session is None:
+                    session = Session(vehicle_id, self.obstacles, self.clock, self.recorder)
+                    with self._static_lock:
+                        # 새 차량의 점유 격자에 현재 창 범위의 정적 장애물 반영
+                        occupancy = session.navigator.occupancy
+                        occupancy.mark_occupied(self.obstacles.points_in_box(*occupancy.bounds()))
+                        self.sessions[vehicle_id] = session
+        session.last_access = now
+        if now - self._last_sweep >= SESSION_SWEEP_INTERVAL:
+            self.evict_idle(now)
+        return session
+
+    def evict_idle(self, now=None):
+        """idle_timeout 동안 접근이 없는 세션 제거."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [vehicle_id for vehicle_id, session in self.sessions.items()
+                    if now - session.last_access > self.idle_timeout]
+            for vehicle_id in idle:
+                del self.sessions[vehicle_id]
+        return idle
+
+    def remove(self, vehicle_id):
+        with self._lock:
+            return self.sessions.pop(vehicle_id, None) is not None
+
+    def add_obstacles(self, points):
+        """공유 정적 지도에 장애물 일괄 추가 후 모든 세션의 격자/경로에 반영."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        valid = np.isfinite(points).all(axis=1)
+        points = points[valid]
+        with self._static_lock:
+            added = self.obstacles.add_many(points, self.clock())
+            if self.recorder is not None:
+                self.recorder.static_obstacles(time.time(), added)
+        if len(added):
+            for session in list(self.sessions.values()):
+                with session.lock:
+                    session.navigator.apply_static_obstacles(added)
+        accepted = int(valid.sum())
+        return {"status": "OK", "accepted": accepted, "rejected": len(valid) - accepted,
+                "merged": accepted - len(added)}
+
+    def clear_obstacles(self):
+        """공유 정적 지도를 비우고 모든 세션의 점유 격자에서 되돌림."""
+        with self._static_lock:
+            removed = self.obstacles.points.copy()
+            self.obstacles.clear()
+            if self.recorder is not None:
+                self.recorder.static_clear(time.time())
+        for session in list(self.sessions.values()):
+            with session.lock:
+                session.navigator.occupancy.unmark_occupied(removed)
+                session.navigator.path = None
+        return {"status": "OK", "removed": len(removed)}
+
+    def query_obstacles(self, bounds=None):
+        with self._static_lock:
+            return describe_obstacles(self.obstacles, bounds)
+
+    def update_obstacle(self, obstacle_data):
+        """단일 장애물 {"x", "z"} 를 공유 정적 지도에 추가."""
+        try:
+            x = obstacle_data.get("x")
+            z = obstacle_data.get("z")
+            if x is None or z is None:
+                return {"status": "ERROR", "message": "Missing x or z coordinates"}
+            x, z = float(x), float(z)
+        except (AttributeError, ValueError) as e:
+            return {"status": "ERROR", "message": str(e)}
+        self.add_obstacles(((x, z),))
+        return {"status": "OK", "message": f"Obstacle added at ({x}, {z})"}
+
+    def describe(self):
+        now = self.clock()
+        return {
+            "status": "OK",
+            "static_obstacles": len(self.obstacles),
+            "sessions": {
+                vehicle_id: {"idle_seconds": now - session.last_access}
+                for vehicle_id, session in list(self.sessions.items())
+            }
+        }
@@ -0,0 +1,112 @@
+# simulator.py
+# 헤드리스 결정론적 시뮬레이션 (가상 시계 + 시드 고정 난수, HTTP/실시간 시계 없이 내비게이터 반복 실행)
+
+import math
+import random
+import numpy as np
+from navigation_core import Navigation
+from vehicle_model import CODES, command_step
+from config import CONTROL_PARAMS, NavigationConfig, SIM_DT, SIM_MAX_TIME
+
+
+class SimClock:
+    """수동으로 전진시키는 가상 시계 (호출하면 현재 시뮬레이션 시각 반환)."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class VehicleSim:
+    """차량 운동학 모델 (vehicle_model): W/S 는 가감속, A/D 는 선회, STOP 은 제동."""
+
+    def __init__(self, x, z, heading=0.0, max_speed_ms=None):
+        self.x = x
+        self.z = z
+        self.heading = heading  # 라디안, 0 = +z 방향, 양수 = +x 쪽 (PositionHandler 와 동일)
+        self.speed = 0.0  # m/s (후진은 음수)
+        self.max_speed = CONTROL_PARAMS["target_val_kh"] / 3.6 if max_speed_ms is None else max_speed_ms
+
+    def step(self, command, dt):
+        state = command_step(CODES.get(command, CODES["STOP"]), self.x, self.z, self.heading, self.speed, dt,
+                             self.max_speed)
+        self.x, self.z, self.heading, self.speed = state
+
+
+def run_scenario(start, goal, obstacles=(), seed=0, dt=SIM_DT, max_time=SIM_MAX_TIME,
+                 navigator_factory=Navigation, config=None):
+    """시나리오 1개를 끝까지 실행하고 지표를 반환.
+
+    start 는 (x, z, heading), goal 은 (x, z), obstacles 는 (N, 2) 좌표,
+    config 는 내비게이터에 주입할 NavigationConfig (None 이면 기본값).
+    같은 인자와 seed 로 실행하면 항상 같은 결과가 나온다.
+    """
+    config = config or NavigationConfig()
+    clock = SimClock()
+    navigator = navigator_factory(clock=clock, rng=random.Random(seed), config=config)
+    vehicle = VehicleSim(*start, max_speed_ms=config.max_speed_ms)
+    obstacles = np.asarray(obstacles, dtype=np.float64).reshape(-1, 2)
+    if len(obstacles):
+        navigator.add_obstacles(obstacles)
+    started = clock()
+
+    navigator.position_handler.update_position((vehicle.x, 0.0, vehicle.z), clock())
+    navigator.set_destination((goal[0], 0.0, goal[1]))
+
+    counts = {"W": 0, "A": 0, "S": 0, "D": 0, "STOP": 0}
+    steps = 0
+    collisions = 0
+    turn_reversals = 0  # A <-> D 전환 횟수 (진동 지표)
+    last_turn = None
+    travelled = 0.0
+    reached = False
+
+    while clock() - started < max_time:
+        command = navigator.get_move()["move"]
+        counts[command] = counts.get(command, 0) + 1
+        if command in ("A", "D"):
+            if last_turn is not None and command != last_turn:
+                turn_reversals += 1
+            last_turn = command
+
+        prev_x, prev_z = vehicle.x, vehicle.z
+        vehicle.step(command, dt)
+        travelled += math.sqrt((vehicle.x - prev_x) ** 2 + (vehicle.z - prev_z) ** 2)
+        clock.advance(dt)
+        steps += 1
+
+        # 이번 스텝의 이동 구간이 장애물 반경을 지나면 충돌로 집계
+        if navigator.obstacles.segment_hits(prev_x, prev_z, vehicle.x, vehicle.z, config.obstacle_radius):
+            collisions += 1
+
+        navigator.position_handler.update_position((vehicle.x, 0.0, vehicle.z), clock())
+        if math.sqrt((goal[0] - vehicle.x) ** 2 + (goal[1] - vehicle.z) ** 2) < config.tolerance:
+            reached = True
+            break
+
+    return {
+        "reached": reached,
+        "time_to_goal": clock() - started if reached else None,
+        "sim_time": clock() - started,
+        "steps": steps,
+        "collisions": collisions,
+        "turn_reversals": turn_reversals,
+        "distance_travelled": travelled,
+        "final_position": (vehicle.x, vehicle.z),
+        "commands": counts
+    }
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+
+    # 사용 예: python simulator.py 50 200 7  → (0, 0) 에서 (50, 200) 까지 시드 7 로 실행
+    goal_x, goal_z = (float(v) for v in sys.argv[1:3]) if len(sys.argv) >= 3 else (50.0, 200.0)
+    seed = int(sys.argv[3]) if len(sys.argv) >= 4 else 0
+    print(json.dumps(run_scenario((0.0, 0.0, 0.0), (goal_x, goal_z), seed=seed), indent=2))
@@ -0,0 +1,160 @@
+# sweep.py
+# 파라미터 탐색 (격자/무작위 조합을 프로세스 풀로 병렬 실행, 결과를 열 단위 조각 파일로 저장, 중단 후 이어서 실행)
+#
+# 실행 예: python sweep.py results/ --random 500 --workers 8
+# 결과 디렉터리에는 manifest.json 과 part-NNNNN.npz (열 이름 -> 배열) 조각들이 쌓인다.
+
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from simulator import run_scenario
+from config import NavigationConfig
+
+# 탐색 공간: 파라미터 이름 -> 후보 값 (무작위 탐색에서는 최소~최대 범위로 사용)
+DEFAULT_SPACE = {
+    "lookahead_min": (0.5, 1.0, 2.0),
+    "lookahead_max": (5.0, 10.0, 20.0),
+    "kp_val": (0.1, 0.18, 0.3),
+    "ki_val": (0.05, 0.1, 0.2),
+    "speed_smoothing": (0.5, 0.7, 0.9),
+    "steering_smoothing": (0.8, 0.9, 0.95),
+    "obstacle_radius": (1.0, 1.5)
+}
+
+# 시나리오: 시작 (x, z, heading), 목표 (x, z), 장애물 목록
+DEFAULT_SCENARIOS = (
+    {"start": (0.0, 0.0, 0.0), "goal": (50.0, 200.0), "obstacles": ()},
+    {"start": (0.0, 0.0, 0.0), "goal": (-120.0, 80.0), "obstacles": ()},
+    {"start": (0.0, 0.0, 0.0), "goal": (0.0, 150.0),
+     "obstacles": tuple((x, 60.0) for x in np.arange(-10.0, 10.5, 0.5))}
+)
+
+METRICS = ("reached", "time_to_goal", "sim_time", "steps", "collisions", "turn_reversals", "distance_travelled")
+
+
+def grid_search(space=DEFAULT_SPACE):
+    """모든 후보 값의 곱집합."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space=DEFAULT_SPACE, count=100, seed=0):
+    """각 파라미터를 후보 값의 최소~최대 범위에서 균등 추출."""
+    rng = random.Random(seed)
+    return [{name: rng.uniform(min(values), max(values)) for name, values in space.items()}
+            for _ in range(count)]
+
+
+def expand_runs(combos, scenarios=DEFAULT_SCENARIOS, seeds=(0,)):
+    """(run_id, 파라미터, 시나리오 번호, 시드) 작업 목록. run_id 는 열거 순서라 재실행해도 같다."""
+    runs = itertools.product(range(len(combos)), range(len(scenarios)), seeds)
+    return [(run_id, combos[c], s, seed) for run_id, (c, s, seed) in enumerate(runs)]
+
+
+def _run_tasks(tasks, scenarios):
+    """작업 묶음을 한 프로세스에서 순서대로 실행 (프로세스 간 전송 횟수 절감)."""
+    rows = []
+    for run_id, params, scenario_index, seed in tasks:
+        scenario = scenarios[scenario_index]
+        result = run_scenario(scenario["start"], scenario["goal"], scenario["obstacles"],
+                              seed=seed, config=NavigationConfig(**params))
+        row = {"run_id": run_id, "scenario": scenario_index, "seed": seed}
+        row.update(params)
+        for name in METRICS:
+            value = result[name]
+            row[name] = math.nan if value is None else value
+        rows.append(row)
+    return rows
+
+
+class ResultStore:
+    """결과 디렉터리: 완료된 행을 모아 열 단위 npz 조각으로 원자적으로 기록."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.parts = sorted(name for name in os.listdir(directory)
+                            if name.startswith("part-") and name.endswith(".npz"))
+
+    def check_manifest(self, manifest):
+        """처음이면 탐색 정의를 기록하고, 이어서 실행하면 같은 정의인지 확인."""
+        path = os.path.join(self.directory, "manifest.json")
+        manifest = json.loads(json.dumps(manifest))
+        if os.path.exists(path):
+            with open(path) as f:
+                if json.load(f) != manifest:
+                    raise ValueError(f"{self.directory} 의 기존 탐색 정의와 다릅니다")
+            return
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def done_ids(self):
+        done = set()
+        for name in self.parts:
+            with np.load(os.path.join(self.directory, name)) as part:
+                done.update(part["run_id"].tolist())
+        return done
+
+    def write(self, rows):
+        if not rows:
+            return
+        name = f"part-{len(self.parts):05d}.npz"
+        path = os.path.join(self.directory, name)
+        columns = {key: np.array([row[key] for row in rows]) for key in rows[0]}
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **columns)
+        os.replace(path + ".tmp", path)  # 중단되어도 반쯤 쓰인 조각은 남지 않음
+        self.parts.append(name)
+
+
+def load_results(directory):
+    """모든 조각을 열별로 이어 붙여 {열 이름: 배열} 반환."""
+    store = ResultStore(directory)
+    columns = {}
+    for name in store.parts:
+        with np.load(os.path.join(directory, name)) as part:
+            for key in part.files:
+                columns.setdefault(key, []).append(part[key])
+    return {key: np.concatenate(chunks) for key, chunks in columns.items()}
+
+
+def run_sweep(combos, directory, scenarios=DEFAULT_SCENARIOS, seeds=(0,), workers=None,
+              flush_every=64, tasks_per_job=4):
+    """조합 x 시나리오 x 시드 전체를 병렬 실행. 이미 기록된 run_id 는 건너뛴다."""
+    store = ResultStore(directory)
+    store.check_manifest({"combos": combos, "scenarios": scenarios, "seeds": list(seeds)})
+    done = store.done_ids()
+    pending = [task for task in expand_runs(combos, scenarios, seeds) if task[0] not in done]
+
+    buffer = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        jobs = [executor.submit(_run_tasks, pending[i:i + tasks_per_job], scenarios)
+                for i in range(0, len(pending), tasks_per_job)]
+        for job in as_completed(jobs):
+            buffer.extend(job.result())
+            if len(buffer) >= flush_every:
+                store.write(buffer)
+                buffer = []
+    store.write(buffer)
+    return {"total": len(done) + len(pending), "skipped": len(done), "completed": len(pending),
+            "parts": len(store.parts)}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="내비게이션 파라미터 탐색")
+    parser.add_argument("directory")
+    parser.add_argument("--random", type=int, default=0, help="무작위 조합 수 (0 이면 격자 탐색)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seeds", type=int, default=1, help="조합/시나리오마다 반복할 시드 수")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    combos = random_search(count=args.random, seed=args.seed) if args.random else grid_search()
+    print(json.dumps(run_sweep(combos, args.directory, seeds=tuple(range(args.seeds)), workers=args.workers)))
@@ -0,0 +1,40 @@
+# vehicle_model.py
+# 차량 운동 모델 (config 의 SIM_* 차량 상수): 틱 시작에 W/S 는 가감속, A/D 는 현재 속도를 유지한 채 선회,
+# STOP 은 0 을 향해 제동하고, 새 heading 방향으로 새 속도만큼 이동한다.
+#
+# 시뮬레이터(VehicleSim, BatchSimulator), 추측 항법(Navigation._dead_reckon), 위치 필터의 명령 입력
+# (PositionHandler.set_command_input), 국소 계획기 rollout 이 모두 이 함수들을 부른다.
+# 스칼라와 NumPy 배열 (명령 번호 배열 포함) 을 모두 받는다 (스칼라는 틱마다 여러 번 불리므로 math 로 계산).
+
+import math
+import numpy as np
+from config import SIM_ACCEL, SIM_BRAKE, SIM_YAW_RATE
+
+COMMANDS = ("W", "A", "S", "D", "STOP")
+CODES = {command: code for code, command in enumerate(COMMANDS)}
+YAW_RATES = np.array((0.0, -SIM_YAW_RATE, 0.0, SIM_YAW_RATE, 0.0))  # 명령별 선회 각속도 (rad/s, D 가 양수)
+ACCELERATIONS = np.array((SIM_ACCEL, 0.0, SIM_BRAKE, 0.0, SIM_BRAKE))  # 명령별 가감속 크기 (m/s^2)
+SPEED_LIMITS = np.array((1.0, 0.0, -0.5, 0.0, 0.0))  # 가감속이 멈추는 속도 (최대 속도 배수, 후진은 음수)
+
+
+def command_speed(code, speed, duration, max_speed):
+    """speed (m/s, 후진은 음수) 에서 명령 code 를 duration 초 이어 간 뒤의 속도.
+
+    W 는 최대 속도, S 는 후진 최대 속도(절반), STOP 은 0 을 향해 가감속하고 닿으면 멈추며, A/D 는 속도를 유지한다.
+    """
+    change = ACCELERATIONS[code] * duration
+    gap = SPEED_LIMITS[code] * max_speed - speed
+    if isinstance(gap, np.ndarray):
+        return speed + np.minimum(np.maximum(gap, -change), change)
+    return float(speed + min(max(gap, -change), change))
+
+
+def command_step(code, x, z, heading, speed, dt, max_speed):
+    """명령 code 로 한 틱(dt) 진행한 (x, z, heading, speed). heading 은 atan2(dx, dz) 로 [-pi, pi] 로 정규화."""
+    speed = command_speed(code, speed, dt, max_speed)
+    heading = heading + YAW_RATES[code] * dt
+    if isinstance(heading, np.ndarray):
+        heading = np.arctan2(np.sin(heading), np.cos(heading))
+        return x + speed * np.sin(heading) * dt, z + speed * np.cos(heading) * dt, heading, speed
+    heading = math.atan2(math.sin(heading), math.cos(heading))
+    return x + speed * math.sin(heading) * dt, z + speed * math.cos(heading) * dt, heading, speed
@@ -0,0 +1,61 @@
+# wire_format.py
+# 위치/목적지 메시지용 고정 레이아웃 바이너리 인코딩 (JSON + 문자열 파싱 대체)
+#
+# 메시지 1개 = 40바이트 리틀 엔디언:
+#   kind(u1) | 패딩(3) | seq(u4) | timestamp(f8, 송신 측 초) | x(f8) | y(f8) | z(f8)
+# 본문에 여러 메시지를 이어 붙이면 순서대로 처리한다. timestamp 가 0 이하 또는 NaN 이면 서버 시각 사용.
+# IMU 메시지는 x = yaw_rate (rad/s), y = 진행 방향 가속도 (m/s^2), z 는 사용하지 않는다.
+
+import math
+import struct
+import numpy as np
+
+BINARY_MIMETYPE = "application/octet-stream"
+
+POSITION = 1
+DESTINATION = 2
+IMU = 3
+
+MESSAGE_STRUCT = struct.Struct("<B3xIdddd")
+MESSAGE_DTYPE = np.dtype([
+    ("kind", "u1"), ("_pad", "V3"), ("seq", "<u4"),
+    ("timestamp", "<f8"), ("x", "<f8"), ("y", "<f8"), ("z", "<f8")
+])
+MESSAGE_SIZE = MESSAGE_DTYPE.itemsize
+
+assert MESSAGE_SIZE == MESSAGE_STRUCT.size
+
+
+def encode(kind, x, y, z, timestamp=0.0, seq=0):
+    """메시지 1개를 40바이트로 인코딩 (클라이언트/시뮬레이터용)."""
+    return MESSAGE_STRUCT.pack(kind, seq, timestamp, x, y, z)
+
+
+def decode(body):
+    """본문을 복사 없이 구조화 배열 뷰로 해석 (길이가 메시지 크기의 배수가 아니면 ValueError)."""
+    view = memoryview(body)
+    if len(view) == 0 or len(view) % MESSAGE_SIZE:
+        raise ValueError(f"바이너리 메시지 길이는 {MESSAGE_SIZE}바이트의 배수여야 합니다")
+    return np.frombuffer(view, dtype=MESSAGE_DTYPE)
+
+
+def apply_messages(navigator, records, kind):
+    """디코딩한 메시지를 순서대로 Navigation 에 반영하고 마지막 결과를 반환.
+
+    kind 가 POSITION 이면 같은 본문의 IMU 메시지도 순서대로 함께 반영한다 (GNSS + IMU 센서 스트림).
+    """
+    result = {"status": "ERROR", "message": "해당 종류의 메시지 없음"}
+    for record_kind, _, _, timestamp, x, y, z in records.tolist():
+        if record_kind != kind and not (kind == POSITION and record_kind == IMU):
+            continue
+        if timestamp <= 0.0 or math.isnan(timestamp):
+            timestamp = None
+        if record_kind == POSITION:
+            result = navigator.position_handler.update_position((x, y, z), timestamp)
+        elif record_kind == IMU:
+            result = navigator.position_handler.update_imu((x, y), timestamp)
+        else:
+            result = navigator.set_destination((x, y, z))
+        if result["status"] == "ERROR":
+            return result
+    return result